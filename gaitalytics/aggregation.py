@@ -0,0 +1,389 @@
+"""This module provides classes for aggregating time-normalised cycles."""
+
+import warnings
+from abc import ABC, abstractmethod
+
+import numpy as np
+import xarray as xr
+
+import gaitalytics.model as model
+import gaitalytics.utils.math as ga_math
+
+
+class BaseAggregator(ABC):
+    """Base class for aggregators.
+
+    An aggregator reduces the time-normalised cycles of each context to
+    statistics per channel and frame, i.e. the ensemble mean and standard
+    deviation curves. Cycles flagged as not used are skipped.
+    """
+
+    def __init__(self, categories: list[model.DataCategory] | None = None):
+        """Initializes a new instance of the BaseAggregator class.
+
+        Args:
+            categories: The categories to aggregate.
+                Default = None, all categories
+        """
+        self.categories = categories
+
+    @abstractmethod
+    def aggregate(
+        self, trial: model.TrialCycles
+    ) -> dict[model.DataCategory, xr.DataArray]:
+        """Aggregates the cycles of a segmented trial.
+
+        Args:
+            trial: The segmented and time-normalised trial.
+
+        Returns:
+            A dictionary containing the categories as keys and the data arrays
+            with the additional first dimensions "context" and "statistic"
+            as values.
+        """
+        raise NotImplementedError
+
+    def _get_context_arrays(
+        self, trial: model.TrialCycles
+    ) -> dict[model.DataCategory, dict[str, list[xr.DataArray]]]:
+        """Gets the data arrays of the used cycles by category and context.
+
+        Args:
+            trial: The segmented trial.
+
+        Returns:
+            A dictionary containing the categories as keys and dictionaries
+            with the contexts as keys and the data arrays as values.
+        """
+        context_arrays: dict[model.DataCategory, dict[str, list[xr.DataArray]]] = {}
+        for context, context_cycles in trial.get_all_cycles().items():
+            for cycle_id, cycle in context_cycles.items():
+                if not trial.get_cycle_attrs(context, cycle_id).get("used", 1):
+                    continue
+                for category, data in cycle.get_all_data().items():
+                    if self.categories is None or category in self.categories:
+                        category_arrays = context_arrays.setdefault(category, {})
+                        category_arrays.setdefault(context, []).append(data)
+        return context_arrays
+
+    @staticmethod
+    def _stack_arrays(arrays: list[xr.DataArray]) -> np.ndarray:
+        """Stacks the data arrays of cycles along a new first dimension.
+
+        Args:
+            arrays: The data arrays of the cycles.
+
+        Returns:
+            An array with the cycles in the first dimension.
+
+        Raises:
+            ValueError: If the cycles are not time-normalised to the same
+                number of frames or differ in other dimensions.
+        """
+        first = arrays[0]
+        for array in arrays[1:]:
+            if array.dims != first.dims or array.shape != first.shape:
+                raise ValueError("The cycles must be time-normalised to aggregate.")
+        return np.stack([array.values for array in arrays])
+
+    @staticmethod
+    def _create_result(
+        template: xr.DataArray,
+        values: np.ndarray,
+        contexts: list[str],
+        statistics: list[str],
+        n_cycles: list[int],
+    ) -> xr.DataArray:
+        """Creates the data array of the statistics of a category.
+
+        Args:
+            template: A data array of a cycle providing dimensions,
+                coordinates and attributes.
+            values: The statistics with the shape (context, statistic, ...).
+            contexts: The contexts of the first dimension.
+            statistics: The names of the statistics of the second dimension.
+            n_cycles: The number of aggregated cycles per context.
+
+        Returns:
+            The data array with the statistics.
+        """
+        coords = {name: coord.variable for name, coord in template.coords.items()}
+        coords["context"] = ("context", contexts)
+        coords["statistic"] = ("statistic", statistics)
+        coords["n_cycles"] = ("context", n_cycles)
+        # attributes of single cycles do not describe the aggregate
+        attrs = {"units": template.attrs["units"]} if "units" in template.attrs else {}
+        return xr.DataArray(
+            values,
+            dims=("context", "statistic", *template.dims),
+            coords=coords,
+            attrs=attrs,
+            name=template.name,
+        )
+
+
+class EnsembleAggregator(BaseAggregator):
+    """A class for computing ensemble curves of time-normalised cycles.
+
+    The mean, standard deviation, median and percentiles are reduced from
+    the stacked cycles of a context at once. Missing values are ignored.
+    """
+
+    def __init__(
+        self,
+        percentiles: tuple[float, ...] = (5, 95),
+        ddof: int = 1,
+        categories: list[model.DataCategory] | None = None,
+    ):
+        """Initializes a new instance of the EnsembleAggregator class.
+
+        Args:
+            percentiles: The percentiles of the bands in the range [0, 100].
+                Default = (5, 95)
+            ddof: The delta degrees of freedom of the standard deviation.
+                Default = 1
+            categories: The categories to aggregate.
+                Default = None, all categories
+
+        Raises:
+            ValueError: If a percentile is outside of the range [0, 100].
+        """
+        if any(not 0 <= percentile <= 100 for percentile in percentiles):
+            raise ValueError("Percentiles must be in the range [0, 100].")
+        super().__init__(categories)
+        self.percentiles = tuple(percentiles)
+        self.ddof = ddof
+
+    def get_statistics(self) -> list[str]:
+        """Gets the names of the statistics.
+
+        Returns:
+            The names "mean", "std", "median" and "p<percentile>".
+        """
+        return ["mean", "std", "median"] + [f"p{q:g}" for q in self.percentiles]
+
+    def aggregate(
+        self, trial: model.TrialCycles
+    ) -> dict[model.DataCategory, xr.DataArray]:
+        """Aggregates the cycles of a segmented trial.
+
+        Args:
+            trial: The segmented and time-normalised trial.
+
+        Returns:
+            A dictionary containing the categories as keys and the data arrays
+            with the additional first dimensions "context" and "statistic"
+            as values.
+
+        Raises:
+            ValueError: If the cycles are not time-normalised.
+        """
+        results = {}
+        for category, context_arrays in self._get_context_arrays(trial).items():
+            contexts = list(context_arrays)
+            values = [
+                self._reduce(self._stack_arrays(arrays))
+                for arrays in context_arrays.values()
+            ]
+            first = context_arrays[contexts[0]][0]
+            if any(value.shape[1:] != values[0].shape[1:] for value in values):
+                raise ValueError("The cycles must be time-normalised to aggregate.")
+            results[category] = self._create_result(
+                first,
+                np.stack(values),
+                contexts,
+                self.get_statistics(),
+                [len(arrays) for arrays in context_arrays.values()],
+            )
+        return results
+
+    def _reduce(self, values: np.ndarray) -> np.ndarray:
+        """Reduces stacked cycles to the statistics.
+
+        Args:
+            values: The cycles stacked in the first dimension.
+
+        Returns:
+            The statistics stacked in the first dimension.
+        """
+        with warnings.catch_warnings():
+            # frames without any value or too few cycles stay empty
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean = np.nanmean(values, axis=0)
+            std = np.nanstd(values, axis=0, ddof=self.ddof)
+            # the median and all percentiles share a single partition
+            quantiles = ga_math.get_nan_percentiles(
+                values, [50, *self.percentiles], axis=0
+            )
+        return np.concatenate([mean[np.newaxis], std[np.newaxis], quantiles]).astype(
+            values.dtype, copy=False
+        )
+
+
+class StreamingAggregator(BaseAggregator):
+    """A class for accumulating ensemble curves over many sessions.
+
+    The count, mean and sum of squared deviations of each channel and frame
+    are updated with the cycles of one trial at a time (Welford, Chan et al.),
+    so the cycles of all sessions are never held in memory at once.
+    Aggregators of separate workers can be merged. Since quantiles can not
+    be accumulated exactly, the minimum and maximum are tracked instead.
+    """
+
+    STATISTICS = ("mean", "std", "min", "max")
+
+    def __init__(
+        self, ddof: int = 1, categories: list[model.DataCategory] | None = None
+    ):
+        """Initializes a new instance of the StreamingAggregator class.
+
+        Args:
+            ddof: The delta degrees of freedom of the standard deviation.
+                Default = 1
+            categories: The categories to aggregate.
+                Default = None, all categories
+        """
+        super().__init__(categories)
+        self.ddof = ddof
+        self._states: dict[model.DataCategory, dict[str, dict]] = {}
+        self._templates: dict[model.DataCategory, xr.DataArray] = {}
+
+    def update(self, trial: model.TrialCycles):
+        """Adds the cycles of a segmented trial to the aggregate.
+
+        Args:
+            trial: The segmented and time-normalised trial.
+
+        Raises:
+            ValueError: If the cycles are not time-normalised or do not match
+                the previously added cycles.
+        """
+        for category, context_arrays in self._get_context_arrays(trial).items():
+            template = self._check_template(category, context_arrays)
+            for context, arrays in context_arrays.items():
+                # accumulate with float64 to keep the sums of float32 data exact
+                values = self._stack_arrays(arrays).astype(float)
+                with warnings.catch_warnings():
+                    # frames without any value stay empty
+                    warnings.simplefilter("ignore", RuntimeWarning)
+                    mean = np.nanmean(values, axis=0)
+                    state = {
+                        "n_cycles": len(arrays),
+                        "count": np.sum(~np.isnan(values), axis=0),
+                        "mean": np.nan_to_num(mean),
+                        "m2": np.nansum((values - mean) ** 2, axis=0),
+                        "min": np.nanmin(values, axis=0),
+                        "max": np.nanmax(values, axis=0),
+                        "dtype": template.dtype,
+                    }
+                self._add_state(category, context, state)
+
+    def merge(self, other: "StreamingAggregator"):
+        """Adds the aggregate of another aggregator, i.e. of another worker.
+
+        Args:
+            other: The aggregator to merge.
+
+        Raises:
+            ValueError: If the cycles of the aggregators do not match.
+        """
+        for category, context_states in other._states.items():
+            template = other._templates[category]
+            self._check_template(category, {"": [template]})
+            for context, state in context_states.items():
+                self._add_state(category, context, dict(state))
+
+    def aggregate(
+        self, trial: model.TrialCycles | None = None
+    ) -> dict[model.DataCategory, xr.DataArray]:
+        """Gets the aggregate of all added cycles.
+
+        Args:
+            trial: A segmented trial to add before. Default = None
+
+        Returns:
+            A dictionary containing the categories as keys and the data arrays
+            with the additional first dimensions "context" and "statistic"
+            as values.
+        """
+        if trial is not None:
+            self.update(trial)
+        results = {}
+        for category, context_states in self._states.items():
+            values = []
+            for state in context_states.values():
+                count = state["count"]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    mean = np.where(count > 0, state["mean"], np.nan)
+                    variance = np.where(
+                        count > self.ddof, state["m2"] / (count - self.ddof), np.nan
+                    )
+                values.append(
+                    np.stack([mean, np.sqrt(variance), state["min"], state["max"]])
+                )
+            results[category] = self._create_result(
+                self._templates[category],
+                np.stack(values).astype(
+                    next(iter(context_states.values()))["dtype"], copy=False
+                ),
+                list(context_states),
+                list(self.STATISTICS),
+                [state["n_cycles"] for state in context_states.values()],
+            )
+        return results
+
+    def _check_template(
+        self,
+        category: model.DataCategory,
+        context_arrays: dict[str, list[xr.DataArray]],
+    ) -> xr.DataArray:
+        """Checks that the cycles match the previously added ones.
+
+        Args:
+            category: The category of the cycles.
+            context_arrays: The data arrays of the cycles by context.
+
+        Returns:
+            The data array of the first added cycle of the category.
+
+        Raises:
+            ValueError: If the cycles differ in the dimensions or channels.
+        """
+        first = next(iter(context_arrays.values()))[0]
+        template = self._templates.setdefault(category, first)
+        for arrays in context_arrays.values():
+            for array in arrays:
+                if array.dims != template.dims or array.shape != template.shape:
+                    raise ValueError("The cycles must be time-normalised to aggregate.")
+                for name, coord in template.coords.items():
+                    if name == "time":
+                        continue
+                    if name not in array.coords or not coord.equals(array.coords[name]):
+                        raise ValueError(f"The cycles differ in {name} of {category}.")
+        return template
+
+    def _add_state(self, category: model.DataCategory, context: str, state: dict):
+        """Combines the accumulated state of a context with a new one.
+
+        Args:
+            category: The category of the state.
+            context: The context of the state.
+            state: The count, mean, sum of squared deviations and extrema.
+        """
+        context_states = self._states.setdefault(category, {})
+        if context not in context_states:
+            context_states[context] = state
+            return
+        current = context_states[context]
+        count = current["count"] + state["count"]
+        delta = state["mean"] - current["mean"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(count > 0, state["count"] / count, 0)
+        current["mean"] = current["mean"] + delta * ratio
+        current["m2"] = (
+            current["m2"] + state["m2"] + delta**2 * current["count"] * ratio
+        )
+        current["count"] = count
+        current["n_cycles"] += state["n_cycles"]
+        current["min"] = np.fmin(current["min"], state["min"])
+        current["max"] = np.fmax(current["max"], state["max"])
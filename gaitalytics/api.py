@@ -1,10 +1,19 @@
+from collections.abc import Iterable
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 from functools import wraps
 from inspect import signature, Parameter
 from pathlib import Path
 
 import pandas as pd
 import xarray as xr
+from numpy.typing import DTypeLike
 
+import gaitalytics.aggregation as aggregation
 import gaitalytics.events as events
 import gaitalytics.features as features
 import gaitalytics.io as io
@@ -64,23 +73,32 @@ def load_config(config_path: Path | str) -> mapping.MappingConfigs:
 
 @_PathConverter
 def load_c3d_trial(
-    c3d_file: Path | str, configs: mapping.MappingConfigs
+    c3d_file: Path | str,
+    configs: mapping.MappingConfigs,
+    dtype: DTypeLike | None = None,
 ) -> model.Trial:
     """Loads a Trial from a c3d file.
 
     Be aware that all the required data for the trial must be present in the c3d file.
     i.e. markers, analogs, events, etc.
 
+    The data type is kept by the normalisation and the feature calculation,
+    so np.float32 halves the memory of the whole pipeline.
+
     Args:
         c3d_file: The path to the c3d file.
         configs: The mapping configurations
+        dtype: The floating data type of the data. Default = None, float64
 
     Returns:
         A Trial object.
+
+    Raises:
+        ValueError: If the data type is not floating.
     """
-    markers = io.MarkersInputFileReader(c3d_file).get_markers()  # type: ignore
-    analogs = io.AnalogsInputFileReader(c3d_file).get_analogs()  # type: ignore
-    analysis = io.AnalysisInputReader(c3d_file, configs).get_analysis()  # type: ignore
+    markers = io.MarkersInputFileReader(c3d_file, dtype).get_markers()  # type: ignore
+    analogs = io.AnalogsInputFileReader(c3d_file, dtype).get_analogs()  # type: ignore
+    analysis = io.AnalysisInputReader(c3d_file, configs, dtype).get_analysis()  # type: ignore
     event_table = io.C3dEventInputFileReader(c3d_file).get_events()  # type: ignore
 
     trial = model.Trial()
@@ -101,9 +119,11 @@ def detect_events(
         trial: The trial to detect the events for.
         config: The mapping configurations
         method: The method to use for detecting the events.
-        Currently, only "Marker" is supported, which implements
-        the method from Zenis et al. 2006.
+        Currently, "Marker" and "Velocity" are supported. "Marker" implements
+        the method from Zenis et al. 2006, "Velocity" the foot velocity
+        based method from O'Connor et al. 2007.
         Default is "Marker".
+        **kwargs: Additional keyword arguments for the detection method.
 
     Returns:
         A DataFrame containing the detected events.
@@ -112,6 +132,8 @@ def detect_events(
     match method:
         case "Marker":
             method_obj = events.MarkerEventDetection(config, **kwargs)
+        case "Velocity":
+            method_obj = events.VelocityEventDetection(config, **kwargs)
         case _:
             raise ValueError(f"Unsupported method: {method}")
 
@@ -158,21 +180,27 @@ def write_events_to_c3d(
     io.C3dEventFileWriter(c3d_path).write_events(event_table, output_path)  # type: ignore
 
 
-def segment_trial(trial: model.Trial, method: str = "HS") -> model.TrialCycles:
+def segment_trial(
+    trial: model.Trial, method: str = "HS", **kwargs
+) -> model.TrialCycles:
     """Segments the trial into cycles
 
     Args:
         trial: The trial to segment.
         method: The method to use for segmenting the trial.
-        Currently, only supports "HS" which segments the trial based on heel strikes.
+        Currently, supports "HS" which segments the trial based on heel strikes
+        and "window" which segments the trial into fixed-length windows.
         Default is "HS".
+        **kwargs: Additional keyword arguments for the segmentation method.
 
     Returns:
         The trial with the segmented data.
     """
     match method:
         case "HS":
-            method_obj = segmentation.GaitEventsSegmentation()
+            method_obj = segmentation.GaitEventsSegmentation(**kwargs)
+        case "window":
+            method_obj = segmentation.WindowSegmentation(**kwargs)
         case _:
             raise ValueError(f"Unsupported method: {method}")
 
@@ -180,6 +208,107 @@ def segment_trial(trial: model.Trial, method: str = "HS") -> model.TrialCycles:
     return trial_cycles
 
 
+def segment_trials(
+    trials: list[model.Trial] | tuple[model.Trial, ...],
+    method: str = "HS",
+    workers: int | None = None,
+    executor: str = "thread",
+    output_paths: list[Path | str] | tuple[Path | str, ...] | None = None,
+    **kwargs,
+) -> list[model.TrialCycles] | list[Path]:
+    """Segments multiple trials in parallel.
+
+    Args:
+        trials: The trials to segment.
+        method: The method to use for segmenting the trials.
+        See segment_trial for the supported methods. Default is "HS".
+        workers: The number of parallel workers.
+        If None, the default of the executor is used. Default is None.
+        executor: The type of the worker pool, either "thread" or "process".
+        Default is "thread".
+        output_paths: The folders to write the segmented trials to.
+        If set, each segmented trial is written as soon as it is completed
+        and not kept in memory. Default is None.
+        **kwargs: Additional keyword arguments for the segmentation method.
+
+    Returns:
+        The segmented trials or, if output paths are set, the paths to the
+        written trials, in the order of the trials.
+
+    Raises:
+        ValueError: If the executor is not supported or the number of
+        output paths does not match the number of trials.
+    """
+    if output_paths is not None and len(output_paths) != len(trials):
+        raise ValueError("The number of output paths must match the trials.")
+
+    pool: Executor
+    match executor:
+        case "thread":
+            pool = ThreadPoolExecutor(max_workers=workers)
+        case "process":
+            pool = ProcessPoolExecutor(max_workers=workers)
+        case _:
+            raise ValueError(f"Unsupported executor: {executor}")
+
+    results: list = [None] * len(trials)
+    with pool:
+        futures = {}
+        for index, trial in enumerate(trials):
+            output_path = Path(output_paths[index]) if output_paths else None
+            future = pool.submit(_segment_trial, trial, method, output_path, kwargs)
+            futures[future] = index
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+
+def _segment_trial(
+    trial: model.Trial, method: str, output_path: Path | None, kwargs: dict
+) -> model.TrialCycles | Path:
+    """Segments a trial and writes it to the output path if set.
+
+    Args:
+        trial: The trial to segment.
+        method: The method to use for segmenting the trial.
+        output_path: The folder to write the segmented trial to.
+        kwargs: Additional keyword arguments for the segmentation method.
+
+    Returns:
+        The segmented trial or the output path if set.
+    """
+    trial_cycles = segment_trial(trial, method, **kwargs)
+    if output_path is None:
+        return trial_cycles
+    trial_cycles.to_hdf5(output_path)
+    return output_path
+
+
+def segment_and_normalise_trial(
+    trial: model.Trial, n_frames: int = 100, **kwargs
+) -> model.TrialCycles:
+    """Segments the trial into cycles and time-normalises them in one step.
+
+    This is faster than calling segment_trial and time_normalise_trial
+    since no intermediate cycles are created. As with time_normalise_trial,
+    the cycles do not have events, so features based on events have to be
+    calculated on the result of segment_trial.
+
+    Args:
+        trial: The trial to segment.
+        n_frames: The number of frames to time-normalise the cycles to.
+        Default is 100.
+        **kwargs: Additional keyword arguments for the segmentation method.
+
+    Returns:
+        The trial with the segmented and time-normalised data.
+    """
+    method_obj = segmentation.NormalisedGaitEventsSegmentation(
+        n_frames=n_frames, **kwargs
+    )
+    return method_obj.segment(trial)
+
+
 def time_normalise_trial(
     trial: model.Trial | model.TrialCycles, method: str = "linear", **kwargs
 ) -> model.Trial | model.TrialCycles:
@@ -187,8 +316,14 @@ def time_normalise_trial(
 
     Args:
         trial: The trial to normalise the time for.
-        method: The method to use for normalising the time. Currently, only supports
-        "linear" which normalises the time linearly. Default is "linear".
+        method: The method to use for normalising the time. Supports "linear"
+        which normalises the time linearly, "spline" which fits cubic splines
+        and "pchip" which fits monotone cubic curves. "phase" normalises the
+        phases between events separately, e.g. stance and swing, and requires
+        a segmented trial. "dtw" registers the cycles to the mean curve of
+        their context with dynamic time warping and requires a segmented trial.
+        Default is "linear".
+        **kwargs: Additional keyword arguments for the normaliser.
 
     Returns:
         The trial with the normalised time.
@@ -196,6 +331,14 @@ def time_normalise_trial(
     match method:
         case "linear":
             normaliser = normalisation.LinearTimeNormaliser(**kwargs)
+        case "spline":
+            normaliser = normalisation.SplineTimeNormaliser(**kwargs)
+        case "pchip":
+            normaliser = normalisation.PchipTimeNormaliser(**kwargs)
+        case "phase":
+            normaliser = normalisation.PhaseTimeNormaliser(**kwargs)
+        case "dtw":
+            normaliser = normalisation.DtwTimeNormaliser(**kwargs)
         case _:
             raise ValueError(f"Unsupported method: {method}")
 
@@ -203,6 +346,109 @@ def time_normalise_trial(
     return trial
 
 
+def amplitude_normalise_trial(
+    trial: model.Trial | model.TrialCycles, method: str = "zscore", **kwargs
+) -> model.Trial | model.TrialCycles:
+    """Normalises the amplitude of the data in the trial.
+
+    The parameters are stored in the attrs of the data, so the normalisation
+    can be inverted with the invert method of any amplitude normaliser.
+
+    Args:
+        trial: The trial to normalise the amplitude for.
+        method: The method to use for normalising the amplitude. Supports
+        "zscore" which scales each channel to zero mean and unit variance,
+        "minmax" which scales each channel to the range [0, 1] and "body"
+        which scales the kinetic channels by the body mass or weight and
+        height. Default is "zscore".
+        **kwargs: Additional keyword arguments for the normaliser.
+
+    Returns:
+        The trial with the normalised amplitude.
+    """
+    match method:
+        case "zscore":
+            normaliser = normalisation.ZScoreNormaliser(**kwargs)
+        case "minmax":
+            normaliser = normalisation.MinMaxNormaliser(**kwargs)
+        case "body":
+            normaliser = normalisation.BodyScaleNormaliser(**kwargs)
+        case _:
+            raise ValueError(f"Unsupported method: {method}")
+
+    return normaliser.normalise(trial)
+
+
+def resample_trial(
+    trial: model.Trial | model.TrialCycles, rate: float, **kwargs
+) -> model.Trial | model.TrialCycles:
+    """Resamples the data in the trial to a common rate.
+
+    Resampling the analogs to the rate of the markers early on reduces
+    the amount of data to segment and to calculate the features for.
+
+    Args:
+        trial: The trial to resample.
+        rate: The target rate in Hz.
+        **kwargs: Additional keyword arguments for the normaliser.
+
+    Returns:
+        The trial with the resampled data.
+    """
+    normaliser = normalisation.ResamplingNormaliser(rate, **kwargs)
+    return normaliser.normalise(trial)
+
+
+def aggregate_trial(
+    trial: model.TrialCycles, method: str = "ensemble", **kwargs
+) -> dict[model.DataCategory, xr.DataArray]:
+    """Aggregates the time-normalised cycles of the trial per context.
+
+    Args:
+        trial: The segmented and time-normalised trial.
+        method: The method to use for aggregating the cycles. Supports
+        "ensemble" which computes the mean, standard deviation, median and
+        percentiles and "streaming" which computes the mean, standard
+        deviation, minimum and maximum. Default is "ensemble".
+        **kwargs: Additional keyword arguments for the aggregator.
+
+    Returns:
+        A dictionary containing the categories as keys and the data arrays
+        with the additional first dimensions "context" and "statistic" as values.
+    """
+    match method:
+        case "ensemble":
+            aggregator = aggregation.EnsembleAggregator(**kwargs)
+        case "streaming":
+            aggregator = aggregation.StreamingAggregator(**kwargs)
+        case _:
+            raise ValueError(f"Unsupported method: {method}")
+
+    return aggregator.aggregate(trial)
+
+
+def aggregate_trials(
+    trials: Iterable[model.TrialCycles], **kwargs
+) -> dict[model.DataCategory, xr.DataArray]:
+    """Aggregates the time-normalised cycles of many trials per context.
+
+    The trials are added one after another, so a generator loading the
+    sessions keeps only one session in memory at once.
+
+    Args:
+        trials: The segmented and time-normalised trials.
+        **kwargs: Additional keyword arguments for the StreamingAggregator.
+
+    Returns:
+        A dictionary containing the categories as keys and the data arrays
+        with the additional first dimensions "context" and "statistic" as values.
+    """
+    aggregator = aggregation.StreamingAggregator(**kwargs)
+    for trial in trials:
+        aggregator.update(trial)
+    return aggregator.aggregate()
+
+
 def calculate_features(
     trial: model.TrialCycles,
     config: mapping.MappingConfigs,
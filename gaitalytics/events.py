@@ -10,6 +10,7 @@ import xarray as xr
 import gaitalytics.io as io
 import gaitalytics.mapping as mapping
 import gaitalytics.model as model
+import gaitalytics.utils.math as ga_math
 import gaitalytics.utils.mocap as mocap
 
 FOOT_STRIKE = "Foot Strike"
@@ -97,17 +98,12 @@ class SequenceEventChecker(_BaseEventChecker):
         Returns:
             A list of incorrect time slices.
         """
-        incorrect_times = []
-        last_label = None
-        last_time = None
-        for i, label in enumerate(events[self._LABEL_COLUMN]):
-            time = events[self._TIME_COLUMN].iloc[i]
-            if label == last_label:
-                incorrect_times.append((last_time, time))
+        labels = pd.factorize(events[self._LABEL_COLUMN])[0]
+        times = events[self._TIME_COLUMN].to_numpy()
 
-            last_time = time
-            last_label = label
-        return incorrect_times
+        # positions where the label equals the label of the previous event
+        repeated = np.flatnonzero(labels[1:] == labels[:-1])
+        return list(zip(times[repeated].tolist(), times[repeated + 1].tolist()))
 
     def _check_contexts(self, events: pd.DataFrame) -> list[tuple]:
         """Check sequence of contexts of events.
@@ -124,23 +120,17 @@ class SequenceEventChecker(_BaseEventChecker):
         Returns:
             A list of incorrect time slices.
         """
-        incorrect_times = []
-        # Check the occurrence of the context in windows of 3 events.
-        for i in range(len(events) - 3):
-            max_occurance = (
-                events[self._CONTEXT_COLUMN].iloc[i : i + 3].value_counts().max()
-            )
-
-            # If the context occurs more than twice in the window, it is incorrect.
-            if max_occurance > 2:
-                incorrect_times.append(
-                    (
-                        events[self._TIME_COLUMN].iloc[i],
-                        events[self._TIME_COLUMN].iloc[i + 3],
-                    )
-                )
+        contexts = pd.factorize(events[self._CONTEXT_COLUMN])[0]
+        times = events[self._TIME_COLUMN].to_numpy()
 
-        return incorrect_times
+        # Check the occurrence of the context in windows of 3 events.
+        # If the context occurs more than twice in the window, it is incorrect.
+        n_windows = max(len(events) - 3, 0)
+        same_context = contexts[1:] == contexts[:-1]
+        incorrect = np.flatnonzero(
+            same_context[:n_windows] & same_context[1 : n_windows + 1]
+        )
+        return list(zip(times[incorrect].tolist(), times[incorrect + 3].tolist()))
 
 
 class _BaseEventDetection(ABC):
@@ -150,6 +140,11 @@ class _BaseEventDetection(ABC):
     which makes them interchangeable.
     """
 
+    _TIME_COLUMN = io._EventInputFileReader.COLUMN_TIME
+    _LABEL_COLUMN = io._EventInputFileReader.COLUMN_LABEL
+    _CONTEXT_COLUMN = io._EventInputFileReader.COLUMN_CONTEXT
+    _ICON_COLUMN = io._EventInputFileReader.COLUMN_ICON
+
     def __init__(self, configs: mapping.MappingConfigs):
         """Initializes a new instance of the BaseEventDetection class.
 
@@ -170,6 +165,73 @@ class _BaseEventDetection(ABC):
         """
         raise NotImplementedError
 
+    def _create_data_frame(
+        self, times: np.ndarray, context: str, label: str
+    ) -> pd.DataFrame:
+        """Creates a DataFrame from the detected events.
+
+
+        Args:
+            times: The detected event times.
+            context: The context of the detected events.
+            label: The label of the detected events.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing the detected events.
+        """
+        contexts = [context] * len(times)
+        labels = [label] * len(times)
+        icons = [1 if label == FOOT_STRIKE else 2] * len(times)
+
+        table = {
+            self._TIME_COLUMN: times,
+            self._LABEL_COLUMN: labels,
+            self._CONTEXT_COLUMN: contexts,
+            self._ICON_COLUMN: icons,
+        }
+        events = pd.DataFrame.from_dict(table)
+        return events
+
+    @staticmethod
+    def _fill_gaps(values: np.ndarray, max_gap: int) -> tuple[np.ndarray, list[tuple]]:
+        """Fills short gaps and finds the sections between long gaps.
+
+        Gaps up to max_gap frames inside the signal are linearly interpolated.
+        Longer gaps, as well as gaps at the start or end of the signal, are kept.
+
+        Args:
+            values: The signal with possible gaps (NaN).
+            max_gap: The max length in frames of the gaps to fill.
+
+        Returns:
+            np.ndarray: The signal with filled short gaps.
+            list[tuple]: The start and end indices of the sections without gaps.
+        """
+        n_frames = len(values)
+        starts, lengths = ga_math.find_nan_runs(values)
+        ends = starts + lengths
+        short = (lengths <= max_gap) & (starts > 0) & (ends < n_frames)
+
+        if short.any():
+            values = values.copy()
+            short_lengths = lengths[short]
+            # run-length decoding of the gap indices
+            offsets = starts[short] - (np.cumsum(short_lengths) - short_lengths)
+            gap_index = np.repeat(offsets, short_lengths) + np.arange(
+                short_lengths.sum()
+            )
+            valid_index = np.flatnonzero(~np.isnan(values))
+            values[gap_index] = np.interp(gap_index, valid_index, values[valid_index])
+
+        section_starts = np.concatenate(([0], ends[~short]))
+        section_ends = np.concatenate((starts[~short], [n_frames]))
+        sections = [
+            (start, end)
+            for start, end in zip(section_starts, section_ends)
+            if end > start
+        ]
+        return values, sections
+
 
 class MarkerEventDetection(_BaseEventDetection):
     """A class for detecting events using marker data.
@@ -178,10 +240,9 @@ class MarkerEventDetection(_BaseEventDetection):
     The algorithm is based on the paper by Zeni et al. (2008).
     """
 
-    _TIME_COLUMN = io._EventInputFileReader.COLUMN_TIME
-    _LABEL_COLUMN = io._EventInputFileReader.COLUMN_LABEL
-    _CONTEXT_COLUMN = io._EventInputFileReader.COLUMN_CONTEXT
-    _ICON_COLUMN = io._EventInputFileReader.COLUMN_ICON
+    _MIN_STRIDE_FREQUENCY = 0.3
+    _MAX_STRIDE_FREQUENCY = 3.0
+    _STRIDE_DISTANCE_RATIO = 0.7
 
     def __init__(self, configs: mapping.MappingConfigs, **kwargs):
         """Initializes a new instance of the MarkerEventDetection class.
@@ -190,13 +251,30 @@ class MarkerEventDetection(_BaseEventDetection):
             configs: The mapping configurations.
             height: The height of peaks for events. Default = None
             threshold: The threshold for detecting events. Default = None
-            distance: The min distance in frames between events. Default = None
+            distance: The min distance in frames between events. If "auto", the
+                distance is derived from the dominant stride frequency of the
+                trial. Default = None
             rel_height: The relative height of peak for events. Default = 0.5
+            max_gap: The max length in frames of marker gaps which are filled by
+                interpolation. Longer gaps split the detection. Default = 10
+            window: The length in frames of the windows in which the signal is
+                normalised and searched for peaks. If None, the whole signal is
+                processed at once. Default = None
+            overlap: The overlap in frames between consecutive windows.
+                Default = window // 4
         """
         self._height = kwargs.get("height", None)
         self._threshold = kwargs.get("threshold", None)
         self._distance = kwargs.get("distance", None)
         self._rel_height = kwargs.get("rel_height", 0.5)
+        self._max_gap = kwargs.get("max_gap", 10)
+        self._window = kwargs.get("window", None)
+        self._overlap = kwargs.get("overlap", None)
+        if self._window is not None:
+            if self._overlap is None:
+                self._overlap = self._window // 4
+            if not 0 <= self._overlap < self._window:
+                raise ValueError("Overlap must be smaller than the window.")
         super().__init__(configs)
 
     def detect_events(self, trial: model.Trial) -> pd.DataFrame:
@@ -222,10 +300,16 @@ class MarkerEventDetection(_BaseEventDetection):
             l_heel, l_toe, r_heel, r_toe, sacrum, scarum, trial
         )
 
-        l_hs_times = self._detect_events(scarum, l_heel, False)
-        r_hs_times = self._detect_events(scarum, r_heel, False)
-        l_to_times = self._detect_events(scarum, l_toe, True)
-        r_to_times = self._detect_events(scarum, r_toe, True)
+        if self._distance == "auto":
+            rate = trial.get_data(model.DataCategory.MARKERS).attrs["rate"]
+            distance = self._estimate_distance(scarum, l_heel, rate)
+        else:
+            distance = self._distance
+
+        l_hs_times = self._detect_events(scarum, l_heel, False, distance)
+        r_hs_times = self._detect_events(scarum, r_heel, False, distance)
+        l_to_times = self._detect_events(scarum, l_toe, True, distance)
+        r_to_times = self._detect_events(scarum, r_toe, True, distance)
 
         l_hs_events = self._create_data_frame(l_hs_times, "Left", FOOT_STRIKE)
         r_hs_events = self._create_data_frame(r_hs_times, "Right", FOOT_STRIKE)
@@ -322,60 +406,272 @@ class MarkerEventDetection(_BaseEventDetection):
         else:
             return [1, 1, 1]
 
+    def _estimate_distance(
+        self, sacrum: xr.DataArray, heel: xr.DataArray, rate: float
+    ) -> int:
+        """Estimates the min distance between events from the stride frequency.
+
+        The dominant frequency of the heel to sacrum distance corresponds to
+        the stride frequency. The min distance is set to 70 % of a stride,
+        leaving room for stride to stride variability.
+
+        Args:
+            sacrum: The projected sacrum point.
+            heel: The projected heel point.
+            rate: The sampling rate of the markers.
+
+        Returns:
+            int: The min distance in frames between events.
+        """
+        signal, _ = self._fill_gaps(
+            (heel - sacrum).sel(axis="x").to_numpy(), self._max_gap
+        )
+        signal = np.nan_to_num(signal - np.nanmean(signal))
+
+        # zero padding for a finer frequency resolution on short trials
+        n_fft = 2 ** int(np.ceil(np.log2(len(signal) * 4)))
+        spectrum = np.abs(np.fft.rfft(signal, n=n_fft))
+        frequencies = np.fft.rfftfreq(n_fft, d=1 / rate)
+        in_band = (frequencies >= self._MIN_STRIDE_FREQUENCY) & (
+            frequencies <= self._MAX_STRIDE_FREQUENCY
+        )
+        stride_frequency = frequencies[in_band][np.argmax(spectrum[in_band])]
+        return max(int(self._STRIDE_DISTANCE_RATIO * rate / stride_frequency), 1)
+
     def _detect_events(
-        self, sacrum: xr.DataArray, point: xr.DataArray, toe_off: bool
+        self,
+        sacrum: xr.DataArray,
+        point: xr.DataArray,
+        toe_off: bool,
+        distance: int | None = None,
     ) -> np.ndarray:
         """Detects the events in the trial using projected points.
+
+        Short marker gaps are filled by interpolation. The detection is split
+        at longer gaps, so that no events are detected inside a gap.
+
         Args:
             sacrum: The projected sacrum point.
             point: The projected point to detect the events for.
             toe_off: True if the event is toe off, False otherwise.
+            distance: The min distance in frames between events.
 
         Returns:
             np.ndarray: The detected event times.
         """
         if toe_off:
-            distance = sacrum - point
+            signal = sacrum - point
         else:
-            distance = point - sacrum
-        distance = distance.sel(axis="x").meca.normalize().meca.center()
-        index, heights = sp.signal.find_peaks(
-            distance.to_numpy(),
-            height=self._height,
-            threshold=self._threshold,
-            distance=self._distance,
-            rel_height=self._rel_height,
-        )
+            signal = point - sacrum
+        signal = signal.sel(axis="x")
+        filled, sections = self._fill_gaps(signal.to_numpy(), self._max_gap)
+        signal = signal.copy(data=filled)
+
+        indices = [np.empty(0, dtype=int)]
+        for start, end in sections:
+            for chunk_start, chunk_end, core_start, core_end in self._get_chunks(
+                start, end
+            ):
+                chunk = signal.isel(time=slice(chunk_start, chunk_end))
+                chunk = self._normalise(chunk)
+                index, heights = sp.signal.find_peaks(
+                    chunk.to_numpy(),
+                    height=self._height,
+                    threshold=self._threshold,
+                    distance=distance,
+                    rel_height=self._rel_height,
+                )
+                index = index + chunk_start
+                # only keep peaks in the core of the chunk to avoid duplicates
+                indices.append(index[(index >= core_start) & (index < core_end)])
 
         # take smaller peaks if toe_off, larger peaks if heel_strike
-
+        index = np.concatenate(indices)
         times = point[:, index].coords["time"].values
 
         return times
 
-    def _create_data_frame(
-        self, times: np.ndarray, context: str, label: str
-    ) -> pd.DataFrame:
-        """Creates a DataFrame from the detected events.
+    @staticmethod
+    def _normalise(signal: xr.DataArray) -> xr.DataArray:
+        """Normalises and centres the signal for the peak detection.
 
+        The signal is normalised to its absolute maximum, since sections
+        between gaps and windows of the signal can lie mostly below zero
+        and the sign of the signal would otherwise be flipped.
 
         Args:
-            times: The detected event times.
-            context: The context of the detected events.
-            label: The label of the detected events.
+            signal: The signal to normalise.
+
+        Returns:
+            xr.DataArray: The normalised and centred signal.
+        """
+        return signal.meca.normalize(ref=abs(signal).max(dim="time")).meca.center()
+
+    def _get_chunks(self, start: int, end: int) -> list[tuple[int, int, int, int]]:
+        """Splits a section of the signal into overlapping windows.
+
+        The cores of the windows tile the section without overlap, so that every
+        frame belongs to exactly one window core.
+
+        Args:
+            start: The start index of the section.
+            end: The end index of the section.
+
+        Returns:
+            list[tuple]: The start, end, core start and core end of each window.
+        """
+        if self._window is None or end - start <= self._window:
+            return [(start, end, start, end)]
+
+        step = self._window - self._overlap
+        half_overlap = self._overlap // 2
+        chunks = []
+        chunk_start = start
+        core_start = start
+        while True:
+            chunk_end = min(chunk_start + self._window, end)
+            if chunk_end == end:
+                chunks.append((chunk_start, chunk_end, core_start, end))
+                break
+            core_end = chunk_end - (self._overlap - half_overlap)
+            chunks.append((chunk_start, chunk_end, core_start, core_end))
+            chunk_start += step
+            core_start = core_end
+        return chunks
+
+
+class VelocityEventDetection(_BaseEventDetection):
+    """A class for detecting events using foot velocities.
+
+    This class provides a method to detect events based on the velocities of the
+    heel and toe markers. The algorithm is based on the paper by
+    O'Connor et al. (2007). Since it does not rely on the sacrum as a reference,
+    it is independent of the walking direction and suited for overground trials.
+
+    Foot off is detected at the peaks of the vertical foot centre velocity.
+    Foot strike is detected at the first upward zero crossing of the vertical
+    heel velocity following its trough, as long as the horizontal heel
+    velocity has dropped.
+
+    Short marker gaps are filled by interpolation before the velocities are
+    calculated. Longer gaps stay missing, so that no events are detected
+    inside or next to them.
+    """
+
+    def __init__(self, configs: mapping.MappingConfigs, **kwargs):
+        """Initializes a new instance of the VelocityEventDetection class.
+
+        Args:
+            configs: The mapping configurations.
+            height: The min height of the velocity peaks relative to the
+                maximal velocity. Default = 0.5
+            deceleration: The max horizontal heel velocity at a foot strike
+                relative to the maximal horizontal heel velocity. Default = 0.5
+            distance: The min distance in frames between events. Default = None
+            max_gap: The max length in frames of marker gaps which are filled by
+                interpolation. Default = 10
+        """
+        self._height = kwargs.get("height", 0.5)
+        self._deceleration = kwargs.get("deceleration", 0.5)
+        self._distance = kwargs.get("distance", None)
+        self._max_gap = kwargs.get("max_gap", 10)
+        super().__init__(configs)
+
+    def detect_events(self, trial: model.Trial) -> pd.DataFrame:
+        """Detects the events in the trial using foot velocities.
+
+        Args:
+            trial: The trial for which to detect the events.
 
         Returns:
             pd.DataFrame: A DataFrame containing the detected events.
         """
-        contexts = [context] * len(times)
-        labels = [label] * len(times)
-        icons = [1 if label == FOOT_STRIKE else 2] * len(times)
+        markers = trial.get_data(model.DataCategory.MARKERS)
+        rate = markers.attrs["rate"]
+        times = markers.coords["time"].values
 
-        table = {
-            self._TIME_COLUMN: times,
-            self._LABEL_COLUMN: labels,
-            self._CONTEXT_COLUMN: contexts,
-            self._ICON_COLUMN: icons,
-        }
-        events = pd.DataFrame.from_dict(table)
+        l_heel = mocap.get_marker_data(
+            trial, self._configs, mapping.MappedMarkers.L_HEEL
+        )
+        r_heel = mocap.get_marker_data(
+            trial, self._configs, mapping.MappedMarkers.R_HEEL
+        )
+        l_toe = mocap.get_marker_data(trial, self._configs, mapping.MappedMarkers.L_TOE)
+        r_toe = mocap.get_marker_data(trial, self._configs, mapping.MappedMarkers.R_TOE)
+
+        # velocities of all four markers in one pass (marker, axis, time)
+        points = np.stack(
+            [l_heel.to_numpy(), l_toe.to_numpy(), r_heel.to_numpy(), r_toe.to_numpy()]
+        )
+        # long gaps stay missing and are spread by one frame by the gradient
+        points = np.stack(
+            [
+                [self._fill_gaps(values, self._max_gap)[0] for values in point]
+                for point in points
+            ]
+        )
+        velocities = np.gradient(points, 1 / rate, axis=-1)
+
+        l_hs_index = self._detect_foot_strikes(velocities[0])
+        r_hs_index = self._detect_foot_strikes(velocities[2])
+        l_to_index = self._detect_foot_offs(velocities[0], velocities[1])
+        r_to_index = self._detect_foot_offs(velocities[2], velocities[3])
+
+        l_hs_events = self._create_data_frame(times[l_hs_index], "Left", FOOT_STRIKE)
+        r_hs_events = self._create_data_frame(times[r_hs_index], "Right", FOOT_STRIKE)
+        l_to_events = self._create_data_frame(times[l_to_index], "Left", FOOT_OFF)
+        r_to_events = self._create_data_frame(times[r_to_index], "Right", FOOT_OFF)
+
+        events = pd.concat([l_hs_events, r_hs_events, l_to_events, r_to_events])
+        events = events.sort_values(by=self._TIME_COLUMN, ascending=True).reset_index(
+            drop=True
+        )
         return events
+
+    def _detect_foot_strikes(self, heel_velocity: np.ndarray) -> np.ndarray:
+        """Detects the foot strikes based on the heel velocity.
+
+        Args:
+            heel_velocity: The velocity of the heel marker with shape (axis, time).
+
+        Returns:
+            np.ndarray: The frame indices of the foot strikes.
+        """
+        vertical = heel_velocity[2]
+        horizontal = np.hypot(heel_velocity[0], heel_velocity[1])
+
+        troughs, _ = sp.signal.find_peaks(
+            -vertical,
+            height=self._height * np.nanmax(-vertical),
+            distance=self._distance,
+        )
+        crossings = np.flatnonzero((vertical[:-1] < 0) & (vertical[1:] >= 0)) + 1
+
+        # first upward zero crossing after each trough
+        next_crossing = np.searchsorted(crossings, troughs, side="right")
+        index = crossings[next_crossing[next_crossing < len(crossings)]]
+        index = np.unique(index)
+
+        # the foot has to be decelerated at the time of the strike
+        decelerated = horizontal[index] < self._deceleration * np.nanmax(horizontal)
+        return index[decelerated]
+
+    def _detect_foot_offs(
+        self, heel_velocity: np.ndarray, toe_velocity: np.ndarray
+    ) -> np.ndarray:
+        """Detects the foot offs based on the foot centre velocity.
+
+        Args:
+            heel_velocity: The velocity of the heel marker with shape (axis, time).
+            toe_velocity: The velocity of the toe marker with shape (axis, time).
+
+        Returns:
+            np.ndarray: The frame indices of the foot offs.
+        """
+        vertical = (heel_velocity[2] + toe_velocity[2]) / 2
+        index, _ = sp.signal.find_peaks(
+            vertical,
+            height=self._height * np.nanmax(vertical),
+            distance=self._distance,
+        )
+        return index
@@ -3,6 +3,7 @@ from abc import ABC, abstractmethod
 import numpy as np
 import pandas as pd
 import xarray as xr
+from numpy.typing import DTypeLike
 
 import gaitalytics.events as events
 import gaitalytics.io as io
@@ -18,13 +19,16 @@ class FeatureCalculation(ABC):
     This class provides a common interface for calculating features.
     """
 
-    def __init__(self, config: mapping.MappingConfigs):
+    def __init__(self, config: mapping.MappingConfigs, dtype: DTypeLike | None = None):
         """Initializes a new instance of the BaseFeatureCalculation class.
 
         Args:
             config: The mapping configuration to use for the feature calculation.
+            dtype: The floating data type of the features.
+                Default = None, the data type of the trial data
         """
         self._config = config
+        self._dtype = dtype
 
     @abstractmethod
     def calculate(self, trial: model.TrialCycles) -> xr.DataArray:
@@ -38,19 +42,51 @@ class FeatureCalculation(ABC):
         """
         raise NotImplementedError
 
+    def _get_dtype(self, trial: model.TrialCycles) -> np.dtype:
+        """Gets the data type of the features.
+
+        Args:
+            trial: The trial for which the features are calculated.
+
+        Returns:
+            The configured data type or the common floating type of the data
+            of the first cycle.
+        """
+        if self._dtype is not None:
+            return np.dtype(self._dtype)
+        for context_cycles in trial.get_all_cycles().values():
+            # only the first cycle is created, e.g. of a lazy segmented trial
+            cycle = next(iter(context_cycles.values()), None)
+            if cycle is None or not cycle.get_all_data():
+                continue
+            dtype = np.result_type(
+                *[data.dtype for data in cycle.get_all_data().values()]
+            )
+            return dtype if np.issubdtype(dtype, np.floating) else np.dtype(float)
+        return np.dtype(float)
+
 
 class _CycleFeaturesCalculation(FeatureCalculation, ABC):
+    # whether the features are calculated from the events of the cycles
+    _REQUIRES_EVENTS = True
+
     def calculate(self, trial: model.TrialCycles) -> xr.DataArray:
         """Calculate the features for a trial.
 
         Calls the _calculate method for each cycle in the trial and combines
-        results into a single DataArray.
+        results into a single DataArray. Cycles flagged as not used
+        are skipped. The features have the data type of the trial data.
 
         Args:
             trial: The trial for which to calculate the features.
 
         Returns:
             An xarray DataArray containing the calculated features.
+
+        Raises:
+            ValueError: If all cycles are flagged as not used or the features
+                require events and a cycle does not have events, e.g. the
+                time-normalised cycles of api.segment_and_normalise_trial.
         """
         results: list = []
 
@@ -58,19 +94,34 @@ class _CycleFeaturesCalculation(FeatureCalculation, ABC):
         for context, context_cycles in trial.get_all_cycles().items():
             context_results: list = []
             cycle_dim: list[int] = []
-            for cycle_id, cycle in context_cycles.items():
+            for cycle_id in context_cycles:
+                if not trial.get_cycle_attrs(context, cycle_id).get("used", 1):
+                    continue
+                cycle = context_cycles[cycle_id]
+                if self._REQUIRES_EVENTS and cycle.events is None:
+                    raise ValueError(
+                        f"{type(self).__name__} requires the events of the cycles, "
+                        f"but cycle {context} nr. {cycle_id} does not have events. "
+                        "Calculate the features on a segmented trial "
+                        "before time normalisation."
+                    )
                 feature = self._calculate(cycle)
                 context_results.append(feature)
                 cycle_dim.append(cycle_id)
 
+            if not context_results:
+                continue
             context_dim.append(context)
             context_results = xr.concat(
                 context_results, pd.Index(cycle_dim, name="cycle")
             )
             results.append(context_results)
 
+        if not results:
+            raise ValueError("All cycles are flagged as not used.")
         result = xr.concat(results, pd.Index(context_dim, name="context"))
-        return result
+        # features from event times are calculated with float64
+        return result.astype(self._get_dtype(trial), copy=False)
 
     @abstractmethod
     def _calculate(self, trial: model.Trial) -> xr.DataArray:
@@ -259,6 +310,8 @@ class TimeSeriesFeatures(_CycleFeaturesCalculation):
     - std
     """
 
+    _REQUIRES_EVENTS = False
+
     def _calculate(self, trial: model.Trial) -> xr.DataArray:
         """Calculate the time series features for a trial.
 
@@ -333,6 +386,8 @@ class PhaseTimeSeriesFeatures(TimeSeriesFeatures):
         - swing_amplitude
     """
 
+    _REQUIRES_EVENTS = True
+
     def _calculate(self, trial: model.Trial) -> xr.DataArray:
         """Calculate the time series features for a trial by phase.
 
@@ -367,12 +422,10 @@ class PhaseTimeSeriesFeatures(TimeSeriesFeatures):
         event_ipsi_fo = event_ipsi.loc[
             event_table[io.C3dEventInputFileReader.COLUMN_LABEL] == events.FOOT_OFF  # type: ignore
         ]
-        fo_time = round(event_ipsi_fo.time.values[0], 4)
-        start_time = analysis_data.coords["time"].values[0]
-        end_time = analysis_data.coords["time"].values[-1]
+        fo_time = event_ipsi_fo.time.values[0]
 
-        stand_trial = self._create_phase_trial(trial, slice(start_time, fo_time))
-        swing_trial = self._create_phase_trial(trial, slice(fo_time, end_time))
+        stand_trial = self._create_phase_trial(trial, None, fo_time)
+        swing_trial = self._create_phase_trial(trial, fo_time, None)
         stand_features = super()._calculate(stand_trial)
         stand_features.assign_coords(
             feature=[f"{f}_swing" for f in stand_features.feature.values]
@@ -385,16 +438,32 @@ class PhaseTimeSeriesFeatures(TimeSeriesFeatures):
         return xr.concat([stand_features, swing_features], dim="feature")
 
     @staticmethod
-    def _create_phase_trial(trial: model.Trial, time_slice: slice):
+    def _create_phase_trial(
+        trial: model.Trial, start_time: float | None, end_time: float | None
+    ):
         """Create a trial containing only the data for a specific phase.
 
+        The frames at the start and end time are included in the phase.
+
         Args:
             trial: The trial to create the phase trial from.
-            time_slice: The time slice to extract the phase data from.
+            start_time: The start time of the phase.
+                If None, the phase starts with the trial.
+            end_time: The end time of the phase.
+                If None, the phase ends with the trial.
         """
+        time_index = trial.get_time_index()
         phase_trial = model.Trial()
         for data_category, data in trial.get_all_data().items():
-            phase_trial.add_data(data_category, data.sel(time=time_slice))
+            start_frame = None
+            end_frame = None
+            if start_time is not None:
+                start_frame = time_index.get_frames(data_category, start_time)
+            if end_time is not None:
+                end_frame = time_index.get_frames(data_category, end_time) + 1
+            phase_trial.add_data(
+                data_category, data.isel(time=slice(start_frame, end_frame))
+            )
         return phase_trial
 
 
@@ -530,12 +599,15 @@ class SpatialFeatures(_PointDependentFeature):
         """
 
         event_times = self.get_event_times(trial.events)
+        event_frames = trial.get_time_index().get_frames(
+            model.DataCategory.MARKERS, np.array(event_times)
+        )
 
-        ipsi_heel = self._get_marker_data(trial, ipsi_marker).sel(
-            time=event_times[-1], method="nearest"
+        ipsi_heel = self._get_marker_data(trial, ipsi_marker).isel(
+            time=event_frames[-1]
         )
-        contra_heel = self._get_marker_data(trial, contra_marker).sel(
-            time=event_times[-1], method="nearest"
+        contra_heel = self._get_marker_data(trial, contra_marker).isel(
+            time=event_frames[-1]
         )
         progress_axis = self._get_progression_vector(trial)
         progress_axis = linalg.normalize_vector(progress_axis)
@@ -562,13 +634,16 @@ class SpatialFeatures(_PointDependentFeature):
         """
 
         event_times = self.get_event_times(trial.events)
+        event_frames = trial.get_time_index().get_frames(
+            model.DataCategory.MARKERS, np.array(event_times)
+        )
         contra_heel = self._get_marker_data(trial, contra_marker)
-        contra_vector = contra_heel.sel(
-            time=event_times[2], method="nearest"
-        ) - contra_heel.sel(time=event_times[0], method="nearest")
+        contra_vector = contra_heel.isel(time=event_frames[2]) - contra_heel.isel(
+            time=event_frames[0]
+        )
 
-        ipsi_heel = self._get_marker_data(trial, ipsi_marker).sel(
-            time=event_times[-1], method="nearest"
+        ipsi_heel = self._get_marker_data(trial, ipsi_marker).isel(
+            time=event_frames[-1]
         )
 
         norm_vector = linalg.normalize_vector(contra_vector)
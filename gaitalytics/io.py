@@ -9,6 +9,7 @@ import numpy as np
 import pandas as pd
 import pyomeca
 import xarray as xr
+from numpy.typing import DTypeLike
 
 import gaitalytics.mapping as mapping
 
@@ -253,18 +254,26 @@ class _PyomecaInputFileReader(_BaseFileHandler):
     """
 
     def __init__(
-        self, file_path: Path, pyomeca_class: type[pyomeca.Markers | pyomeca.Analogs]
+        self,
+        file_path: Path,
+        pyomeca_class: type[pyomeca.Markers | pyomeca.Analogs],
+        dtype: DTypeLike | None = None,
     ):
         """Initializes a new instance of the MarkersInputFileReader class.
 
         Determines the file format and uses the appropriate pyomeca class
-        to read the data. Further it converts the data to absolute time if needed.
+        to read the data. Further it converts the data to absolute time
+        and to the data type if needed.
 
         Args:
             file_path: The path to the marker data file.
             pyomeca_class:
                 The pyomeca class to use for reading the data.
+            dtype: The floating data type of the values, i.e. np.float32 to
+                halve the memory. Default = None, the type of pyomeca (float64)
 
+        Raises:
+            ValueError: If the data type is not floating.
         """
         file_ext = file_path.suffix
         if file_ext == ".c3d" and (
@@ -289,6 +298,11 @@ class _PyomecaInputFileReader(_BaseFileHandler):
             frame_rate = data.attrs["rate"]
             data = self._to_absolute_time(data, first_frame, frame_rate)
 
+        if dtype is not None:
+            if not np.issubdtype(dtype, np.floating):
+                raise ValueError(f"Unsupported data type: {dtype}")
+            data = data.astype(dtype, copy=False)
+
         self._data = data
         super().__init__(file_path)
 
@@ -314,14 +328,15 @@ class MarkersInputFileReader(_PyomecaInputFileReader):
     Uses the pyomeca.Markers class to read marker data from a file.
     """
 
-    def __init__(self, file_path: Path):
+    def __init__(self, file_path: Path, dtype: DTypeLike | None = None):
         """Initializes a new instance of the MarkersInputFileReader class.
 
         Args:
             file_path: The path to the marker data file.
+            dtype: The floating data type of the values. Default = None, float64
 
         """
-        super().__init__(file_path, pyomeca.Markers)
+        super().__init__(file_path, pyomeca.Markers, dtype)
         self.data = self._data.drop_sel(axis="ones")
 
     def get_markers(self) -> xr.DataArray:
@@ -339,14 +354,15 @@ class AnalogsInputFileReader(_PyomecaInputFileReader):
     Uses the pyomeca.Analogs class to read analog data from a file.
     """
 
-    def __init__(self, file_path: Path):
+    def __init__(self, file_path: Path, dtype: DTypeLike | None = None):
         """Initializes a new instance of the AnalogsInputFileReader class.
 
         Args:
             file_path: The path to the analog data file.
+            dtype: The floating data type of the values. Default = None, float64
 
         """
-        super().__init__(file_path, pyomeca.Analogs)
+        super().__init__(file_path, pyomeca.Analogs, dtype)
 
     def get_analogs(self) -> xr.DataArray:
         """Gets the analog data from the input file.
@@ -360,12 +376,18 @@ class AnalogsInputFileReader(_PyomecaInputFileReader):
 class AnalysisInputReader(_PyomecaInputFileReader):
     """Read out data from modelled data form different input format."""
 
-    def __init__(self, file_path: Path, configs: mapping.MappingConfigs):
+    def __init__(
+        self,
+        file_path: Path,
+        configs: mapping.MappingConfigs,
+        dtype: DTypeLike | None = None,
+    ):
         """Initializes a new instance of the AnalysisInputReader class.
 
         Args:
             file_path: The path to the input file.
             configs: The mapping configurations.
+            dtype: The floating data type of the values. Default = None, float64
         """
         extension = file_path.suffix
         pyomeca_class: type[pyomeca.Markers | pyomeca.Analogs]
@@ -377,7 +399,7 @@ class AnalysisInputReader(_PyomecaInputFileReader):
             raise NotImplementedError("STO file format is not supported for analogs")
         else:
             raise ValueError(f"Unsupported file extension: {extension}")
-        super().__init__(file_path, pyomeca_class)
+        super().__init__(file_path, pyomeca_class, dtype)
         self.configs = configs
 
         if pyomeca_class == pyomeca.Markers:
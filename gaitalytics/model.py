@@ -1,10 +1,13 @@
 """This module provides classes for structuring, storing and loading trial data."""
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Mapping
 from enum import Enum
 from pathlib import Path
 
 import h5netcdf as netcdf
+import numpy as np
 import pandas as pd
 import xarray as xr
 
@@ -26,6 +29,74 @@ class DataCategory(Enum):
     ANALYSIS: str = "analysis"
 
 
+class TimeBaseIndex:
+    """Maps times to frame indices for the data categories of a trial.
+
+    The start time, rate and number of frames of each category are stored once.
+    A time is converted to a frame index by round((time - start) * rate)
+    instead of comparing it with the time coordinates of the data.
+    """
+
+    # tolerance in frames for floating point errors of the times
+    _TOLERANCE = 1e-6
+
+    def __init__(self, data: dict[DataCategory, xr.DataArray]):
+        """Initializes a new instance of the TimeBaseIndex class.
+
+        Args:
+            data: The data arrays of the trial.
+        """
+        self._start_times: dict[DataCategory, float] = {}
+        self._rates: dict[DataCategory, float] = {}
+        self._n_frames: dict[DataCategory, int] = {}
+        for category, array in data.items():
+            times = array.coords["time"].values
+            self._n_frames[category] = len(times)
+            self._start_times[category] = float(times[0]) if len(times) else 0.0
+            if len(times) > 1:
+                # the rate of the time coordinates, i.e. of time-normalised data
+                self._rates[category] = (len(times) - 1) / float(times[-1] - times[0])
+            else:
+                self._rates[category] = float(array.attrs.get("rate", 1))
+
+    def get_frames(
+        self,
+        category: DataCategory,
+        times: np.ndarray | float,
+        side: str = "nearest",
+    ) -> np.ndarray:
+        """Converts times into frame indices of a category.
+
+        Args:
+            category: The category of the data.
+            times: The times to convert.
+            side: "nearest" for the index of the closest frame, "left" for the
+                index of the first frame at or after the time and "right" for
+                the index after the last frame at or before the time.
+                Default = "nearest"
+
+        Returns:
+            The frame indices, clipped to the frames of the category.
+
+        Raises:
+            ValueError: If the side is not supported.
+        """
+        positions = (np.asarray(times) - self._start_times[category]) * self._rates[
+            category
+        ]
+        n_frames = self._n_frames[category]
+        match side:
+            case "nearest":
+                frames = np.clip(np.round(positions), 0, n_frames - 1)
+            case "left":
+                frames = np.clip(np.ceil(positions - self._TOLERANCE), 0, n_frames)
+            case "right":
+                frames = np.clip(np.floor(positions + self._TOLERANCE) + 1, 0, n_frames)
+            case _:
+                raise ValueError(f"Unsupported side: {side}")
+        return frames.astype(np.intp)
+
+
 class BaseTrial(ABC):
     """Abstract base class for trials.
 
@@ -61,9 +132,9 @@ class BaseTrial(ABC):
         """
         if file_path.exists():
             raise FileExistsError(f"{file_path} already exists.")
-        elif type(self) is TrialCycles and file_path.suffix:
+        elif isinstance(self, TrialCycles) and file_path.suffix:
             raise ValueError("Cannot save a segmented trial in a single file.")
-        elif type(self) is Trial and not file_path.suffix:
+        elif isinstance(self, Trial) and not file_path.suffix:
             raise ValueError("Cannot save a trial in folder")
 
         paths, data, groups = self._to_hdf5(file_path, base_group)
@@ -87,6 +158,7 @@ class Trial(BaseTrial):
         """Initializes a new instance of the Trial class."""
         self._data: dict[DataCategory, xr.DataArray] = {}
         self._events: pd.DataFrame | None = None
+        self._time_index: TimeBaseIndex | None = None
 
     @property
     def events(self) -> pd.DataFrame | None:
@@ -118,6 +190,7 @@ class Trial(BaseTrial):
             self._data[category] = xr.concat([self._data[category], data], dim="time")
         else:
             self._data[category] = data
+        self._time_index = None
 
     def get_data(self, category: DataCategory) -> xr.DataArray:
         """Gets the data from the trial.
@@ -138,6 +211,18 @@ class Trial(BaseTrial):
         """
         return self._data
 
+    def get_time_index(self) -> TimeBaseIndex:
+        """Gets the index mapping times to frames for all categories.
+
+        The index is created once and reset if data is added.
+
+        Returns:
+            The time base index of the trial.
+        """
+        if self._time_index is None:
+            self._time_index = TimeBaseIndex(self.get_all_data())
+        return self._time_index
+
     def _to_hdf5(self, file_path: Path, base_group: str | None = None):
         """Saves trial into an HDF5 file.
 
@@ -182,6 +267,110 @@ class Trial(BaseTrial):
         return paths, data, groups
 
 
+class TrialView(Trial):
+    """Represents a time slice of a trial without copying its data.
+
+    A view only holds a reference to the parent trial and the frame offsets
+    of the slice for each category. The data arrays are created on access as
+    read-only views on the buffers of the parent trial.
+    The data is copied as soon as the view gets modified.
+    """
+
+    def __init__(
+        self,
+        parent: Trial,
+        frames: dict[DataCategory, tuple[int, int]],
+        start_time: float,
+        decimals: dict[DataCategory, int],
+        attrs: dict | None = None,
+    ):
+        """Initializes a new instance of the TrialView class.
+
+        Args:
+            parent: The trial holding the data.
+            frames: The first frame index and the frame index after the last
+                frame of the slice for each category.
+            start_time: The time of the parent trial at which the slice starts.
+            decimals: The decimal places of the sampling interval
+                for each category.
+            attrs: Additional attributes added to each data array.
+                Default = None
+        """
+        super().__init__()
+        self._parent: Trial | None = parent
+        self._frames = frames
+        self._start_time = start_time
+        self._decimals = decimals
+        self._attrs = attrs if attrs is not None else {}
+
+    @property
+    def is_view(self) -> bool:
+        """Checks if the trial still references the data of its parent.
+
+        Returns:
+            True if the data is not copied yet, False otherwise.
+        """
+        return self._parent is not None
+
+    def add_data(self, category: DataCategory, data: xr.DataArray):
+        """Adds data to the trial.
+
+        The data of the parent trial is copied before.
+
+        Args:
+            category: The category of the data.
+            data: The data array to be added.
+        """
+        self.materialise()
+        super().add_data(category, data)
+
+    def get_data(self, category: DataCategory) -> xr.DataArray:
+        """Gets the data from the trial.
+
+        Args:
+            category: The category of the data.
+
+        Returns:
+            The data array. As long as the trial is a view, the array is read-only.
+        """
+        if self._parent is None:
+            return super().get_data(category)
+        start_frame, end_frame = self._frames[category]
+        return _create_time_slice(
+            self._parent.get_data(category),
+            start_frame,
+            end_frame,
+            self._start_time,
+            self._decimals[category],
+            self._attrs,
+            read_only=True,
+        )
+
+    def get_all_data(self) -> dict[DataCategory, xr.DataArray]:
+        """Gets all data from the trial.
+
+        Returns:
+            A dictionary containing the data arrays.
+        """
+        if self._parent is None:
+            return super().get_all_data()
+        return {category: self.get_data(category) for category in self._frames}
+
+    def materialise(self):
+        """Copies the data of the parent trial into the trial.
+
+        Afterward, the trial does not reference the parent trial anymore
+        and the data can be modified.
+        """
+        if self._parent is not None:
+            data = {
+                category: array.copy(deep=True)
+                for category, array in self.get_all_data().items()
+            }
+            self._parent = None
+            self._data = data
+
+
 class TrialCycles(BaseTrial):
     """Represents a segmented trial."""
 
@@ -236,6 +425,29 @@ class TrialCycles(BaseTrial):
         """
         return self._cycles[context]
 
+    def get_cycle_attrs(self, context: str, cycle_id: int) -> dict:
+        """Gets the attributes of a cycle.
+
+        The attributes contain i.e. the start and end time, the context,
+        the cycle id and the used flag of the cycle.
+
+        Args:
+            context: The context of the cycle.
+            cycle_id: The id of the cycle.
+
+        Returns:
+            A dictionary containing the attributes of the cycle.
+
+        Raises:
+            KeyError: If the cycle does not exist.
+        """
+        cycle = self.get_cycle(context, cycle_id)
+        if cycle.events is not None:
+            return dict(cycle.events.attrs)
+        for data in cycle.get_all_data().values():
+            return dict(data.attrs)
+        return {}
+
     def _to_hdf5(self, file_path: Path, base_group: str | None = None):
         """Recursively saves the segmented trial data to an HDF5 file.
 
@@ -288,6 +500,201 @@ class TrialCycles(BaseTrial):
         return paths, data, groups
 
 
+class LazyTrialCycles(TrialCycles):
+    """Represents a segmented trial which creates its cycles on access.
+
+    Only the attributes of the cycles are held. A cycle is created by the
+    cycle loader once it is accessed, and a bounded number of
+    the most recently accessed cycles is cached.
+    """
+
+    def __init__(
+        self,
+        cycle_loader: Callable[[str, int], Trial],
+        cycle_attrs: dict[str, dict[int, dict]],
+        cache_size: int = 32,
+    ):
+        """Initializes a new instance of the LazyTrialCycles class.
+
+        Args:
+            cycle_loader: A callable creating the cycle for a context and cycle id.
+            cycle_attrs: The attributes of each cycle by context and cycle id.
+            cache_size: The max number of cycles kept in memory. Default = 32
+        """
+        super().__init__()
+        self._cycle_loader = cycle_loader
+        self._cycle_attrs = cycle_attrs
+        self._cache_size = cache_size
+        self._cache: OrderedDict[tuple[str, int], Trial] = OrderedDict()
+
+    def get_cycle(self, context: str, cycle_id: int) -> Trial:
+        """Gets a cycle from the segmented trial.
+
+        The cycle is created if it is not cached.
+
+        Args:
+            context: The context of the cycle.
+            cycle_id: The id of the cycle.
+
+        Raises:
+            KeyError: If the cycle does not exist.
+        """
+        if cycle_id in self._cycles.get(context, {}):
+            return self._cycles[context][cycle_id]
+
+        key = (context, cycle_id)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        if cycle_id not in self._cycle_attrs[context]:
+            raise KeyError(cycle_id)
+        cycle = self._cycle_loader(context, cycle_id)
+        if self._cache_size > 0:
+            self._cache[key] = cycle
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return cycle
+
+    def get_all_cycles(self) -> dict[str, Mapping[int, Trial]]:  # type: ignore[override]
+        """Gets all cycles from the segmented trial.
+
+        The cycles are created while iterating over them.
+
+        Returns:
+            A nested mapping containing the cycles.
+            Whereas the key of the first dictionary is the context and the second
+            key is the cycle number.
+        """
+        contexts = list(self._cycle_attrs.keys())
+        contexts += [context for context in self._cycles if context not in contexts]
+        return {context: _LazyCycles(self, context) for context in contexts}
+
+    def get_cycles_per_context(self, context: str) -> Mapping[int, Trial]:  # type: ignore[override]
+        """Gets all cycles from the segmented trial for a specific context.
+
+        Args:
+            context: The context of the cycles.
+
+        Returns:
+            A mapping containing the cycles for the specified context.
+
+        Raises:
+            KeyError: If the context does not exist.
+        """
+        if context not in self._cycle_attrs and context not in self._cycles:
+            raise KeyError(context)
+        return _LazyCycles(self, context)
+
+    def get_cycle_attrs(self, context: str, cycle_id: int) -> dict:
+        """Gets the attributes of a cycle without creating it.
+
+        Args:
+            context: The context of the cycle.
+            cycle_id: The id of the cycle.
+
+        Returns:
+            A dictionary containing the attributes of the cycle.
+
+        Raises:
+            KeyError: If the cycle does not exist.
+        """
+        if cycle_id in self._cycles.get(context, {}):
+            return super().get_cycle_attrs(context, cycle_id)
+        return dict(self._cycle_attrs[context][cycle_id])
+
+    def _get_cycle_ids(self, context: str) -> list[int]:
+        """Gets the ids of all cycles in a context.
+
+        Args:
+            context: The context of the cycles.
+
+        Returns:
+            A list containing the cycle ids.
+        """
+        cycle_ids = list(self._cycle_attrs.get(context, {}).keys())
+        cycle_ids += [
+            cycle_id
+            for cycle_id in self._cycles.get(context, {})
+            if cycle_id not in cycle_ids
+        ]
+        return cycle_ids
+
+
+class _LazyCycles(Mapping):
+    """Read-only mapping of cycle ids to the cycles of a LazyTrialCycles context."""
+
+    def __init__(self, trial_cycles: LazyTrialCycles, context: str):
+        """Initializes a new instance of the _LazyCycles class.
+
+        Args:
+            trial_cycles: The segmented trial holding the cycles.
+            context: The context of the cycles.
+        """
+        self._trial_cycles = trial_cycles
+        self._context = context
+
+    def __getitem__(self, cycle_id: int) -> Trial:
+        return self._trial_cycles.get_cycle(self._context, cycle_id)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._trial_cycles._get_cycle_ids(self._context))
+
+    def __len__(self) -> int:
+        return len(self._trial_cycles._get_cycle_ids(self._context))
+
+
+def _create_time_slice(
+    data: xr.DataArray,
+    start_frame: int,
+    end_frame: int,
+    start_time: float,
+    decimals: int,
+    attrs: dict,
+    coords: dict | None = None,
+    read_only: bool = False,
+) -> xr.DataArray:
+    """Creates a view on a time slice of a data array.
+
+    The time of the slice is relative to the start time.
+
+    Args:
+        data: The data array to slice.
+        start_frame: The index of the first frame of the slice.
+        end_frame: The index after the last frame of the slice.
+        start_time: The time at which the slice starts.
+        decimals: The decimal places of the sampling interval.
+        attrs: Additional attributes of the slice.
+        coords: The coordinate variables of the data without the time.
+            If None, they are taken from the data. Default = None
+        read_only: True if the slice should not be writeable. Default = False
+
+    Returns:
+        The data array sharing its buffer with the sliced data array.
+    """
+    if coords is None:
+        coords = {
+            name: coord.variable
+            for name, coord in data.coords.items()
+            if name != "time"
+        }
+    times = data.coords["time"].values[start_frame:end_frame] - start_time
+    times = np.absolute(np.round(times, decimals))
+
+    values = data.variable.isel(time=slice(start_frame, end_frame)).data
+    if read_only:
+        values = values.view()
+        values.flags.writeable = False
+
+    return xr.DataArray(
+        values,
+        dims=data.dims,
+        coords={**coords, "time": times},
+        attrs={**data.attrs, **attrs},
+        name=data.name,
+    )
+
+
 def trial_from_hdf5(file_path: Path) -> Trial | TrialCycles:
     """Loads trial data from an HDF5 file.
 
@@ -1,8 +1,125 @@
 """This module provides classes for batch normalisation of gait data in a trial."""
 
+import threading
+import warnings
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from functools import partial
+from typing import ClassVar
 
+import numpy as np
+import xarray as xr
+from scipy import signal
+
+import gaitalytics.events as ga_events
+import gaitalytics.io as io
 import gaitalytics.model as model
+import gaitalytics.utils.math as ga_math
+
+
+class InterpolationWeightCache:
+    """A bounded cache of the indices and weights to interpolate cycles.
+
+    Cycles with the same number of frames share the same interpolation grid.
+    The grids are cached by input length, output length and method, and the
+    least recently used ones are evicted. The cache can be shared between
+    normalisers and threads.
+    """
+
+    _WEIGHT_FUNCTIONS: ClassVar[
+        dict[str, Callable[[int, int], np.ndarray | tuple[np.ndarray, ...]]]
+    ] = {
+        "linear": ga_math.get_linear_weights,
+        "spline": ga_math.get_spline_basis,
+    }
+
+    def __init__(self, max_size: int = 256):
+        """Initializes a new instance of the InterpolationWeightCache class.
+
+        Args:
+            max_size: The max number of cached grids. Default = 256
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[tuple[int, int, str], tuple] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_weights(
+        self, length: int, n_frames: int, method: str = "linear"
+    ) -> np.ndarray | tuple[np.ndarray, ...]:
+        """Gets the indices and weights to interpolate a cycle.
+
+        Args:
+            length: The number of frames of the cycle.
+            n_frames: The number of frames to interpolate the cycle to.
+            method: The interpolation method, "linear" for the indices and
+                weights or "spline" for the basis. Default = "linear"
+
+        Returns:
+            The read-only indices and weights or basis of the interpolation.
+
+        Raises:
+            ValueError: If the method is not supported.
+        """
+        key = (length, n_frames, method)
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            self.misses += 1
+
+        if method not in self._WEIGHT_FUNCTIONS:
+            raise ValueError(f"Unsupported method: {method}")
+        weights = self._WEIGHT_FUNCTIONS[method](length, n_frames)
+        for array in weights if isinstance(weights, tuple) else (weights,):
+            array.flags.writeable = False
+
+        with self._lock:
+            self._cache[key] = weights
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return weights
+
+    @property
+    def hit_rate(self) -> float:
+        """Gets the share of lookups served from the cache.
+
+        Returns:
+            The hit rate between 0 and 1, 0 if nothing was looked up yet.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_stats(self) -> dict:
+        """Gets the statistics of the cache for monitoring.
+
+        Returns:
+            A dictionary containing the hits, misses, hit rate,
+            size and max size of the cache.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "size": len(self._cache),
+            "max_size": self.max_size,
+        }
+
+    def clear(self):
+        """Removes all grids from the cache and resets the statistics."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# shared by all normalisers if no other cache is given
+WEIGHT_CACHE = InterpolationWeightCache()
 
 
 class BaseNormaliser(ABC):
@@ -26,21 +143,117 @@ class BaseNormaliser(ABC):
         """
         raise NotImplementedError
 
+    @staticmethod
+    def _map_arrays(
+        trial: model.Trial | model.TrialCycles,
+        func: Callable[[list[xr.DataArray]], list[xr.DataArray]],
+        categories: list[model.DataCategory] | None = None,
+    ) -> model.Trial | model.TrialCycles:
+        """Maps a function over the data arrays of all cycles of a category.
 
-class LinearTimeNormaliser(BaseNormaliser):
-    """A class for normalising data based on time.
+        Args:
+            trial: The trial to map the function over.
+            func: The function getting and returning the arrays of a category.
+            categories: The categories to map. Default = None, all categories
 
-    This class provides a method to normalise the data based on time.
-    It scales the data to the range [0, 1] based on the time.
+        Returns:
+            A new trial or segmented trial with the mapped arrays.
+        """
+        if isinstance(trial, model.TrialCycles):
+            cycles = [
+                (context, cycle_id, cycle)
+                for context, context_cycles in trial.get_all_cycles().items()
+                for cycle_id, cycle in context_cycles.items()
+            ]
+        else:
+            cycles = [(None, None, trial)]
+
+        new_cycles = [model.Trial() for _ in cycles]
+        for new_cycle, (_, _, cycle) in zip(new_cycles, cycles):
+            if cycle.events is not None:
+                new_cycle.events = cycle.events
+        all_categories = dict.fromkeys(
+            category for _, _, cycle in cycles for category in cycle.get_all_data()
+        )
+        for category in all_categories:
+            indices = [
+                index
+                for index, (_, _, cycle) in enumerate(cycles)
+                if category in cycle.get_all_data()
+            ]
+            arrays = [cycles[index][2].get_data(category) for index in indices]
+            if categories is None or category in categories:
+                arrays = func(arrays)
+            for index, array in zip(indices, arrays):
+                new_cycles[index].add_data(category, array)
+
+        if not isinstance(trial, model.TrialCycles):
+            return new_cycles[0]
+        new_trial = model.TrialCycles()
+        for (context, cycle_id, _), new_cycle in zip(cycles, new_cycles):
+            new_trial.add_cycle(context, cycle_id, new_cycle)
+        return new_trial
+
+    @staticmethod
+    def _are_stackable(arrays: list[xr.DataArray]) -> bool:
+        """Checks if the data arrays only differ in their time dimension.
+
+        Args:
+            arrays: The data arrays to check.
+
+        Returns:
+            True if the arrays can be concatenated along the time, False otherwise.
+        """
+        if not arrays:
+            return False
+        first = arrays[0]
+        if "time" not in first.dims:
+            return False
+        first_coords = {
+            name: coord.data
+            for name, coord in first.coords.variables.items()
+            if "time" not in coord.dims
+        }
+        for array in arrays[1:]:
+            if array.dims != first.dims:
+                return False
+            coords = array.coords.variables
+            for name, data in first_coords.items():
+                if name not in coords:
+                    return False
+                # segmented cycles usually share their coordinates
+                other = coords[name].data
+                if other is not data and not np.array_equal(data, other):
+                    return False
+        return True
+
+
+class _BaseTimeNormaliser(BaseNormaliser):
+    """Base class for normalisers interpolating the data to a number of frames.
+
+    The cycles of a category with equal dimensions are interpolated together.
+    Subclasses provide the interpolation of the stacked cycles.
     """
 
-    def __init__(self, n_frames: int = 100):
-        """Initializes a new instance of the LinearTimeNormaliser class.
+    def __init__(
+        self,
+        n_frames: int = 100,
+        weight_cache: InterpolationWeightCache | None = None,
+        reuse_buffers: bool = False,
+    ):
+        """Initializes a new instance of the _BaseTimeNormaliser class.
 
         Args:
             n_frames: The number of frames to time-normalise the data to.
+            weight_cache: The cache of the interpolation weights.
+                Default = None, the shared WEIGHT_CACHE
+            reuse_buffers: Whether normalise_arrays writes into buffers which
+                are reused by the next call. Default = False
         """
         self.n_frames: int = n_frames
+        self.weight_cache = weight_cache if weight_cache is not None else WEIGHT_CACHE
+        self.reuse_buffers = reuse_buffers
+        self._buffers: dict[tuple, np.ndarray] = {}
 
     def normalise(
         self, trial: model.Trial | model.TrialCycles
@@ -55,12 +268,223 @@ class LinearTimeNormaliser(BaseNormaliser):
             model.TrialCycles: A new segmented trial containing the
             time-normalised data.
         """
-        if type(trial) is model.TrialCycles:
+        if isinstance(trial, model.TrialCycles):
             trial = self._normalise_cycle(trial)
-        elif type(trial) is model.Trial:
+        elif isinstance(trial, model.Trial):
             trial = self._normalise_trial(trial)
         return trial
 
+    def normalise_arrays(
+        self,
+        trial: model.Trial | model.TrialCycles,
+        out: dict[model.DataCategory, np.ndarray] | None = None,
+    ) -> dict[model.DataCategory, xr.DataArray]:
+        """Normalises all cycles into one array per category.
+
+        No cycles and arrays per cycle are created. The values are written
+        into the given arrays or, if buffers are reused, into internal buffers
+        which are overwritten by the next call. Reused buffers must not be
+        shared between threads.
+
+        Args:
+            trial: The trial to be normalised.
+            out: The arrays to write the values of each category to, with
+                the cycles in the first dimension for a segmented trial.
+                Default = None
+
+        Returns:
+            A dictionary containing the categories as keys and the data arrays
+            as values. For a segmented trial, the arrays have the additional
+            first dimension "cycle" with the context, cycle id and the cycle
+            attributes as coordinates.
+
+        Raises:
+            ValueError: If the cycles of a category differ in other dimensions
+                than the time or an output array does not fit.
+        """
+        is_segmented = isinstance(trial, model.TrialCycles)
+        if is_segmented:
+            keys = [
+                (context, cycle_id)
+                for context, context_cycles in trial.get_all_cycles().items()
+                for cycle_id in context_cycles
+            ]
+            cycles = [trial.get_cycle(context, cycle_id) for context, cycle_id in keys]
+        else:
+            keys = []
+            cycles = [trial]
+        phases = self._get_phases(cycles) if is_segmented else None
+
+        # attributes differing between cycles become coordinates of the cycles
+        cycle_coords: dict = {}
+        if is_segmented:
+            cycle_attrs = [trial.get_cycle_attrs(*key) for key in keys]
+            cycle_coords = {
+                "context": ("cycle", [context for context, _ in keys]),
+                "cycle_id": ("cycle", [cycle_id for _, cycle_id in keys]),
+            }
+            for name in cycle_attrs[0] if cycle_attrs else []:
+                if name not in cycle_coords and all(name in a for a in cycle_attrs):
+                    cycle_coords[name] = ("cycle", [a[name] for a in cycle_attrs])
+
+        arrays = {}
+        for category in cycles[0].get_all_data():
+            category_arrays = [cycle.get_data(category) for cycle in cycles]
+            if not self._are_stackable(category_arrays):
+                raise ValueError(f"The cycles of {category} can not be stacked.")
+            first = category_arrays[0]
+            category_out = out.get(category) if out is not None else None
+            if category_out is not None and not is_segmented:
+                category_out = category_out[np.newaxis]
+            values = self._interpolate_arrays(
+                category_arrays, phases, category_out, category
+            )
+            if not is_segmented:
+                values = values[0]
+            coords = {
+                name: coord.variable
+                for name, coord in first.coords.items()
+                if "time" not in coord.dims
+            }
+            coords["time"] = np.linspace(0, 99, self.n_frames)
+            arrays[category] = xr.DataArray(
+                values,
+                dims=("cycle", *first.dims) if is_segmented else first.dims,
+                coords={**coords, **cycle_coords},
+                attrs={
+                    name: value
+                    for name, value in first.attrs.items()
+                    if name not in cycle_coords
+                },
+                name=first.name,
+            )
+        return arrays
+
+    def _interpolate_arrays(
+        self,
+        arrays: list[xr.DataArray],
+        phases: np.ndarray | None,
+        out: np.ndarray | None = None,
+        buffer_key: object = None,
+    ) -> np.ndarray:
+        """Interpolates stackable data arrays of multiple cycles at once.
+
+        Args:
+            arrays: The data arrays of the cycles.
+            phases: The relative times of the phase events per cycle or None.
+            out: The array to write the result to. Default = None
+            buffer_key: The key of the reused buffers if enabled. Default = None
+
+        Returns:
+            An array with the cycles in the first dimension.
+        """
+        axis = arrays[0].get_axis_num("time")
+        lengths = np.array([array.sizes["time"] for array in arrays])
+        ends = np.cumsum(lengths)
+        values = [array.values for array in arrays]
+
+        if self.reuse_buffers and buffer_key is not None:
+            shape = list(values[0].shape)
+            shape[axis] = int(ends[-1])
+            dtype = np.result_type(*values)
+            values = np.concatenate(
+                values,
+                axis=axis,
+                out=self._get_buffer((buffer_key, "in"), shape, dtype),
+            )
+            if out is None:
+                shape[axis] = self.n_frames
+                if not np.issubdtype(dtype, np.floating):
+                    dtype = np.dtype(float)
+                out = self._get_buffer(
+                    (buffer_key, "out"), [len(arrays), *shape], dtype
+                )
+        else:
+            values = np.concatenate(values, axis=axis)
+
+        if phases is None:
+            return self._interpolate(values, ends - lengths, ends, axis, out)
+        return self._interpolate_phases(values, ends - lengths, ends, axis, phases, out)
+
+    def _get_buffer(self, key: tuple, shape: list[int], dtype: np.dtype) -> np.ndarray:
+        """Gets a reused buffer, which grows if it is too small.
+
+        Args:
+            key: The key of the buffer.
+            shape: The shape of the requested array.
+            dtype: The data type of the requested array.
+
+        Returns:
+            An array view on the buffer.
+        """
+        size = int(np.prod(shape))
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.dtype != dtype or buffer.size < size:
+            buffer = np.empty(size, dtype=dtype)
+            self._buffers[key] = buffer
+        return buffer[:size].reshape(shape)
+
+    @abstractmethod
+    def _interpolate(
+        self,
+        values: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        axis: int,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Interpolates segments of an array to the number of frames.
+
+        Args:
+            values: The array containing the segments.
+            starts: The index of the first frame of each segment along the axis.
+            ends: The index after the last frame of each segment along the axis.
+            axis: The axis of the time.
+            out: The array to write the result to. Default = None, a new array
+
+        Returns:
+            An array with the segments in the first dimension
+            and n_frames samples on the axis.
+        """
+        raise NotImplementedError
+
+    def _interpolate_phases(
+        self,
+        values: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        axis: int,
+        phases: np.ndarray,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Interpolates segments of an array with separately normalised phases.
+
+        Args:
+            values: The array containing the segments.
+            starts: The index of the first frame of each segment along the axis.
+            ends: The index after the last frame of each segment along the axis.
+            axis: The axis of the time.
+            phases: The relative times of the phase events per segment.
+            out: The array to write the result to. Default = None, a new array
+
+        Returns:
+            An array with the segments in the first dimension
+            and n_frames samples on the axis.
+        """
+        raise NotImplementedError
+
+    def _get_phases(self, cycles: list[model.Trial]) -> np.ndarray | None:
+        """Gets the relative times of the events delimiting phases of the cycles.
+
+        Args:
+            cycles: The cycles to get the phases for.
+
+        Returns:
+            The relative times per cycle or None if the cycles are
+            normalised as a whole.
+        """
+        return None
+
     def _normalise_trial(self, trial: model.Trial) -> model.Trial:
         """Normalises the data of a Trial based on time.
 
@@ -73,7 +497,7 @@ class LinearTimeNormaliser(BaseNormaliser):
         new_trial = model.Trial()
         for data_category in trial.get_all_data():
             data = trial.get_data(data_category)
-            norm_data = data.meca.time_normalize(n_frames=self.n_frames, norm_time=True)
+            norm_data = self._normalise_arrays([data])[0]
 
             new_trial.add_data(data_category, norm_data)
         return new_trial
@@ -81,16 +505,999 @@ class LinearTimeNormaliser(BaseNormaliser):
     def _normalise_cycle(self, trial: model.TrialCycles) -> model.TrialCycles:
         """Normalises the data of a segmented Trial based on time.
 
+        The cycles of a category are interpolated together in one operation.
+
         Args:
             trial: The trial to be normalised.
 
 
         Returns: A new trial containing the time-normalised data.
         """
-        norm_cycles = model.TrialCycles()
-        for context, cycles in trial.get_all_cycles().items():
-            for cycle_id, cycle in cycles.items():
-                new_cycle = self._normalise_trial(cycle)
-                norm_cycles.add_cycle(context, cycle_id, new_cycle)
+        cycles = [
+            (context, cycle_id, cycle)
+            for context, context_cycles in trial.get_all_cycles().items()
+            for cycle_id, cycle in context_cycles.items()
+        ]
+        new_cycles = [model.Trial() for _ in cycles]
+        phases = self._get_phases([cycle for _, _, cycle in cycles])
+        categories = dict.fromkeys(
+            category for _, _, cycle in cycles for category in cycle.get_all_data()
+        )
+        for category in categories:
+            indices = [
+                index
+                for index, (_, _, cycle) in enumerate(cycles)
+                if category in cycle.get_all_data()
+            ]
+            arrays = [cycles[index][2].get_data(category) for index in indices]
+            norm_arrays = self._normalise_arrays(
+                arrays, phases[indices] if phases is not None else None
+            )
+            for index, norm_data in zip(indices, norm_arrays):
+                new_cycles[index].add_data(category, norm_data)
 
+        norm_cycles = model.TrialCycles()
+        for (context, cycle_id, _), new_cycle in zip(cycles, new_cycles):
+            norm_cycles.add_cycle(context, cycle_id, new_cycle)
         return norm_cycles
+
+    def _normalise_arrays(
+        self, arrays: list[xr.DataArray], phases: np.ndarray | None = None
+    ) -> list[xr.DataArray]:
+        """Normalises the data arrays of multiple cycles based on time.
+
+        Arrays with the same dimensions and coordinates besides the time are
+        concatenated and interpolated at once, otherwise they are normalised
+        one by one.
+
+        Args:
+            arrays: The data arrays of the cycles.
+            phases: The relative times of the phase events per cycle.
+                Default = None, the cycles are normalised as a whole
+
+        Returns:
+            The time-normalised data arrays.
+        """
+        if len(arrays) > 1 and not self._are_stackable(arrays):
+            return [
+                self._normalise_arrays(
+                    [array], phases[[index]] if phases is not None else None
+                )[0]
+                for index, array in enumerate(arrays)
+            ]
+
+        norm_values = self._interpolate_arrays(arrays, phases)
+
+        # the coordinates are equal for all cycles, create them only once
+        template = xr.DataArray(
+            norm_values[0],
+            dims=arrays[0].dims,
+            coords={
+                **{
+                    name: coord.variable
+                    for name, coord in arrays[0].coords.items()
+                    if "time" not in coord.dims
+                },
+                "time": np.linspace(0, 99, self.n_frames),
+            },
+        )
+        norm_arrays = []
+        for array, cycle_values in zip(arrays, norm_values):
+            norm_array = template.copy(deep=False, data=cycle_values)
+            norm_array.attrs = dict(array.attrs)
+            norm_array.name = array.name
+            norm_arrays.append(norm_array)
+        return norm_arrays
+
+
+class LinearTimeNormaliser(_BaseTimeNormaliser):
+    """A class for normalising data based on time.
+
+    This class provides a method to normalise the data based on time.
+    It scales the data to the range [0, 1] based on the time.
+    """
+
+    def _interpolate(
+        self,
+        values: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        axis: int,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Linearly interpolates segments of an array to the number of frames.
+
+        Args:
+            values: The array containing the segments.
+            starts: The index of the first frame of each segment along the axis.
+            ends: The index after the last frame of each segment along the axis.
+            axis: The axis of the time.
+            out: The array to write the result to. Default = None, a new array
+
+        Returns:
+            An array with the segments in the first dimension
+            and n_frames samples on the axis.
+        """
+        return ga_math.interpolate_segments(
+            values,
+            starts,
+            ends,
+            self.n_frames,
+            axis,
+            partial(self.weight_cache.get_weights, method="linear"),
+            out,
+        )
+
+
+class SplineTimeNormaliser(_BaseTimeNormaliser):
+    """A class for normalising data based on time with cubic splines.
+
+    A not-a-knot cubic spline is fitted through the frames of each cycle.
+    The fit is a matrix product with a basis shared by all cycles of the same
+    length, so all channels of these cycles are fitted at once. Since the
+    spline is a global fit, a channel with gaps is NaN for the whole cycle.
+    """
+
+    def _interpolate(
+        self,
+        values: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        axis: int,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Interpolates segments of an array with cubic splines.
+
+        Args:
+            values: The array containing the segments.
+            starts: The index of the first frame of each segment along the axis.
+            ends: The index after the last frame of each segment along the axis.
+            axis: The axis of the time.
+            out: The array to write the result to. Default = None, a new array
+
+        Returns:
+            An array with the segments in the first dimension
+            and n_frames samples on the axis.
+        """
+        return ga_math.map_equal_length_segments(
+            values, starts, ends, self.n_frames, self._fit_segments, axis, out
+        )
+
+    def _fit_segments(self, segments: np.ndarray, length: int) -> np.ndarray:
+        """Fits cubic splines to stacked segments of the same length.
+
+        Args:
+            segments: The segments with the frames on the last axis.
+            length: The number of frames of the segments.
+
+        Returns:
+            The interpolated segments with n_frames on the last axis.
+        """
+        basis = self.weight_cache.get_weights(length, self.n_frames, "spline")
+        # a single matrix product for all channels of the segments
+        fitted = segments.reshape(-1, length) @ basis.T.astype(segments.dtype)
+        return fitted.reshape(*segments.shape[:-1], self.n_frames)
+
+
+class PchipTimeNormaliser(_BaseTimeNormaliser):
+    """A class for normalising data based on time with monotone cubic curves.
+
+    The piecewise cubic Hermite interpolation (PCHIP) does not overshoot
+    between the frames of a cycle. All channels of the cycles with the same
+    length are interpolated at once and gaps stay local.
+    """
+
+    def _interpolate(
+        self,
+        values: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        axis: int,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Interpolates segments of an array with monotone cubic curves.
+
+        Args:
+            values: The array containing the segments.
+            starts: The index of the first frame of each segment along the axis.
+            ends: The index after the last frame of each segment along the axis.
+            axis: The axis of the time.
+            out: The array to write the result to. Default = None, a new array
+
+        Returns:
+            An array with the segments in the first dimension
+            and n_frames samples on the axis.
+        """
+        return ga_math.map_equal_length_segments(
+            values, starts, ends, self.n_frames, self._fit_segments, axis, out
+        )
+
+    def _fit_segments(self, segments: np.ndarray, length: int) -> np.ndarray:
+        """Fits monotone cubic curves to stacked segments of the same length.
+
+        Args:
+            segments: The segments with the frames on the last axis.
+            length: The number of frames of the segments.
+
+        Returns:
+            The interpolated segments with n_frames on the last axis.
+        """
+        # the output frames lie on the same grid as for the linear interpolation
+        lower, weights = self.weight_cache.get_weights(length, self.n_frames)
+        return ga_math.interpolate_pchip(segments, lower, weights)
+
+
+class PhaseTimeNormaliser(LinearTimeNormaliser):
+    """A class for normalising the phases of cycles separately based on time.
+
+    The phases of a cycle are delimited by events, e.g. the stance and swing
+    phase by the ipsilateral foot off. Each phase is linearly normalised to
+    its own number of frames, so the events always land on the same frame.
+    The piecewise-linear warps of all cycles are built at once.
+    """
+
+    def __init__(
+        self,
+        phase_frames: tuple[int, ...] = (60, 40),
+        event_labels: tuple[str, ...] = (ga_events.FOOT_OFF,),
+        event_contexts: tuple[str, ...] | None = None,
+        reuse_buffers: bool = False,
+    ):
+        """Initializes a new instance of the PhaseTimeNormaliser class.
+
+        Args:
+            phase_frames: The number of frames of each phase. The total is
+                the number of frames of a cycle. Default = (60, 40)
+            event_labels: The labels of the events between the phases.
+                Default = ("Foot Off",)
+            event_contexts: The contexts of the events relative to the cycle,
+                either "ipsi" or "contra". Default = None, all "ipsi"
+            reuse_buffers: Whether normalise_arrays writes into buffers which
+                are reused by the next call. Default = False
+
+        Raises:
+            ValueError: If the number of phases does not match the events,
+                if a phase has no frames or if a context is not supported.
+        """
+        if event_contexts is None:
+            event_contexts = ("ipsi",) * len(event_labels)
+        if len(phase_frames) != len(event_labels) + 1:
+            raise ValueError("There must be one phase more than events.")
+        if len(event_contexts) != len(event_labels):
+            raise ValueError("There must be a context for every event.")
+        if min(phase_frames) < 1 or sum(phase_frames) < 2:
+            raise ValueError("Every phase must have at least one frame.")
+        for event_context in event_contexts:
+            if event_context not in ("ipsi", "contra"):
+                raise ValueError(f"Unsupported context: {event_context}")
+
+        super().__init__(sum(phase_frames), reuse_buffers=reuse_buffers)
+        self.phase_frames = tuple(phase_frames)
+        self.event_labels = tuple(event_labels)
+        self.event_contexts = tuple(event_contexts)
+
+    def _normalise_trial(self, trial: model.Trial) -> model.Trial:
+        """Normalises the data of a Trial based on time.
+
+        Args:
+            trial: The trial to be normalised.
+
+        Raises:
+            TypeError: Since phases can only be normalised in cycles.
+        """
+        raise TypeError("Phases can only be normalised in a segmented trial.")
+
+    def normalise_arrays(
+        self,
+        trial: model.Trial | model.TrialCycles,
+        out: dict[model.DataCategory, np.ndarray] | None = None,
+    ) -> dict[model.DataCategory, xr.DataArray]:
+        """Normalises all cycles into one array per category.
+
+        Args:
+            trial: The segmented trial to be normalised.
+            out: The arrays to write the values of each category to.
+                Default = None
+
+        Returns:
+            A dictionary containing the categories as keys and the data arrays
+            with the additional first dimension "cycle" as values.
+
+        Raises:
+            TypeError: If the trial is not segmented.
+        """
+        if not isinstance(trial, model.TrialCycles):
+            raise TypeError("Phases can only be normalised in a segmented trial.")
+        return super().normalise_arrays(trial, out)
+
+    def _get_phases(self, cycles: list[model.Trial]) -> np.ndarray:
+        """Gets the relative times of the events delimiting phases of the cycles.
+
+        The first matching event after the previous one delimits a phase.
+
+        Args:
+            cycles: The cycles to get the phases for.
+
+        Returns:
+            The times of the cycle start, the events and the cycle end relative
+            to the cycle duration per cycle.
+
+        Raises:
+            ValueError: If a cycle does not have all events.
+        """
+        phases = np.empty((len(cycles), len(self.event_labels) + 2))
+        phases[:, 0] = 0
+        phases[:, -1] = 1
+        for index, cycle in enumerate(cycles):
+            cycle_events = cycle.events
+            if cycle_events is None:
+                raise ValueError("Trial does not have events.")
+            context = cycle_events.attrs["context"]
+            cycle_id = cycle_events.attrs["cycle_id"]
+            duration = cycle_events.attrs["end_time"] - cycle_events.attrs["start_time"]
+            times = cycle_events[io._EventInputFileReader.COLUMN_TIME].to_numpy()
+            labels = cycle_events[io._EventInputFileReader.COLUMN_LABEL].to_numpy()
+            contexts = cycle_events[io._EventInputFileReader.COLUMN_CONTEXT].to_numpy()
+
+            last_time = 0
+            for event, (label, event_context) in enumerate(
+                zip(self.event_labels, self.event_contexts)
+            ):
+                is_context = contexts == context
+                if event_context == "contra":
+                    is_context = ~is_context
+                matches = times[
+                    (labels == label)
+                    & is_context
+                    & (times > last_time)
+                    & (times < duration)
+                ]
+                if len(matches) == 0:
+                    raise ValueError(
+                        f"Missing events in segment {context} nr. {cycle_id}"
+                    )
+                last_time = matches.min()
+                phases[index, event + 1] = last_time / duration
+        return phases
+
+    def _interpolate_phases(
+        self,
+        values: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        axis: int,
+        phases: np.ndarray,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Interpolates segments of an array with separately normalised phases.
+
+        Args:
+            values: The array containing the segments.
+            starts: The index of the first frame of each segment along the axis.
+            ends: The index after the last frame of each segment along the axis.
+            axis: The axis of the time.
+            phases: The relative times of the phase events per segment.
+            out: The array to write the result to. Default = None, a new array
+
+        Returns:
+            An array with the segments in the first dimension
+            and n_frames samples on the axis.
+        """
+        # frames of the phase events in the output and input segments
+        out_knots = np.concatenate(([0], np.cumsum(self.phase_frames)))
+        out_knots[-1] = self.n_frames - 1
+        in_knots = starts[:, np.newaxis] + phases * (ends - starts - 1)[:, np.newaxis]
+
+        frames = np.arange(self.n_frames)
+        phase = np.clip(
+            np.searchsorted(out_knots, frames, side="right") - 1,
+            0,
+            len(self.phase_frames) - 1,
+        )
+        widths = out_knots[phase + 1] - out_knots[phase]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # a last phase of a single frame only contains the cycle end
+            progress = np.where(widths > 0, (frames - out_knots[phase]) / widths, 1)
+        positions = in_knots[:, phase] + progress * (
+            in_knots[:, phase + 1] - in_knots[:, phase]
+        )
+
+        lower = np.clip(
+            np.floor(positions).astype(np.intp),
+            starts[:, np.newaxis],
+            ends[:, np.newaxis] - 2,
+        )
+        return ga_math.interpolate_at(values, lower, positions - lower, axis, out)
+
+
+class DtwTimeNormaliser(BaseNormaliser):
+    """A class for registering cycles to a template with dynamic time warping.
+
+    The cycles are linearly time-normalised and then warped to the mean curve
+    of their context, which reduces the phase variability before averaging.
+    The warping paths are found on reference channels within a Sakoe-Chiba
+    band and applied to all categories. Blocks of cycles are registered in
+    parallel threads.
+    """
+
+    def __init__(
+        self,
+        channels: list[str] | None = None,
+        category: model.DataCategory = model.DataCategory.MARKERS,
+        n_frames: int = 100,
+        band: float = 0.1,
+        block_size: int = 128,
+        workers: int | None = None,
+        weight_cache: InterpolationWeightCache | None = None,
+    ):
+        """Initializes a new instance of the DtwTimeNormaliser class.
+
+        Args:
+            channels: The reference channels to find the warping paths on.
+                Reference channels with gaps are ignored.
+                Default = None, all channels of the category
+            category: The category of the reference channels.
+                Default = DataCategory.MARKERS
+            n_frames: The number of frames to time-normalise the data to.
+                Default = 100
+            band: The width of the Sakoe-Chiba band on each side of the
+                diagonal relative to the number of frames. Default = 0.1
+            block_size: The number of cycles registered at once. Default = 128
+            workers: The number of parallel threads.
+                Default = None, the default of the executor
+            weight_cache: The cache of the interpolation weights.
+                Default = None, the shared WEIGHT_CACHE
+
+        Raises:
+            ValueError: If the band is negative.
+        """
+        if band < 0:
+            raise ValueError("The band must not be negative.")
+        self.channels = channels
+        self.category = category
+        self.n_frames = n_frames
+        self.band = band
+        self.block_size = block_size
+        self.workers = workers
+        self.weight_cache = weight_cache
+
+    def normalise(
+        self, trial: model.Trial | model.TrialCycles
+    ) -> model.Trial | model.TrialCycles:
+        """Registers the cycles of the trial to the template of their context.
+
+        Args:
+            trial: The segmented trial to be registered.
+
+        Returns:
+            A new segmented trial containing the registered data.
+
+        Raises:
+            TypeError: If the trial is not segmented.
+        """
+        if not isinstance(trial, model.TrialCycles):
+            raise TypeError("Cycles can only be registered in a segmented trial.")
+        trial = LinearTimeNormaliser(self.n_frames, self.weight_cache).normalise(trial)
+
+        registered_trial = model.TrialCycles()
+        for context, context_cycles in trial.get_all_cycles().items():
+            cycles = list(context_cycles.values())
+            warps = self._get_warps(cycles)
+            new_cycles = [model.Trial() for _ in cycles]
+            categories = dict.fromkeys(
+                category for cycle in cycles for category in cycle.get_all_data()
+            )
+            for category in categories:
+                indices = [
+                    index
+                    for index, cycle in enumerate(cycles)
+                    if category in cycle.get_all_data()
+                ]
+                arrays = [cycles[index].get_data(category) for index in indices]
+                for index, array in zip(
+                    indices, self._warp_arrays(arrays, warps[indices])
+                ):
+                    new_cycles[index].add_data(category, array)
+            for cycle_id, new_cycle in zip(context_cycles, new_cycles):
+                registered_trial.add_cycle(context, cycle_id, new_cycle)
+        return registered_trial
+
+    def _get_warps(self, cycles: list[model.Trial]) -> np.ndarray:
+        """Gets the warps of the cycles of a context to their mean curve.
+
+        Args:
+            cycles: The time-normalised cycles of the context.
+
+        Returns:
+            The warps with the shape (n_cycles, n_frames, n_frames).
+        """
+        features = []
+        for cycle in cycles:
+            data = cycle.get_data(self.category)
+            if self.channels is not None:
+                data = data.sel(channel=self.channels)
+            values = np.moveaxis(data.values, data.get_axis_num("time"), -1)
+            features.append(values.reshape(-1, self.n_frames))
+        features = np.stack(features).astype(float)
+
+        # features with gaps are ignored, the others weigh equally
+        features = features[:, ~np.isnan(features).any(axis=(0, 2))]
+        if features.shape[1] == 0:
+            return np.broadcast_to(
+                np.eye(self.n_frames), (len(cycles), self.n_frames, self.n_frames)
+            )
+        scale = features.std(axis=(0, 2), keepdims=True)
+        features /= np.where(scale > 0, scale, 1)
+        template = features.mean(axis=0)
+
+        radius = round(self.band * self.n_frames)
+        blocks = [
+            features[start : start + self.block_size]
+            for start in range(0, len(features), self.block_size)
+        ]
+        if len(blocks) == 1:
+            return ga_math.get_dtw_warps(blocks[0], template, radius)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            warps = pool.map(
+                lambda block: ga_math.get_dtw_warps(block, template, radius), blocks
+            )
+            return np.concatenate(list(warps))
+
+    def _warp_arrays(
+        self, arrays: list[xr.DataArray], warps: np.ndarray
+    ) -> list[xr.DataArray]:
+        """Warps the time-normalised data arrays of cycles.
+
+        Args:
+            arrays: The data arrays of the cycles.
+            warps: The warps of the cycles.
+
+        Returns:
+            The registered data arrays.
+        """
+        if len(arrays) > 1 and not self._are_stackable(arrays):
+            return [
+                self._warp_arrays([array], warps[[index]])[0]
+                for index, array in enumerate(arrays)
+            ]
+
+        axis = arrays[0].get_axis_num("time")
+        values = np.stack([np.moveaxis(array.values, axis, -1) for array in arrays])
+        shape = values.shape
+        values = values.reshape(len(arrays), -1, self.n_frames) @ warps.astype(
+            values.dtype if values.dtype.kind == "f" else float, copy=False
+        )
+        values = np.moveaxis(values.reshape(shape), -1, axis + 1)
+        return [
+            array.copy(deep=False, data=cycle_values)
+            for array, cycle_values in zip(arrays, values)
+        ]
+
+
+class _BaseAmplitudeNormaliser(BaseNormaliser):
+    """Base class for normalisers scaling the amplitude of the data.
+
+    The data is normalised per channel as ``(x - offset) / scale``. The
+    parameters of a category are shared by all cycles and applied to the
+    cycles at once. They are stored in the attrs of the normalised data,
+    so the normalisation can be inverted.
+    """
+
+    OFFSET_ATTR = "amplitude_offset"
+    SCALE_ATTR = "amplitude_scale"
+
+    def __init__(
+        self,
+        categories: list[model.DataCategory] | None = None,
+        channels: list[str] | None = None,
+    ):
+        """Initializes a new instance of the _BaseAmplitudeNormaliser class.
+
+        Args:
+            categories: The categories to normalise.
+                Default = None, all categories
+            channels: The channels to normalise. Default = None, all channels
+        """
+        self.categories = categories
+        self.channels = channels
+
+    def normalise(
+        self, trial: model.Trial | model.TrialCycles
+    ) -> model.Trial | model.TrialCycles:
+        """Normalises the amplitude of the data.
+
+        Args:
+            trial: The trial to be normalised.
+
+        Returns:
+            model.Trial: A new trial containing the normalised data.
+            model.TrialCycles: A new segmented trial containing the normalised data
+        """
+        return self._map_arrays(trial, self._normalise_arrays, self.categories)
+
+    def invert(
+        self, trial: model.Trial | model.TrialCycles
+    ) -> model.Trial | model.TrialCycles:
+        """Restores the original amplitude of normalised data.
+
+        The parameters are taken from the attrs, so the data can be restored
+        with any amplitude normaliser.
+
+        Args:
+            trial: The normalised trial.
+
+        Returns:
+            model.Trial: A new trial containing the restored data.
+            model.TrialCycles: A new segmented trial containing the restored data
+        """
+        return self._map_arrays(trial, self._invert_arrays)
+
+    @abstractmethod
+    def _get_parameters(
+        self, values: np.ndarray, axis: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Gets the offset and scale of the data.
+
+        Args:
+            values: The data of all cycles concatenated along the time.
+            axis: The axis of the time.
+
+        Returns:
+            The offset and scale with a single frame on the axis.
+        """
+        raise NotImplementedError
+
+    def _normalise_arrays(self, arrays: list[xr.DataArray]) -> list[xr.DataArray]:
+        """Normalises the data arrays of all cycles of a category.
+
+        Arrays with the same dimensions and coordinates besides the time are
+        normalised at once with shared parameters, otherwise they are
+        normalised one by one.
+
+        Args:
+            arrays: The data arrays of the cycles.
+
+        Returns:
+            The normalised data arrays.
+        """
+        if len(arrays) > 1 and not self._are_stackable(arrays):
+            return [self._normalise_arrays([array])[0] for array in arrays]
+        is_channel = self._get_channel_mask(arrays[0])
+        if is_channel is not None and not is_channel.any():
+            return arrays
+
+        axis = arrays[0].get_axis_num("time")
+        lengths = np.array([array.sizes["time"] for array in arrays])
+        values = np.concatenate([array.values for array in arrays], axis=axis)
+        with warnings.catch_warnings():
+            # channels without any value stay empty
+            warnings.simplefilter("ignore", RuntimeWarning)
+            offset, scale = self._get_parameters(values, axis)
+        offset = np.nan_to_num(np.broadcast_to(offset, scale.shape))
+        scale = np.where(scale > 0, scale, 1)
+        if is_channel is not None:
+            shape = [1] * values.ndim
+            shape[arrays[0].get_axis_num("channel")] = -1
+            is_channel = is_channel.reshape(shape)
+            offset = np.where(is_channel, offset, 0)
+            scale = np.where(is_channel, scale, 1)
+
+        if np.issubdtype(values.dtype, np.floating):
+            # keep the precision of the data, i.e. float32
+            norm_values = (values - offset.astype(values.dtype)) / scale.astype(
+                values.dtype
+            )
+        else:
+            norm_values = (values - offset) / scale
+        norm_arrays = []
+        for array, cycle_values in zip(
+            arrays, np.split(norm_values, np.cumsum(lengths)[:-1], axis=axis)
+        ):
+            norm_array = array.copy(deep=False, data=cycle_values)
+            norm_array.attrs = dict(array.attrs)
+            self._update_attrs(norm_array.attrs, offset, scale, axis)
+            norm_arrays.append(norm_array)
+        return norm_arrays
+
+    def _get_channel_mask(self, array: xr.DataArray) -> np.ndarray | None:
+        """Gets the channels to normalise.
+
+        Args:
+            array: The data array of a cycle.
+
+        Returns:
+            True for each channel to normalise or None for all channels.
+        """
+        if self.channels is None or "channel" not in array.dims:
+            return None
+        return np.isin(array.coords["channel"].values, self.channels)
+
+    def _update_attrs(
+        self, attrs: dict, offset: np.ndarray, scale: np.ndarray, axis: int
+    ):
+        """Stores the parameters in the attrs of a normalised array.
+
+        Parameters of a previous normalisation are combined with the new ones.
+
+        Args:
+            attrs: The attrs of the normalised array.
+            offset: The offset of the normalisation.
+            scale: The scale of the normalisation.
+            axis: The axis of the time.
+        """
+        offset = np.squeeze(offset, axis)
+        scale = np.squeeze(scale, axis)
+        if self.OFFSET_ATTR in attrs:
+            previous_scale = np.asarray(attrs[self.SCALE_ATTR])
+            offset = np.asarray(attrs[self.OFFSET_ATTR]) + offset * previous_scale
+            scale = scale * previous_scale
+        attrs[self.OFFSET_ATTR] = offset
+        attrs[self.SCALE_ATTR] = scale
+
+    def _invert_arrays(self, arrays: list[xr.DataArray]) -> list[xr.DataArray]:
+        """Restores the original amplitude of the data arrays of a category.
+
+        Args:
+            arrays: The normalised data arrays of the cycles.
+
+        Returns:
+            The restored data arrays. Arrays without parameters are unchanged.
+        """
+        restored_arrays = []
+        for array in arrays:
+            if self.OFFSET_ATTR not in array.attrs:
+                restored_arrays.append(array)
+                continue
+            attrs = dict(array.attrs)
+            axis = array.get_axis_num("time")
+            offset = np.expand_dims(attrs.pop(self.OFFSET_ATTR), axis)
+            scale = np.expand_dims(attrs.pop(self.SCALE_ATTR), axis)
+            values = array.values * scale + offset
+            restored_array = array.copy(
+                deep=False, data=values.astype(array.dtype, copy=False)
+            )
+            restored_array.attrs = attrs
+            restored_arrays.append(restored_array)
+        return restored_arrays
+
+
+class BodyScaleNormaliser(_BaseAmplitudeNormaliser):
+    """A class for normalising kinetics to the body mass or weight and height.
+
+    By default, only the kinetic channels are scaled, i.e. the channels with
+    a force, moment or power in their name, which are not normalised yet.
+    Other channels, like marker positions and angles, are left unchanged.
+    The channels can also be selected explicitly.
+    """
+
+    GRAVITY = 9.81
+    KINETIC_KEYWORDS = ("Force", "Moment", "Power")
+
+    def __init__(
+        self,
+        body_mass: float,
+        body_height: float | None = None,
+        use_weight: bool = False,
+        categories: list[model.DataCategory] | None = None,
+        channels: list[str] | None = None,
+    ):
+        """Initializes a new instance of the BodyScaleNormaliser class.
+
+        Args:
+            body_mass: The body mass in kg.
+            body_height: The body height to additionally scale by.
+                Default = None
+            use_weight: Scale by the body weight in N instead of the body mass.
+                Default = False
+            categories: The categories to normalise.
+                Default = None, all categories
+            channels: The channels to normalise.
+                Default = None, the kinetic channels
+
+        Raises:
+            ValueError: If the body mass or height is not positive.
+        """
+        if body_mass <= 0 or (body_height is not None and body_height <= 0):
+            raise ValueError("Body mass and height must be positive.")
+        super().__init__(categories, channels)
+        self.body_mass = body_mass
+        self.body_height = body_height
+        self.use_weight = use_weight
+
+    def _get_parameters(
+        self, values: np.ndarray, axis: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Gets the offset and scale of the data.
+
+        Args:
+            values: The data of all cycles concatenated along the time.
+            axis: The axis of the time.
+
+        Returns:
+            The offset and scale with a single frame on the axis.
+        """
+        factor = self.body_mass
+        if self.use_weight:
+            factor *= self.GRAVITY
+        if self.body_height is not None:
+            factor *= self.body_height
+        shape = list(values.shape)
+        shape[axis] = 1
+        return np.zeros(shape), np.full(shape, factor)
+
+    def _get_channel_mask(self, array: xr.DataArray) -> np.ndarray | None:
+        """Gets the channels to normalise.
+
+        Args:
+            array: The data array of a cycle.
+
+        Returns:
+            True for each selected or, by default, kinetic channel.
+        """
+        if self.channels is not None or "channel" not in array.dims:
+            return super()._get_channel_mask(array)
+        return np.array(
+            [
+                "Normalised" not in channel
+                and any(keyword in channel for keyword in self.KINETIC_KEYWORDS)
+                for channel in array.coords["channel"].values.astype(str)
+            ],
+            dtype=bool,
+        )
+
+
+class ZScoreNormaliser(_BaseAmplitudeNormaliser):
+    """A class for normalising the data to zero mean and unit variance.
+
+    The mean and standard deviation of a channel are taken over all cycles.
+    """
+
+    def _get_parameters(
+        self, values: np.ndarray, axis: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Gets the mean and standard deviation of the data.
+
+        Args:
+            values: The data of all cycles concatenated along the time.
+            axis: The axis of the time.
+
+        Returns:
+            The mean and standard deviation with a single frame on the axis.
+        """
+        mean = np.nanmean(values, axis=axis, keepdims=True)
+        std = np.nanstd(values, axis=axis, keepdims=True)
+        return mean, std
+
+
+class MinMaxNormaliser(_BaseAmplitudeNormaliser):
+    """A class for normalising the data to the range [0, 1].
+
+    The minimum and maximum of a channel are taken over all cycles.
+    """
+
+    def _get_parameters(
+        self, values: np.ndarray, axis: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Gets the minimum and range of the data.
+
+        Args:
+            values: The data of all cycles concatenated along the time.
+            axis: The axis of the time.
+
+        Returns:
+            The minimum and range with a single frame on the axis.
+        """
+        minimum = np.nanmin(values, axis=axis, keepdims=True)
+        maximum = np.nanmax(values, axis=axis, keepdims=True)
+        return minimum, maximum - minimum
+
+
+class ResamplingNormaliser(BaseNormaliser):
+    """A class for resampling the data to a common rate.
+
+    Data with a higher rate is downsampled with a polyphase filter, data with
+    a lower rate is upsampled with a linear interpolation. All channels of a
+    category are resampled at once. Samples next to gaps are missing within
+    the length of the anti-aliasing filter.
+    """
+
+    def __init__(self, rate: float, categories: list[model.DataCategory] | None = None):
+        """Initializes a new instance of the ResamplingNormaliser class.
+
+        Args:
+            rate: The target rate in Hz.
+            categories: The categories to resample.
+                Default = None, all categories
+
+        Raises:
+            ValueError: If the rate is not positive.
+        """
+        if rate <= 0:
+            raise ValueError("The rate must be positive.")
+        self.rate = float(rate)
+        self.categories = categories
+
+    def normalise(
+        self, trial: model.Trial | model.TrialCycles
+    ) -> model.Trial | model.TrialCycles:
+        """Resamples the data to the target rate.
+
+        Args:
+            trial: The trial to be resampled.
+
+        Returns:
+            model.Trial: A new trial containing the resampled data.
+            model.TrialCycles: A new segmented trial containing the resampled data
+        """
+        return self._map_arrays(
+            trial,
+            lambda arrays: [self._resample_array(array) for array in arrays],
+            self.categories,
+        )
+
+    def _resample_array(self, array: xr.DataArray) -> xr.DataArray:
+        """Resamples a data array to the target rate.
+
+        Args:
+            array: The data array with its rate in the attrs.
+
+        Returns:
+            The resampled data array.
+
+        Raises:
+            ValueError: If the array has less than two frames.
+        """
+        rate = float(array.attrs["rate"])
+        if np.isclose(rate, self.rate):
+            return array
+        n_frames = array.sizes["time"]
+        if n_frames < 2:
+            raise ValueError("At least two frames are needed to resample.")
+        axis = array.get_axis_num("time")
+        # the last frame must not lie after the original data
+        n_out = int(np.floor((n_frames - 1) * self.rate / rate + 1e-9)) + 1
+
+        if self.rate < rate:
+            ratio = Fraction(self.rate).limit_denominator(1000) / Fraction(
+                rate
+            ).limit_denominator(1000)
+            values = signal.resample_poly(
+                array.values,
+                ratio.numerator,
+                ratio.denominator,
+                axis=axis,
+                padtype="smooth",
+            )
+            values = np.take(values, np.arange(n_out), axis=axis)
+        else:
+            positions = np.arange(n_out) * (rate / self.rate)
+            lower = np.clip(np.floor(positions).astype(np.intp), 0, n_frames - 2)
+            values = ga_math.interpolate_at(
+                array.values,
+                lower[np.newaxis],
+                (positions - lower)[np.newaxis],
+                axis,
+            )[0]
+
+        time = array.coords["time"].values[0] + np.arange(values.shape[axis]) / (
+            self.rate
+        )
+        resampled = xr.DataArray(
+            values,
+            dims=array.dims,
+            coords={
+                **{
+                    name: coord.variable
+                    for name, coord in array.coords.items()
+                    if "time" not in coord.dims
+                },
+                "time": time,
+            },
+            attrs=dict(array.attrs),
+            name=array.name,
+        )
+        resampled.attrs["rate"] = self.rate
+        for attr in ("first_frame", "last_frame"):
+            if attr in resampled.attrs:
+                resampled.attrs[attr] = round(resampled.attrs[attr] * self.rate / rate)
+        return resampled
@@ -5,6 +5,8 @@ gait events as well as a base class to implement additional methods.
 """
 
 from abc import ABC, abstractmethod
+from enum import IntFlag
+from functools import partial
 
 import numpy as np
 import pandas as pd
@@ -13,9 +15,29 @@ import xarray as xr
 import gaitalytics.events as ga_events
 import gaitalytics.io as io
 import gaitalytics.model as model
+import gaitalytics.normalisation as normalisation
 import gaitalytics.utils.math as ga_math
 
 
+class CycleQuality(IntFlag):
+    """Flags of the quality issues of a cycle.
+
+    The flags of a cycle are stored in the "quality" attribute.
+    Cycles with any flag set are marked as not used.
+
+    Attributes:
+        OK: The cycle has no issues.
+        INCOMPLETE_EVENTS: The events do not form a complete gait cycle.
+        MARKER_GAPS: The markers have gaps within the cycle.
+        DURATION_OUTLIER: The duration of the cycle is an outlier.
+    """
+
+    OK = 0
+    INCOMPLETE_EVENTS = 1
+    MARKER_GAPS = 2
+    DURATION_OUTLIER = 4
+
+
 class _BaseSegmentation(ABC):
     @abstractmethod
     def segment(self, trial: model.Trial) -> model.TrialCycles:
@@ -26,6 +48,122 @@ class _BaseSegmentation(ABC):
         """
         raise NotImplementedError
 
+    @staticmethod
+    def _get_time_decimals(trial: model.Trial) -> dict[model.DataCategory, int]:
+        """Gets the number of decimal places of the sampling interval.
+
+        Args:
+            trial: The trial to be segmented.
+
+        Returns:
+            A dictionary containing the categories as keys and the
+            decimal places of their sampling interval as values.
+        """
+        decimals = {}
+        for category, data in trial.get_all_data().items():
+            rate = int(data.attrs["rate"])
+            decimals[category] = ga_math.get_decimal_places(1 / rate)
+        return decimals
+
+    @staticmethod
+    def _get_static_coords(trial: model.Trial) -> dict[model.DataCategory, dict]:
+        """Gets the coordinates of each category, which do not change by segmenting.
+
+        Args:
+            trial: The trial to be segmented.
+
+        Returns:
+            A dictionary containing the categories as keys and the
+            coordinate variables without the time as values.
+        """
+        coords = {}
+        for category, data in trial.get_all_data().items():
+            coords[category] = {
+                name: coord.variable
+                for name, coord in data.coords.items()
+                if name != "time"
+            }
+        return coords
+
+    @staticmethod
+    def _get_event_index(events: pd.DataFrame) -> tuple[np.ndarray, np.ndarray | None]:
+        """Creates a sorted index of the event times.
+
+        Args:
+            events: The events in the trial.
+
+        Returns:
+            The sorted event times and the positions of the events in the
+            sorted order, or None if the events are already sorted by time.
+        """
+        times = events[io._EventInputFileReader.COLUMN_TIME].to_numpy()
+        if (np.diff(times) >= 0).all():
+            return times, None
+        order = np.argsort(times, kind="stable")
+        return times[order], order
+
+    @staticmethod
+    def _segment_events(
+        events: pd.DataFrame | None,
+        event_rows: slice | np.ndarray,
+        start_time: float,
+        attrs: dict,
+    ) -> pd.DataFrame:
+        """Segments the events based on the start and end times.
+
+        Args:
+            events: The events to be segmented.
+            event_rows: The positions of the events within the segment.
+            start_time: The start time of the segment.
+            attrs: The attributes of the segment.
+
+        Returns:
+            A DataFrame containing the segmented events.
+        """
+        if events is None:
+            raise ValueError("Events are not set.")
+        new_events = events.iloc[event_rows]
+        time_column = io._EventInputFileReader.COLUMN_TIME
+        new_events = new_events.assign(
+            **{time_column: new_events[time_column].to_numpy() - start_time}
+        )
+        new_events.attrs = dict(attrs)
+        return new_events
+
+    @staticmethod
+    def _get_attrs(
+        start_time,
+        end_time,
+        cycle_id: int,
+        context: str,
+        quality: int = CycleQuality.OK,
+    ) -> dict:
+        """Gets the attributes of a segment.
+
+        Updates time, and frames to relative values. Add additional information
+        such as context, cycles_id, quality and used. Based on the "used"-Flag
+        cycles can be included or excluded in the analysis
+
+        Args:
+            start_time: The start time of the segment.
+            end_time: The end time of the segment.
+            cycle_id: The cycle id of the segment.
+            context: The context of the segment.
+            quality: The CycleQuality flags of the segment. Default = OK
+
+        Returns:
+            A dictionary containing the attributes.
+        """
+        return {
+            "start_time": start_time,
+            "end_time": end_time,
+            "cycle_id": cycle_id,
+            "context": context,
+            "quality": int(quality),
+            # netcdf can not handle booleans :(
+            "used": int(quality == CycleQuality.OK),
+        }
+
 
 class GaitEventsSegmentation(_BaseSegmentation):
     """A class for segmenting the trial data based on gait events.
@@ -34,13 +172,79 @@ class GaitEventsSegmentation(_BaseSegmentation):
     It splits the trial data based on the event label and context.
     """
 
-    def __init__(self, event_label: str = ga_events.FOOT_STRIKE):
+    # the events of a gait cycle in order, as (is ipsilateral, label)
+    _GAIT_SEQUENCE = (
+        (True, ga_events.FOOT_STRIKE),
+        (False, ga_events.FOOT_OFF),
+        (False, ga_events.FOOT_STRIKE),
+        (True, ga_events.FOOT_OFF),
+    )
+    _GAIT_SEQUENCE_LABELS = (ga_events.FOOT_STRIKE, ga_events.FOOT_OFF)
+
+    def __init__(
+        self,
+        event_label: str = ga_events.FOOT_STRIKE,
+        views: bool = False,
+        lazy: bool = False,
+        cache_size: int = 32,
+        end_label: str | None = None,
+        end_context: str = "ipsi",
+        check_sequence: bool = False,
+        gap_channels: list[str] | None = None,
+        max_duration_deviation: float | None = None,
+    ):
         """Initializes a new instance of the GaitEventsSegmentation class.
 
         Args:
             event_label: The label of the event to be used for segmentation.
+            views: If True, the cycles are returned as model.TrialView objects,
+                which reference the data of the trial instead of holding
+                own data arrays. Default = False
+            lazy: If True, a model.LazyTrialCycles is returned, which creates
+                the cycles on access. Default = False
+            cache_size: The max number of cycles cached by a lazy
+                segmented trial. Default = 32
+            end_label: The label of the event ending a cycle. A cycle ends at
+                the first end event after its start event and is dropped if
+                the next cycle starts before. Default = None, the event_label
+            end_context: The context of the end event relative to the start
+                event. Either "ipsi" or "contra". Default = "ipsi"
+            check_sequence: If True, cycles without the foot strikes and
+                foot offs expected between their start and end event are
+                flagged as CycleQuality.INCOMPLETE_EVENTS, i.e. two ipsilateral
+                foot strikes, one ipsilateral foot off and one contralateral
+                foot strike and foot off for a full gait cycle. Default = False
+            gap_channels: The marker channels which are checked for gaps.
+                Cycles with missing values in these channels are flagged as
+                CycleQuality.MARKER_GAPS. Default = None
+            max_duration_deviation: The max relative deviation of the cycle
+                duration from the median duration of its context. Cycles
+                deviating more are flagged as CycleQuality.DURATION_OUTLIER.
+                Default = None
+
+        Raises:
+            ValueError: If the end context is not supported or the sequence is
+                checked for other events than foot strikes and foot offs.
         """
+        if end_context not in ("ipsi", "contra"):
+            raise ValueError(f"Unsupported end context: {end_context}")
+        if check_sequence and not {
+            event_label,
+            end_label if end_label is not None else event_label,
+        } <= set(self._GAIT_SEQUENCE_LABELS):
+            raise ValueError(
+                "The sequence can only be checked for foot strikes and foot offs."
+            )
+
         self.event_label = event_label
+        self.views = views
+        self.lazy = lazy
+        self.cache_size = cache_size
+        self.end_label = end_label if end_label is not None else event_label
+        self.end_context = end_context
+        self.check_sequence = check_sequence
+        self.gap_channels = gap_channels
+        self.max_duration_deviation = max_duration_deviation
 
     def segment(self, trial: model.Trial) -> model.TrialCycles:
         """Segments the trial data based on gait events and contexts.
@@ -58,145 +262,839 @@ class GaitEventsSegmentation(_BaseSegmentation):
         if events is None:
             raise ValueError("Trial does not have events.")
 
-        events_times = self._get_times_of_events(events)
+        cycle_times = self._get_cycle_times(events)
+        decimals = self._get_time_decimals(trial)
+        coords = self._get_static_coords(trial)
+
+        bounds = self._get_cycle_bounds(trial, events, cycle_times)
+
+        if self.lazy:
+            cycle_attrs = {
+                context: {cycle_id: attrs for cycle_id, (_, _, attrs) in cycles.items()}
+                for context, cycles in bounds.items()
+            }
+            loader = partial(self._get_segment, trial, bounds, decimals, coords)
+            return model.LazyTrialCycles(loader, cycle_attrs, self.cache_size)
 
         trial_cycles = model.TrialCycles()
-        for context, times in events_times.items():
-            for cycle_id in range(len(times) - 1):
-                start_time = times[cycle_id]
-                end_time = times[cycle_id + 1]
+        for context, cycles in bounds.items():
+            for cycle_id in cycles:
                 trial_cycles.add_cycle(
                     context,
                     cycle_id,
-                    self._get_segment(trial, start_time, end_time, cycle_id, context),
+                    self._get_segment(
+                        trial, bounds, decimals, coords, context, cycle_id
+                    ),
                 )
 
         return trial_cycles
 
-    def _get_times_of_events(self, events: pd.DataFrame) -> dict[str, list]:
+    def _get_times_of_events(
+        self, events: pd.DataFrame, label: str | None = None
+    ) -> dict[str, np.ndarray]:
         """Gets the times of the events in the trial.
 
         This method splits the trial data based on the event label and context.
 
         Args:
             events: The events in the trial.
+            label: The label of the events. Default = None, the event_label
 
         Returns:
             A dictionary containing the contexts
-            as keys and the event times as values.
+            as keys and the sorted event times as values.
         """
+        if label is None:
+            label = self.event_label
         splits = {}
         interesting_events = events[
-            events[io._EventInputFileReader.COLUMN_LABEL] == self.event_label
+            events[io._EventInputFileReader.COLUMN_LABEL] == label
         ]
         contexts = events[io._EventInputFileReader.COLUMN_CONTEXT].unique()
         for context in contexts:
             context_events = interesting_events[
                 interesting_events[io._EventInputFileReader.COLUMN_CONTEXT] == context
             ]
-            splits[context] = context_events[
-                io._EventInputFileReader.COLUMN_TIME
-            ].values
+            splits[context] = np.sort(
+                context_events[io._EventInputFileReader.COLUMN_TIME].values
+            )
         return splits
 
-    def _get_segment(
+    def _get_cycle_times(
+        self, events: pd.DataFrame
+    ) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        """Pairs the start and end events of the cycles.
+
+        Each start event is paired with the first end event after it.
+        Cycles which do not end before the next cycle starts are dropped.
+
+        Args:
+            events: The events in the trial.
+
+        Returns:
+            A dictionary containing the contexts as keys and the
+            start and end times of the cycles as values.
+        """
+        start_times = self._get_times_of_events(events)
+        if self.end_label == self.event_label:
+            end_times = start_times
+        else:
+            end_times = self._get_times_of_events(events, self.end_label)
+
+        cycle_times = {}
+        for context, starts in start_times.items():
+            if self.end_context == "ipsi":
+                context_ends = end_times[context]
+            else:
+                context_ends = np.sort(
+                    np.concatenate(
+                        [times for c, times in end_times.items() if c != context]
+                        + [np.empty(0)]
+                    )
+                )
+            next_end = np.searchsorted(context_ends, starts, side="right")
+            has_end = next_end < len(context_ends)
+            ends = np.full(len(starts), np.inf)
+            ends[has_end] = context_ends[next_end[has_end]]
+            next_starts = np.append(starts[1:], np.inf)
+            is_valid = has_end & (ends <= next_starts)
+            cycle_times[context] = (starts[is_valid], ends[is_valid])
+        return cycle_times
+
+    def _get_cycle_bounds(
         self,
         trial: model.Trial,
-        start_time: float,
-        end_time: float,
-        cycle_id: int,
+        events: pd.DataFrame,
+        cycle_times: dict[str, tuple[np.ndarray, np.ndarray]],
+    ) -> dict[str, dict[int, tuple]]:
+        """Gets the boundaries of all cycles in the trial.
+
+        Args:
+            trial: The trial to be segmented.
+            events: The events in the trial.
+            cycle_times: The start and end times of the cycles by context.
+
+        Returns:
+            A nested dictionary with the contexts and cycle ids as keys and
+            the frame bounds of each category, the rows of the events
+            and the attributes of the cycles as values.
+        """
+        sorted_times, order = self._get_event_index(events)
+
+        bounds: dict[str, dict[int, tuple]] = {}
+        for context, (start_times, end_times) in cycle_times.items():
+            if len(start_times) == 0:
+                continue
+            frames = self._get_frame_bounds(trial, start_times, end_times)
+            first_events = np.searchsorted(sorted_times, start_times, side="left")
+            last_events = np.searchsorted(sorted_times, end_times, side="right")
+            quality = self._get_cycle_quality(
+                trial, events, context, start_times, end_times, frames
+            )
+            bounds[context] = {}
+            for cycle_id in range(len(start_times)):
+                cycle_frames = {
+                    category: (starts[cycle_id], ends[cycle_id])
+                    for category, (starts, ends) in frames.items()
+                }
+                event_rows = slice(first_events[cycle_id], last_events[cycle_id])
+                bounds[context][cycle_id] = (
+                    cycle_frames,
+                    event_rows if order is None else np.sort(order[event_rows]),
+                    self._get_attrs(
+                        start_times[cycle_id],
+                        end_times[cycle_id],
+                        cycle_id,
+                        context,
+                        quality[cycle_id],
+                    ),
+                )
+        return bounds
+
+    def _get_cycle_quality(
+        self,
+        trial: model.Trial,
+        events: pd.DataFrame,
         context: str,
-    ) -> model.Trial:
-        """Segments the trial data based on the start and end times.
+        start_times: np.ndarray,
+        end_times: np.ndarray,
+        frames: dict[model.DataCategory, tuple[np.ndarray, np.ndarray]],
+    ) -> np.ndarray:
+        """Checks the quality of all cycles of a context.
 
         Args:
             trial: The trial to be segmented.
-            start_time: The start time of the segment.
-            end_time: The end time of the segment.
-            cycle_id: The cycle id of the segment.
-            context: The context of the segment.
+            events: The events in the trial.
+            context: The context of the cycles.
+            start_times: The start times of the cycles.
+            end_times: The end times of the cycles.
+            frames: The frame bounds of the cycles for each category.
 
         Returns:
-            A new trial containing the segmented data.
+            The CycleQuality flags of each cycle.
         """
+        quality = np.full(len(start_times), CycleQuality.OK, dtype=int)
 
-        trial_segment = model.Trial()
-        # segment the data
-        for category, data in trial.get_all_data().items():
-            rate = int(data.attrs["rate"])
-            dec_places = ga_math.get_decimal_places(1 / rate)
+        if self.check_sequence:
+            quality[
+                ~self._has_complete_events(events, context, start_times, end_times)
+            ] |= CycleQuality.INCOMPLETE_EVENTS
 
-            segment = data.sel(time=slice(start_time, end_time))
-            segment = segment.reset_index("time")
+        if self.gap_channels:
+            markers = trial.get_data(model.DataCategory.MARKERS)
+            starts, ends = frames[model.DataCategory.MARKERS]
+            markers = markers.sel(channel=self.gap_channels)
+            frame_axis = markers.get_axis_num("time")
+            other_axes = tuple(i for i in range(markers.ndim) if i != frame_axis)
+            has_gap = np.isnan(markers.values).any(axis=other_axes)
+            gap_frames = np.concatenate(([0], np.cumsum(has_gap)))
+            quality[gap_frames[ends] - gap_frames[starts] > 0] |= (
+                CycleQuality.MARKER_GAPS
+            )
 
-            times = (segment.time - start_time).to_numpy()
-            times = np.round(times, dec_places)
-            times = np.absolute(times)
+        if self.max_duration_deviation is not None and len(start_times) > 0:
+            durations = end_times - start_times
+            median = np.median(durations)
+            is_outlier = (
+                np.abs(durations - median) > self.max_duration_deviation * median
+            )
+            quality[is_outlier] |= CycleQuality.DURATION_OUTLIER
 
-            segment = segment.assign_coords(time=times)
-            self._update_attrs(segment, start_time, end_time, cycle_id, context)
-            trial_segment.add_data(category, segment)
-        # segment the events
-        trial_segment.events = self._segment_events(
-            context, cycle_id, trial.events, start_time, end_time
+        return quality
+
+    def _get_expected_counts(self) -> dict[tuple[bool, str], int]:
+        """Gets the number of each event from the start to the end of a cycle.
+
+        The gait sequence is followed from the start event to the first end
+        event after it, both included. A cycle ending with its start event
+        covers the whole sequence.
+
+        Returns:
+            A dictionary containing (is ipsilateral, label) as keys and
+            the expected number of events as values.
+        """
+        start = self._GAIT_SEQUENCE.index((True, self.event_label))
+        end_event = (self.end_context == "ipsi", self.end_label)
+        counts = dict.fromkeys(self._GAIT_SEQUENCE, 0)
+        counts[self._GAIT_SEQUENCE[start]] += 1
+        for step in range(1, len(self._GAIT_SEQUENCE) + 1):
+            event = self._GAIT_SEQUENCE[(start + step) % len(self._GAIT_SEQUENCE)]
+            counts[event] += 1
+            if event == end_event:
+                break
+        return counts
+
+    def _has_complete_events(
+        self,
+        events: pd.DataFrame,
+        context: str,
+        start_times: np.ndarray,
+        end_times: np.ndarray,
+    ) -> np.ndarray:
+        """Checks if the events of the cycles form complete sequences.
+
+        The cycles need to contain the events expected between the start and
+        end event, i.e. a complete gait cycle has two ipsilateral foot strikes,
+        one ipsilateral foot off and one contralateral foot strike and foot off.
+
+        Args:
+            events: The events in the trial.
+            context: The context of the cycles.
+            start_times: The start times of the cycles.
+            end_times: The end times of the cycles.
+
+        Returns:
+            True for each cycle with complete events, False otherwise.
+        """
+        times = events[io._EventInputFileReader.COLUMN_TIME].to_numpy()
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        labels = events[io._EventInputFileReader.COLUMN_LABEL].to_numpy()[order]
+        is_ipsi = (
+            events[io._EventInputFileReader.COLUMN_CONTEXT].to_numpy()[order] == context
         )
-        return trial_segment
+
+        first_events = np.searchsorted(times, start_times, side="left")
+        last_events = np.searchsorted(times, end_times, side="right")
+        is_complete = np.ones(len(start_times), dtype=bool)
+        for (ipsi, label), expected_count in self._get_expected_counts().items():
+            mask = (is_ipsi == ipsi) & (labels == label)
+            counts = np.concatenate(([0], np.cumsum(mask)))
+            is_complete &= counts[last_events] - counts[first_events] == expected_count
+        return is_complete
 
     @staticmethod
-    def _segment_events(
+    def _get_frame_bounds(
+        trial: model.Trial, start_times: np.ndarray, end_times: np.ndarray
+    ) -> dict[model.DataCategory, tuple[np.ndarray, np.ndarray]]:
+        """Converts the cycle times into frame indices for each data category.
+
+        A segment includes the frames at its start and end time.
+
+        Args:
+            trial: The trial to be segmented.
+            start_times: The start times of the segments.
+            end_times: The end times of the segments.
+
+        Returns:
+            A dictionary containing the categories as keys and the first
+            frame index and the frame index after the last frame
+            of each segment as values.
+        """
+        time_index = trial.get_time_index()
+        frames = {}
+        for category in trial.get_all_data():
+            starts = time_index.get_frames(category, start_times, side="left")
+            ends = time_index.get_frames(category, end_times, side="right")
+            frames[category] = (starts, ends)
+        return frames
+
+    def _get_segment(
+        self,
+        trial: model.Trial,
+        bounds: dict[str, dict[int, tuple]],
+        decimals: dict[model.DataCategory, int],
+        coords: dict[model.DataCategory, dict],
         context: str,
         cycle_id: int,
-        events: pd.DataFrame | None,
-        start_time: float,
-        end_time: float,
-    ) -> pd.DataFrame:
-        """Segments the events based on the start and end times.
+    ) -> model.Trial:
+        """Segments the trial data based on the start and end frames of a cycle.
 
         Args:
+            trial: The trial to be segmented.
+            bounds: The boundaries of all cycles.
+            decimals: The decimal places of the sampling interval
+                for each category.
+            coords: The coordinates without the time for each category.
             context: The context of the segment.
             cycle_id: The cycle id of the segment.
-            events: The events to be segmented.
-            start_time: The start time of the segment.
-            end_time: The end time of the segment.
 
         Returns:
-            A DataFrame containing the segmented events.
+            A new trial containing the segmented data.
+        """
+        frames, event_rows, attrs = bounds[context][cycle_id]
+        start_time = attrs["start_time"]
+
+        trial_segment: model.Trial
+        if self.views:
+            trial_segment = model.TrialView(trial, frames, start_time, decimals, attrs)
+        else:
+            trial_segment = model.Trial()
+            # segment the data by position, it stays a view on the trial data
+            for category, data in trial.get_all_data().items():
+                start_frame, end_frame = frames[category]
+                segment = model._create_time_slice(
+                    data,
+                    start_frame,
+                    end_frame,
+                    start_time,
+                    decimals[category],
+                    attrs,
+                    coords[category],
+                )
+                trial_segment.add_data(category, segment)
+        # segment the events
+        trial_segment.events = self._segment_events(
+            trial.events, event_rows, start_time, attrs
+        )
+        return trial_segment
+
+
+class NormalisedGaitEventsSegmentation(GaitEventsSegmentation):
+    """A class for segmenting and time-normalising the trial data in one step.
+
+    The cycles are defined as in GaitEventsSegmentation, but instead of
+    creating a trial for every cycle, the data of all cycles is linearly
+    interpolated to a fixed number of frames and written directly into one
+    array per category. The results match the LinearTimeNormaliser
+    applied to the segmented trial.
+    """
+
+    def __init__(
+        self,
+        event_label: str = ga_events.FOOT_STRIKE,
+        n_frames: int = 100,
+        cache_size: int = 32,
+        end_label: str | None = None,
+        end_context: str = "ipsi",
+        check_sequence: bool = False,
+        gap_channels: list[str] | None = None,
+        max_duration_deviation: float | None = None,
+        weight_cache: normalisation.InterpolationWeightCache | None = None,
+    ):
+        """Initializes a new instance of the NormalisedGaitEventsSegmentation class.
+
+        Args:
+            event_label: The label of the event to be used for segmentation.
+            n_frames: The number of frames to time-normalise the cycles to.
+                Default = 100
+            cache_size: The max number of cycles cached by the
+                segmented trial. Default = 32
+            end_label: The label of the event ending a cycle.
+                Default = None, the event_label
+            end_context: The context of the end event relative to the start
+                event. Either "ipsi" or "contra". Default = "ipsi"
+            check_sequence: If True, cycles with incomplete events are flagged.
+                Default = False
+            gap_channels: The marker channels which are checked for gaps.
+                Default = None
+            max_duration_deviation: The max relative deviation of the cycle
+                duration from the median duration of its context.
+                Default = None
+            weight_cache: The cache of the interpolation weights.
+                Default = None, the shared normalisation.WEIGHT_CACHE
         """
+        super().__init__(
+            event_label,
+            lazy=True,
+            cache_size=cache_size,
+            end_label=end_label,
+            end_context=end_context,
+            check_sequence=check_sequence,
+            gap_channels=gap_channels,
+            max_duration_deviation=max_duration_deviation,
+        )
+        self.n_frames = n_frames
+        self.weight_cache = (
+            weight_cache if weight_cache is not None else normalisation.WEIGHT_CACHE
+        )
+
+    def segment(self, trial: model.Trial) -> model.TrialCycles:
+        """Segments and time-normalises the trial data.
+
+        Args:
+            trial: The trial to be segmented.
+
+        Returns:
+            A model.LazyTrialCycles creating the cycles as views
+            on the time-normalised arrays.
+
+        Raises:
+            ValueError: If the trial does not have events.
+        """
+        arrays = self.segment_arrays(trial)
+        coords = self._get_static_coords(trial)
+        any_array = next(iter(arrays.values()), None)
+        cycle_index: dict[str, dict[int, int]] = {}
+        cycle_attrs: dict[str, dict[int, dict]] = {}
+        if any_array is not None:
+            cycle_coords = zip(
+                any_array.coords["context"].values,
+                any_array.coords["cycle_id"].values,
+                any_array.coords["start_time"].values,
+                any_array.coords["end_time"].values,
+                any_array.coords["quality"].values,
+            )
+            for index, (context, cycle_id, start_time, end_time, quality) in enumerate(
+                cycle_coords
+            ):
+                cycle_index.setdefault(context, {})[int(cycle_id)] = index
+                cycle_attrs.setdefault(context, {})[int(cycle_id)] = self._get_attrs(
+                    start_time, end_time, int(cycle_id), context, quality
+                )
+        loader = partial(self._get_cycle, arrays, coords, cycle_index, cycle_attrs)
+        return model.LazyTrialCycles(loader, cycle_attrs, self.cache_size)
+
+    def segment_arrays(
+        self, trial: model.Trial
+    ) -> dict[model.DataCategory, xr.DataArray]:
+        """Segments and time-normalises the trial data into one array per category.
+
+        Args:
+            trial: The trial to be segmented.
+
+        Returns:
+            A dictionary containing the categories as keys and the data arrays
+            with the additional first dimension "cycle" as values. The context,
+            cycle id, start and end time and the quality flags of the cycles are
+            coordinates of the cycle dimension. The time is normalised from 0 to 99.
+
+        Raises:
+            ValueError: If the trial does not have events.
+        """
+        events = trial.events
         if events is None:
-            raise ValueError("Events are not set.")
-        new_events = events[
-            (events[io._EventInputFileReader.COLUMN_TIME] >= start_time)
-            & (events[io._EventInputFileReader.COLUMN_TIME] <= end_time)
-        ]
-        new_events.loc[:, "time"] -= start_time
-        new_events.attrs = {
-            "end_time": end_time,
-            "start_time": start_time,
-            "context": context,
-            "cycle_id": cycle_id,
-            "used": 1,
+            raise ValueError("Trial does not have events.")
+
+        cycle_times = {
+            context: times
+            for context, times in self._get_cycle_times(events).items()
+            if len(times[0]) > 0
         }
-        return new_events
+        contexts = np.concatenate(
+            [[context] * len(times[0]) for context, times in cycle_times.items()]
+            + [np.empty(0, dtype=object)]
+        )
+        cycle_ids = np.concatenate(
+            [np.arange(len(times[0])) for times in cycle_times.values()]
+            + [np.empty(0, dtype=int)]
+        )
+        start_times = np.concatenate(
+            [times[0] for times in cycle_times.values()] + [np.empty(0)]
+        )
+        end_times = np.concatenate(
+            [times[1] for times in cycle_times.values()] + [np.empty(0)]
+        )
+
+        frames = self._get_frame_bounds(trial, start_times, end_times)
+        quality = [np.empty(0, dtype=int)]
+        offset = 0
+        for context, (context_starts, context_ends) in cycle_times.items():
+            n_cycles = len(context_starts)
+            context_frames = {
+                category: (
+                    starts[offset : offset + n_cycles],
+                    ends[offset : offset + n_cycles],
+                )
+                for category, (starts, ends) in frames.items()
+            }
+            quality.append(
+                self._get_cycle_quality(
+                    trial, events, context, context_starts, context_ends, context_frames
+                )
+            )
+            offset += n_cycles
+
+        coords = self._get_static_coords(trial)
+        arrays = {}
+        for category, data in trial.get_all_data().items():
+            starts, ends = frames[category]
+            values = ga_math.interpolate_segments(
+                data.values,
+                starts,
+                ends,
+                self.n_frames,
+                data.get_axis_num("time"),
+                partial(self.weight_cache.get_weights, method="linear"),
+            )
+            arrays[category] = xr.DataArray(
+                values,
+                dims=("cycle", *data.dims),
+                coords={
+                    **coords[category],
+                    "time": np.linspace(0, 99, self.n_frames),
+                    "context": ("cycle", contexts),
+                    "cycle_id": ("cycle", cycle_ids),
+                    "start_time": ("cycle", start_times),
+                    "end_time": ("cycle", end_times),
+                    "quality": ("cycle", np.concatenate(quality)),
+                },
+                attrs=data.attrs,
+                name=data.name,
+            )
+        return arrays
 
     @staticmethod
-    def _update_attrs(
-        segment: xr.DataArray, start_time, end_time, cycle_id: int, context: str
+    def _get_cycle(
+        arrays: dict[model.DataCategory, xr.DataArray],
+        coords: dict[model.DataCategory, dict],
+        cycle_index: dict[str, dict[int, int]],
+        cycle_attrs: dict[str, dict[int, dict]],
+        context: str,
+        cycle_id: int,
+    ) -> model.Trial:
+        """Creates a cycle as view on the time-normalised arrays.
+
+        Args:
+            arrays: The time-normalised arrays of all cycles.
+            coords: The coordinates without the time for each category.
+            cycle_index: The position of each cycle in the arrays.
+            cycle_attrs: The attributes of each cycle.
+            context: The context of the cycle.
+            cycle_id: The cycle id of the cycle.
+
+        Returns:
+            A new trial containing the time-normalised data of the cycle.
+        """
+        index = cycle_index[context][cycle_id]
+        cycle = model.Trial()
+        for category, array in arrays.items():
+            cycle.add_data(
+                category,
+                xr.DataArray(
+                    array.values[index],
+                    dims=array.dims[1:],
+                    coords={**coords[category], "time": array.coords["time"].values},
+                    attrs={**array.attrs, **cycle_attrs[context][cycle_id]},
+                    name=array.name,
+                ),
+            )
+        return cycle
+
+
+class WindowSegmentation(_BaseSegmentation):
+    """A class for segmenting the trial data into fixed-length windows.
+
+    This class provides a method to segment the trial data into windows of a
+    fixed duration, independent of gait events. Consecutive windows can overlap.
+    The windows are returned as model.TrialView objects, which reference
+    the data of the trial instead of copying it.
+    """
+
+    CONTEXT = "Window"
+
+    def __init__(
+        self,
+        window: float,
+        stride: float | None = None,
+        overlap: float | None = None,
+        unit: str = "seconds",
     ):
-        """Updates the attributes of the segment based on the data.
+        """Initializes a new instance of the WindowSegmentation class.
 
-        Updates time, and frames to relative values. Add additional information
-        such as context, cycles_id and used. Based on the "used"-Flag cycles can be
-        included or excluded in the analysis
+        Args:
+            window: The length of a window.
+            stride: The distance between the starts of two consecutive windows.
+                Default = None, the windows do not overlap
+            overlap: The length two consecutive windows overlap.
+                Can not be combined with stride. Default = None
+            unit: The unit of window, stride and overlap. Either "seconds"
+                or "frames". Frames refer to the marker data, or to the first
+                category if no marker data is in the trial. Default = "seconds"
+
+        Raises:
+            ValueError: If the unit is not supported or stride and overlap
+                are both set.
+        """
+        if unit not in ("seconds", "frames"):
+            raise ValueError(f"Unsupported unit: {unit}")
+        if stride is not None and overlap is not None:
+            raise ValueError("Either stride or overlap can be set.")
+
+        self.window = window
+        self.stride = stride
+        self.overlap = overlap
+        self.unit = unit
+
+    def segment(self, trial: model.Trial) -> model.TrialCycles:
+        """Segments the trial data into windows.
+
+        Windows which would exceed the end of the trial are dropped.
 
         Args:
-            segment: The segment to be updated.
-            cycle_id: The cycle id of the segment.
-            context: The context of the segment.
+            trial: The trial to be segmented.
+
+        Returns:
+            A new trial containing all windows in the context "Window".
+
+        Raises:
+            ValueError: If the window or stride are shorter than one frame or
+                the overlap is not shorter than the window.
         """
+        reference = self._get_reference_data(trial)
+        window_frames, stride_frames = self._get_window_frames(
+            float(reference.attrs["rate"])
+        )
+
+        ref_times = reference.coords["time"].values
+        starts = np.arange(0, len(ref_times) - window_frames + 1, stride_frames)
+        start_times = ref_times[starts]
+        end_times = ref_times[starts + window_frames - 1]
+        duration = window_frames / float(reference.attrs["rate"])
+        frames = self._get_frame_bounds(trial, start_times, duration)
+
+        decimals = self._get_time_decimals(trial)
+        events = trial.events
+        if events is not None:
+            sorted_times, order = self._get_event_index(events)
+            first_events = np.searchsorted(sorted_times, start_times, side="left")
+            last_events = np.searchsorted(sorted_times, end_times, side="right")
 
-        segment.attrs["start_time"] = start_time
-        segment.attrs["end_time"] = end_time
-        segment.attrs["cycle_id"] = cycle_id
-        segment.attrs["context"] = context
-        # netcdf can not handle booleans :(
-        segment.attrs["used"] = 1
+        trial_cycles = model.TrialCycles()
+        for window_id in range(len(starts)):
+            window_frames_per_category = {
+                category: (starts_c[window_id], ends_c[window_id])
+                for category, (starts_c, ends_c) in frames.items()
+            }
+            start_time = start_times[window_id]
+            end_time = end_times[window_id]
+            attrs = self._get_attrs(start_time, end_time, window_id, self.CONTEXT)
+            window_segment = model.TrialView(
+                trial, window_frames_per_category, start_time, decimals, attrs
+            )
+            if events is not None:
+                event_rows = slice(first_events[window_id], last_events[window_id])
+                window_segment.events = self._segment_events(
+                    events,
+                    event_rows if order is None else np.sort(order[event_rows]),
+                    start_time,
+                    attrs,
+                )
+            trial_cycles.add_cycle(self.CONTEXT, window_id, window_segment)
+        return trial_cycles
+
+    def get_windows(
+        self, trial: model.Trial, category: model.DataCategory
+    ) -> xr.DataArray:
+        """Gets all windows of a category stacked in one data array.
+
+        The windows start at the same times as the windows of the reference
+        data, so that all categories cover the same time spans. If the
+        windows are evenly spaced in the category, the array is a read-only
+        strided view on the data of the trial and overlapping windows do not
+        copy any data. Frames exceeding the data of the category are missing.
+
+        Args:
+            trial: The trial to be segmented.
+            category: The category of the data.
+
+        Returns:
+            A data array with the additional first dimension "window". The time
+            coordinates are relative to the start of each window.
+
+        Raises:
+            ValueError: If the window or stride are shorter than one frame or
+                the overlap is not shorter than the window.
+        """
+        reference = self._get_reference_data(trial)
+        reference_rate = float(reference.attrs["rate"])
+        reference_frames, reference_stride = self._get_window_frames(reference_rate)
+        n_windows = max(
+            (reference.sizes["time"] - reference_frames) // reference_stride + 1, 0
+        )
+        start_times = reference.coords["time"].values[
+            np.arange(n_windows) * reference_stride
+        ]
+
+        data = trial.get_data(category)
+        rate = float(data.attrs["rate"])
+        window_frames = max(round(reference_frames / reference_rate * rate), 1)
+        starts = trial.get_time_index().get_frames(category, start_times, side="left")
+        windows = self._get_windows_at(
+            data.values, starts, window_frames, data.get_axis_num("time")
+        )
+        decimals = self._get_time_decimals(trial)[category]
+        relative_times = np.round(np.arange(window_frames) / rate, decimals)
+
+        coords = self._get_static_coords(trial)[category]
+        return xr.DataArray(
+            windows,
+            dims=("window", *data.dims),
+            coords={
+                **coords,
+                "window": np.arange(n_windows),
+                "start_time": ("window", start_times),
+                "time": relative_times,
+            },
+            attrs=data.attrs,
+            name=data.name,
+        )
+
+    @staticmethod
+    def _get_windows_at(
+        values: np.ndarray, starts: np.ndarray, window: int, axis: int
+    ) -> np.ndarray:
+        """Gets the windows of an array at the given start frames.
+
+        Args:
+            values: The array to get the windows from.
+            starts: The first frame of each window.
+            window: The number of frames of a window.
+            axis: The time axis of the array.
+
+        Returns:
+            An array with the windows in the first dimension. Evenly spaced
+            windows within the array are a read-only strided view, otherwise
+            the windows are copied and frames exceeding the array are missing.
+        """
+        n_frames = values.shape[axis]
+        strides = np.diff(starts)
+        stride = int(strides[0]) if len(strides) else 1
+        if (
+            len(starts)
+            and stride > 0
+            and np.all(strides == stride)
+            and starts[-1] + window <= n_frames
+        ):
+            index = [slice(None)] * values.ndim
+            index[axis] = slice(int(starts[0]), None)
+            return ga_math.sliding_windows(values[tuple(index)], window, stride, axis)[
+                : len(starts)
+            ]
+
+        n_missing = max(int(starts.max(initial=0)) + window - n_frames, 0)
+        if n_missing:
+            shape = list(values.shape)
+            shape[axis] = n_missing
+            values = np.concatenate([values, np.full(shape, np.nan)], axis=axis)
+        return ga_math.sliding_windows(values, window, 1, axis)[starts]
+
+    def _get_window_frames(self, rate: float) -> tuple[int, int]:
+        """Converts the window and stride into frames of the reference data.
+
+        Args:
+            rate: The sampling rate of the reference data.
+
+        Returns:
+            The number of frames of a window and between the window starts.
+
+        Raises:
+            ValueError: If the window or stride are shorter than one frame or
+                the overlap is not shorter than the window.
+        """
+        factor = rate if self.unit == "seconds" else 1
+        window_frames = round(self.window * factor)
+        if self.stride is not None:
+            stride_frames = round(self.stride * factor)
+        elif self.overlap is not None:
+            stride_frames = window_frames - round(self.overlap * factor)
+        else:
+            stride_frames = window_frames
+
+        if window_frames < 1:
+            raise ValueError("The window must be at least one frame long.")
+        if stride_frames < 1:
+            raise ValueError(
+                "The stride must be at least one frame and "
+                "the overlap shorter than the window."
+            )
+        return window_frames, stride_frames
+
+    @staticmethod
+    def _get_reference_data(trial: model.Trial) -> xr.DataArray:
+        """Gets the data defining the frames of the windows.
+
+        Args:
+            trial: The trial to be segmented.
+
+        Returns:
+            The marker data, or the first data array if no markers are set.
+
+        Raises:
+            ValueError: If the trial does not have any data.
+        """
+        all_data = trial.get_all_data()
+        if not all_data:
+            raise ValueError("Trial does not have any data.")
+        if model.DataCategory.MARKERS in all_data:
+            return all_data[model.DataCategory.MARKERS]
+        return next(iter(all_data.values()))
+
+    @staticmethod
+    def _get_frame_bounds(
+        trial: model.Trial, start_times: np.ndarray, duration: float
+    ) -> dict[model.DataCategory, tuple[np.ndarray, np.ndarray]]:
+        """Converts the start times of the windows into frames for each category.
+
+        Every window of a category has the same number of frames.
+        Windows exceeding the data of a category are clipped.
+
+        Args:
+            trial: The trial to be segmented.
+            start_times: The start times of the windows.
+            duration: The duration of a window in seconds.
+
+        Returns:
+            A dictionary containing the categories as keys and the first
+            frame index and the frame index after the last frame
+            of each window as values.
+        """
+        time_index = trial.get_time_index()
+        frames = {}
+        for category, data in trial.get_all_data().items():
+            n_frames = data.sizes["time"]
+            window_frames = max(round(duration * float(data.attrs["rate"])), 1)
+            starts = time_index.get_frames(category, start_times, side="left")
+            ends = np.minimum(starts + window_frames, n_frames)
+            frames[category] = (starts, ends)
+        return frames
@@ -1,4 +1,11 @@
 import decimal
+from collections.abc import Callable
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+# number of elements processed at once when mapping segments
+_CHUNK_SIZE = 2**18
 
 
 def get_decimal_places(number: float) -> int:
@@ -15,3 +22,451 @@ def get_decimal_places(number: float) -> int:
         raise ValueError("The number of decimal places must be an integer.")
 
     return abs(places)
+
+
+def find_nan_runs(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Find the runs of consecutive NaN values in a 1D array.
+
+    Args:
+        values: The array to search for NaN runs.
+
+    Returns:
+        The start indices and the lengths of the NaN runs.
+    """
+    is_nan = np.isnan(values).astype(np.int8)
+    edges = np.diff(is_nan, prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return starts, ends - starts
+
+
+def sliding_windows(
+    values: np.ndarray, window: int, stride: int = 1, axis: int = -1
+) -> np.ndarray:
+    """Create a read-only strided view of sliding windows over an array.
+
+    Args:
+        values: The array to create the windows from.
+        window: The number of elements in a window.
+        stride: The number of elements between the starts of two windows.
+        axis: The axis along which the windows slide.
+
+    Returns:
+        An array with the windows in the first dimension and the window
+        elements at the position of the sliding axis. No data is copied.
+    """
+    axis = axis % values.ndim
+    windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=axis)
+    windows = np.moveaxis(windows, axis, 0)[::stride]
+    # the window elements are appended as last axis, move them back in place
+    return np.moveaxis(windows, -1, axis + 1)
+
+
+def get_nan_percentiles(
+    values: np.ndarray, percentiles: list[float], axis: int = 0
+) -> np.ndarray:
+    """Get percentiles of an array ignoring missing values.
+
+    The result is the same as the one of np.nanpercentile with the linear
+    method, but the array is sorted once for all percentiles instead of
+    reducing each slice separately.
+
+    Args:
+        values: The array to get the percentiles from.
+        percentiles: The percentiles in the range [0, 100].
+        axis: The axis to reduce.
+
+    Returns:
+        The percentiles stacked in the first dimension instead of the axis.
+        Slices without any value are missing.
+    """
+    # missing values are sorted to the end
+    sorted_values = np.sort(values, axis=axis)
+    last = np.sum(~np.isnan(sorted_values), axis=axis, keepdims=True) - 1
+    result = []
+    for percentile in percentiles:
+        position = np.maximum(percentile / 100 * last, 0)
+        lower = np.floor(position).astype(np.intp)
+        upper = np.minimum(lower + 1, np.maximum(last, 0))
+        lower_values = np.take_along_axis(sorted_values, lower, axis)
+        upper_values = np.take_along_axis(sorted_values, upper, axis)
+        weights = (position - lower).astype(sorted_values.dtype)
+        result.append(
+            np.squeeze(lower_values + (upper_values - lower_values) * weights, axis)
+        )
+    return np.stack(result)
+
+
+def get_linear_weights(n_in: int, n_out: int) -> tuple[np.ndarray, np.ndarray]:
+    """Get the indices and weights to linearly interpolate to another length.
+
+    The samples are assumed to be equally spaced over the same interval.
+    An interpolated value is ``y[i] + (y[i + 1] - y[i]) * w``.
+
+    Args:
+        n_in: The number of input samples.
+        n_out: The number of output samples.
+
+    Returns:
+        The indices of the lower input samples and the weights of the upper ones.
+
+    Raises:
+        ValueError: If there are less than two input samples.
+    """
+    if n_in < 2:
+        raise ValueError("At least two samples are needed to interpolate.")
+    x_in = np.linspace(0, 99, n_in)
+    x_out = np.linspace(0, 99, n_out)
+    upper = np.clip(np.searchsorted(x_in, x_out), 1, n_in - 1)
+    lower = upper - 1
+    weights = (x_out - x_in[lower]) / (x_in[upper] - x_in[lower])
+    return lower, weights
+
+
+def get_spline_basis(n_in: int, n_out: int) -> np.ndarray:
+    """Get the matrix to interpolate with a cubic spline to another length.
+
+    A not-a-knot cubic spline is linear in the input samples, so the
+    interpolated samples are ``basis @ y`` for every input ``y``.
+    Weights below the squared machine epsilon are set to zero.
+
+    Args:
+        n_in: The number of input samples.
+        n_out: The number of output samples.
+
+    Returns:
+        The basis with the shape (n_out, n_in).
+
+    Raises:
+        ValueError: If there are less than two input samples.
+    """
+    if n_in < 2:
+        raise ValueError("At least two samples are needed to interpolate.")
+    x_in = np.linspace(0, 99, n_in)
+    x_out = np.linspace(0, 99, n_out)
+    basis = CubicSpline(x_in, np.eye(n_in), axis=0)(x_out)
+    # the weights decay away from the diagonal, drop the negligible ones
+    # since subnormal numbers slow down the matrix product
+    basis[np.abs(basis) < np.finfo(basis.dtype).eps ** 2] = 0
+    return basis
+
+
+def interpolate_pchip(
+    values: np.ndarray, lower: np.ndarray, weights: np.ndarray
+) -> np.ndarray:
+    """Evaluate a monotone piecewise cubic interpolation (PCHIP).
+
+    The samples are assumed to be equally spaced on the last axis. The result
+    is the same as the one of scipy.interpolate.PchipInterpolator, but only
+    the slopes of the samples next to the output samples are calculated and
+    gaps only affect their neighbouring samples.
+
+    Args:
+        values: The array with the samples on the last axis.
+        lower: The indices of the lower input samples of each output sample.
+        weights: The position of each output sample between the lower and
+            upper input sample.
+
+    Returns:
+        The interpolated array with the output samples on the last axis.
+
+    Raises:
+        ValueError: If there are less than two samples.
+    """
+    n_samples = values.shape[-1]
+    if n_samples < 2:
+        raise ValueError("At least two samples are needed to interpolate.")
+    lower_values = values[..., lower]
+    upper_values = values[..., lower + 1]
+    secants = upper_values - lower_values
+    if n_samples == 2:
+        lower_slopes = upper_slopes = secants
+    else:
+        left = lower_values - values[..., np.maximum(lower - 1, 0)]
+        right = values[..., np.minimum(lower + 2, n_samples - 1)] - upper_values
+        lower_slopes = _get_pchip_slopes(left, secants)
+        upper_slopes = _get_pchip_slopes(secants, right)
+        is_first = lower == 0
+        lower_slopes[..., is_first] = _get_pchip_edge_slopes(
+            secants[..., is_first], right[..., is_first]
+        )
+        is_last = lower == n_samples - 2
+        upper_slopes[..., is_last] = _get_pchip_edge_slopes(
+            secants[..., is_last], left[..., is_last]
+        )
+
+    weights = weights.astype(values.dtype, copy=False)
+    weights_2 = weights * weights
+    weights_3 = weights_2 * weights
+    result = secants * (3 * weights_2 - 2 * weights_3)
+    result += lower_values
+    result += lower_slopes * (weights_3 - 2 * weights_2 + weights)
+    result += upper_slopes * (weights_3 - weights_2)
+    return result
+
+
+def _get_pchip_slopes(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Get the PCHIP slopes of inner samples from their neighbouring secants.
+
+    Args:
+        left: The secants before the samples.
+        right: The secants after the samples.
+
+    Returns:
+        The harmonic means of the secants, zero at extrema.
+    """
+    product = left * right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = 2 * product / (left + right)
+    slopes[~(product > 0)] = 0
+    return slopes
+
+
+def _get_pchip_edge_slopes(secant: np.ndarray, inner: np.ndarray) -> np.ndarray:
+    """Get the one-sided three-point PCHIP slopes of edge samples.
+
+    Args:
+        secant: The secants next to the edges.
+        inner: The secants after the ones next to the edges.
+
+    Returns:
+        The slopes at the edges.
+    """
+    slopes = (3 * secant - inner) / 2
+    slopes[np.sign(slopes) != np.sign(secant)] = 0
+    is_overshoot = (np.sign(secant) != np.sign(inner)) & (
+        np.abs(slopes) > 3 * np.abs(secant)
+    )
+    slopes[is_overshoot] = 3 * secant[is_overshoot]
+    return slopes
+
+
+def map_equal_length_segments(
+    values: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    n_frames: int,
+    func: Callable[[np.ndarray, int], np.ndarray],
+    axis: int = -1,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Resample segments of an array by stacking the ones of equal length.
+
+    Args:
+        values: The array containing the segments.
+        starts: The index of the first sample of each segment along the axis.
+        ends: The index after the last sample of each segment along the axis.
+        n_frames: The number of samples to resample each segment to.
+        func: A callable getting the stacked segments with the samples on the
+            last axis and their length. It returns the resampled segments with
+            n_frames samples on the last axis.
+        axis: The axis along which the segments are taken.
+        out: The array to write the result to. Default = None, a new array
+
+    Returns:
+        An array with the segments in the first dimension
+        and n_frames samples on the axis.
+    """
+    axis = axis % values.ndim
+    starts = np.asarray(starts)
+    lengths = np.asarray(ends) - starts
+    result = _get_segments_output(values, len(starts), n_frames, axis, out)
+    samples = np.moveaxis(values, axis, -1).astype(result.dtype, copy=False)
+    segment_size = max(samples[..., 0].size, 1)
+    for length in np.unique(lengths):
+        in_length = np.flatnonzero(lengths == length)
+        # stack the segments in chunks which fit into the cpu cache
+        chunk_size = max(_CHUNK_SIZE // (segment_size * max(length, n_frames)), 1)
+        for chunk_start in range(0, len(in_length), chunk_size):
+            in_chunk = in_length[chunk_start : chunk_start + chunk_size]
+            indices = starts[in_chunk, np.newaxis] + np.arange(length)
+            # (segments, ..., length)
+            segments = np.moveaxis(samples[..., indices], -2, 0)
+            result[in_chunk] = np.moveaxis(func(segments, int(length)), -1, axis + 1)
+    return result
+
+
+def interpolate_segments(
+    values: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    n_frames: int,
+    axis: int = -1,
+    get_weights: Callable[[int, int], tuple[np.ndarray, np.ndarray]] = (
+        get_linear_weights
+    ),
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Linearly interpolate segments of an array to the same number of samples.
+
+    All segments are interpolated at once by gathering the neighbouring samples
+    of each output sample. The segments may have different lengths.
+
+    Args:
+        values: The array containing the segments.
+        starts: The index of the first sample of each segment along the axis.
+        ends: The index after the last sample of each segment along the axis.
+        n_frames: The number of samples to interpolate each segment to.
+        axis: The axis along which the segments are taken.
+        get_weights: A callable returning the indices and weights for an input
+            and output length. Default = get_linear_weights
+        out: The array to write the result to. Default = None, a new array
+
+    Returns:
+        An array with the segments in the first dimension
+        and n_frames samples on the axis.
+    """
+    n_segments = len(starts)
+    lower = np.empty((n_segments, n_frames), dtype=np.intp)
+    weights = np.empty((n_segments, n_frames))
+    lengths = np.asarray(ends) - np.asarray(starts)
+    for length in np.unique(lengths):
+        in_length = lengths == length
+        length_lower, length_weights = get_weights(int(length), n_frames)
+        lower[in_length] = np.asarray(starts)[in_length, np.newaxis] + length_lower
+        weights[in_length] = length_weights
+
+    return interpolate_at(values, lower, weights, axis, out)
+
+
+def interpolate_at(
+    values: np.ndarray,
+    lower: np.ndarray,
+    weights: np.ndarray,
+    axis: int = -1,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Linearly interpolate an array at fractional positions of segments.
+
+    An interpolated value is ``y[i] + (y[i + 1] - y[i]) * w``.
+
+    Args:
+        values: The array containing the segments.
+        lower: The indices of the lower samples with the shape
+            (n_segments, n_frames).
+        weights: The weights of the upper samples with the same shape.
+        axis: The axis along which the segments are taken.
+        out: The array to write the result to. Default = None, a new array
+
+    Returns:
+        An array with the segments in the first dimension
+        and n_frames samples on the axis.
+    """
+    axis = axis % values.ndim
+    n_segments, n_frames = lower.shape
+    result = _get_segments_output(values, n_segments, n_frames, axis, out)
+    dtype = result.dtype
+    # view the result with the segments and samples at the axis of the values
+    result_view = np.moveaxis(result, 0, axis)
+    weights = weights.reshape(
+        (1,) * axis + weights.shape + (1,) * (values.ndim - axis - 1)
+    ).astype(dtype, copy=False)
+    lower_values = np.take(values, lower, axis=axis)
+    np.subtract(np.take(values, lower + 1, axis=axis), lower_values, out=result_view)
+    result_view *= weights
+    result_view += lower_values
+    return result
+
+
+def _get_segments_output(
+    values: np.ndarray,
+    n_segments: int,
+    n_frames: int,
+    axis: int,
+    out: np.ndarray | None,
+) -> np.ndarray:
+    """Get the array for resampled segments.
+
+    Args:
+        values: The array containing the segments.
+        n_segments: The number of segments.
+        n_frames: The number of samples of each resampled segment.
+        axis: The non-negative axis along which the segments are taken.
+        out: The array provided by the caller or None.
+
+    Returns:
+        The provided array or a new one with the segments in the first dimension.
+
+    Raises:
+        ValueError: If the provided array has the wrong shape or is not floating.
+    """
+    shape = list(values.shape)
+    shape[axis] = n_frames
+    shape = (n_segments, *shape)
+    if out is None:
+        dtype = values.dtype if np.issubdtype(values.dtype, np.floating) else float
+        return np.empty(shape, dtype=dtype)
+    if out.shape != shape or not np.issubdtype(out.dtype, np.floating):
+        raise ValueError(f"The output must be a floating array of shape {shape}.")
+    return out
+
+
+def get_dtw_warps(values: np.ndarray, template: np.ndarray, radius: int) -> np.ndarray:
+    """Register curves to a template with dynamic time warping (DTW).
+
+    The warping paths are restricted to a Sakoe-Chiba band around the
+    diagonal. The costs of all curves are accumulated at once along the
+    anti-diagonals and the paths are traced back at once.
+
+    Args:
+        values: The curves with the shape (n_curves, n_features, n_frames).
+        template: The template with the shape (n_features, n_frames).
+        radius: The max distance of the path from the diagonal in frames.
+
+    Returns:
+        The warps with the shape (n_curves, n_frames, n_frames). A registered
+        curve is ``curve @ warp``, each template frame averages the frames of
+        the curve matched to it.
+    """
+    n_curves, _, n_frames = values.shape
+    rows, columns = np.indices((n_frames, n_frames))
+    in_band = np.abs(rows - columns) <= radius
+
+    # squared euclidean distances of all frame pairs
+    costs = np.matmul(values.transpose(0, 2, 1), template)
+    costs *= -2
+    costs += np.sum(values**2, axis=1)[:, :, np.newaxis]
+    costs += np.sum(template**2, axis=0)[np.newaxis, np.newaxis, :]
+    np.maximum(costs, 0, out=costs)
+    costs[:, ~in_band] = np.inf
+
+    # accumulated costs with an infinite border before the first frame
+    accumulated = np.full((n_curves, n_frames + 1, n_frames + 1), np.inf)
+    accumulated[:, 0, 0] = 0
+    for diagonal in range(2 * n_frames - 1):
+        row = np.arange(
+            max(0, diagonal - n_frames + 1, (diagonal - radius + 1) // 2),
+            min(n_frames - 1, diagonal, (diagonal + radius) // 2) + 1,
+        )
+        column = diagonal - row
+        previous = np.minimum(
+            np.minimum(
+                accumulated[:, row, column + 1], accumulated[:, row + 1, column]
+            ),
+            accumulated[:, row, column],
+        )
+        accumulated[:, row + 1, column + 1] = costs[:, row, column] + previous
+
+    # trace the paths back from the last frames
+    on_path = np.zeros((n_curves, n_frames, n_frames), dtype=bool)
+    curves = np.arange(n_curves)
+    row = np.full(n_curves, n_frames - 1)
+    column = np.full(n_curves, n_frames - 1)
+    on_path[curves, row, column] = True
+    for _ in range(2 * n_frames - 2):
+        steps = np.stack(
+            (
+                accumulated[curves, row, column],
+                accumulated[curves, row, column + 1],
+                accumulated[curves, row + 1, column],
+            )
+        )
+        step = np.argmin(steps, axis=0)
+        is_active = (row > 0) | (column > 0)
+        row = np.where(is_active & (step != 2), row - 1, row)
+        column = np.where(is_active & (step != 1), column - 1, column)
+        on_path[curves, row, column] = True
+
+    warps = on_path.astype(values.dtype if values.dtype.kind == "f" else float)
+    warps /= warps.sum(axis=1, keepdims=True)
+    return warps
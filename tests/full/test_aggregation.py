@@ -0,0 +1,132 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from gaitalytics.aggregation import EnsembleAggregator, StreamingAggregator
+from gaitalytics.io import MarkersInputFileReader, AnalogsInputFileReader, \
+    C3dEventInputFileReader
+from gaitalytics.model import DataCategory, Trial
+from gaitalytics.normalisation import LinearTimeNormaliser
+from gaitalytics.segmentation import GaitEventsSegmentation
+
+INPUT_C3D_SMALL: Path = Path('./tests/full/data/test_small.c3d')
+
+
+@pytest.fixture()
+def trial_small(request):
+    markers = MarkersInputFileReader(INPUT_C3D_SMALL).get_markers()
+    analogs = AnalogsInputFileReader(INPUT_C3D_SMALL).get_analogs()
+    events = C3dEventInputFileReader(INPUT_C3D_SMALL).get_events()
+
+    trial = Trial()
+    trial.add_data(DataCategory.MARKERS, markers)
+    trial.add_data(DataCategory.ANALOGS, analogs)
+    trial.events = events
+    segments = GaitEventsSegmentation("Foot Strike").segment(trial)
+    return LinearTimeNormaliser().normalise(segments)
+
+
+def _stack_cycles(trial, context, category):
+    return np.stack([cycle.get_data(category).values
+                     for cycle in trial.get_all_cycles()[context].values()])
+
+
+class TestEnsembleAggregator:
+
+    def test_aggregate(self, trial_small):
+        result = EnsembleAggregator(percentiles=(10, 90)).aggregate(trial_small)
+        markers = result[DataCategory.MARKERS]
+
+        rec_value = (markers.dims, markers.statistic.values.tolist())
+        exp_value = (("context", "statistic", "axis", "channel", "time"),
+                     ["mean", "std", "median", "p10", "p90"])
+        assert rec_value == exp_value
+
+        cycles = _stack_cycles(trial_small, "Left", DataCategory.MARKERS)
+        with np.errstate(all="ignore"), pytest.warns(RuntimeWarning):
+            exp_values = [np.nanmean(cycles, axis=0),
+                          np.nanstd(cycles, axis=0, ddof=1),
+                          *np.nanpercentile(cycles, [50, 10, 90], axis=0)]
+        for statistic, exp_value in zip(markers.statistic.values, exp_values):
+            rec_value = markers.sel(context="Left", statistic=statistic).values
+            np.testing.assert_allclose(rec_value, exp_value, equal_nan=True)
+
+    def test_skip_unused(self, trial_small):
+        for data in trial_small.get_cycle("Left", 1).get_all_data().values():
+            data.attrs["used"] = 0
+        result = EnsembleAggregator().aggregate(trial_small)
+        markers = result[DataCategory.MARKERS]
+
+        rec_value = markers.n_cycles.sel(context="Left").item()
+        exp_value = len(trial_small.get_all_cycles()["Left"]) - 1
+        assert rec_value == exp_value
+
+    def test_not_normalised(self):
+        markers = MarkersInputFileReader(INPUT_C3D_SMALL).get_markers()
+        trial = Trial()
+        trial.add_data(DataCategory.MARKERS, markers)
+        trial.events = C3dEventInputFileReader(INPUT_C3D_SMALL).get_events()
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial)
+        with pytest.raises(ValueError):
+            EnsembleAggregator().aggregate(segments)
+
+    def test_wrong_percentiles(self):
+        with pytest.raises(ValueError):
+            EnsembleAggregator(percentiles=(5, 105))
+
+
+class TestStreamingAggregator:
+
+    def test_update(self, trial_small):
+        aggregator = StreamingAggregator(categories=[DataCategory.ANALOGS])
+        for _ in range(3):
+            aggregator.update(trial_small)
+        result = aggregator.aggregate()
+
+        rec_value = list(result)
+        exp_value = [DataCategory.ANALOGS]
+        assert rec_value == exp_value
+
+        cycles = np.concatenate(
+            [_stack_cycles(trial_small, "Right", DataCategory.ANALOGS)] * 3)
+        analogs = result[DataCategory.ANALOGS].sel(context="Right")
+        np.testing.assert_allclose(analogs.sel(statistic="mean").values,
+                                   np.mean(cycles, axis=0))
+        np.testing.assert_allclose(analogs.sel(statistic="std").values,
+                                   np.std(cycles, axis=0, ddof=1), atol=1e-9)
+        np.testing.assert_array_equal(analogs.sel(statistic="max").values,
+                                      np.max(cycles, axis=0))
+
+        rec_value = analogs.n_cycles.item()
+        exp_value = len(cycles)
+        assert rec_value == exp_value
+
+    def test_merge(self, trial_small):
+        aggregator = StreamingAggregator()
+        aggregator.update(trial_small)
+        aggregator.update(trial_small)
+        worker = StreamingAggregator()
+        worker.update(trial_small)
+        merged = StreamingAggregator()
+        merged.merge(worker)
+        merged.merge(aggregator)
+
+        rec_value = merged.aggregate()[DataCategory.MARKERS]
+        exp_value = StreamingAggregator().aggregate(trial_small)[DataCategory.MARKERS]
+        np.testing.assert_allclose(rec_value.sel(statistic="mean").values,
+                                   exp_value.sel(statistic="mean").values,
+                                   equal_nan=True)
+        assert rec_value.n_cycles.values.tolist() == [3 * n for n in
+                                                       exp_value.n_cycles.values]
+
+    def test_different_channels(self, trial_small):
+        aggregator = StreamingAggregator(categories=[DataCategory.MARKERS])
+        aggregator.update(trial_small)
+        for cycles in trial_small.get_all_cycles().values():
+            for cycle in cycles.values():
+                markers = cycle.get_data(DataCategory.MARKERS)
+                cycle._data[DataCategory.MARKERS] = markers.assign_coords(
+                    channel=markers.channel.values[::-1])
+        with pytest.raises(ValueError):
+            aggregator.update(trial_small)
@@ -1,8 +1,13 @@
+import time
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
 import pytest
+import xarray as xr
 
-from gaitalytics.events import SequenceEventChecker, MarkerEventDetection
+from gaitalytics.events import SequenceEventChecker, MarkerEventDetection, \
+    VelocityEventDetection
 from gaitalytics.io import C3dEventInputFileReader, MarkersInputFileReader
 from gaitalytics.mapping import MappingConfigs
 from gaitalytics.model import DataCategory, Trial
@@ -54,6 +59,54 @@ class TestEventSequenceChecker:
         good, _ = checker.check_events(events)
         assert good, "Event sequence is not correct but it should be."
 
+    def test_sequence_long(self):
+        n_events = 12000
+        events = pd.DataFrame(
+            {
+                "time": np.arange(n_events) * 0.25,
+                "label": ["Foot Strike", "Foot Off"] * (n_events // 2),
+                "context": ["Right", "Left", "Left", "Right"] * (n_events // 4),
+                "icon_id": [1, 2] * (n_events // 2),
+            }
+        )
+        checker = SequenceEventChecker()
+        good, errors = checker.check_events(events)
+        assert good, f"Event sequence is not correct but it should be. {errors}"
+
+        events.loc[5000, "label"] = "Foot Off"
+        events.loc[9001, "context"] = "Right"
+        good, errors = checker.check_events(events)
+        assert not good
+
+        rec_value = errors[0]
+        exp_value = [(1249.75, 1250.0), (1250.0, 1250.25)]
+        assert rec_value == exp_value
+
+        rec_value = errors[1]
+        exp_value = [(2249.75, 2250.5)]
+        assert rec_value == exp_value
+
+    def test_sequence_long_benchmark(self):
+        n_events = 20000
+        events = pd.DataFrame(
+            {
+                "time": np.arange(n_events) * 0.25,
+                "label": ["Foot Strike", "Foot Off"] * (n_events // 2),
+                "context": ["Right", "Left", "Left", "Right"] * (n_events // 4),
+                "icon_id": [1, 2] * (n_events // 2),
+            }
+        )
+        events.loc[::1000, "label"] = "Foot Off"
+        checker = SequenceEventChecker()
+        start = time.perf_counter()
+        good, _ = checker.check_events(events)
+        rec_value = time.perf_counter() - start
+        assert not good
+
+        # the row wise checks took several seconds for this table
+        exp_value = 1.0
+        assert rec_value < exp_value, f"Checking {n_events} events took {rec_value} s"
+
     def test_sequence_empty(self):
         checker = SequenceEventChecker()
         with pytest.raises(ValueError):
@@ -88,6 +141,72 @@ class TestMarkerEventDetection:
             exp_value = events.iloc[i].loc['icon_id']
             assert rec_value == exp_value
 
+    def test_short_gap(self, trial_small, config):
+        exp_events = MarkerEventDetection(config).detect_events(trial_small)
+        markers = trial_small.get_data(DataCategory.MARKERS)
+        markers.loc[:, "LHEE", 3.0:3.05] = np.nan
+        rec_events = MarkerEventDetection(config).detect_events(trial_small)
+        assert rec_events.equals(exp_events)
+
+    def test_long_gap(self, trial_small, config):
+        exp_events = MarkerEventDetection(config).detect_events(trial_small)
+        markers = trial_small.get_data(DataCategory.MARKERS)
+        markers.loc[:, "RHEE", 3.5:4.2] = np.nan
+        rec_events = MarkerEventDetection(config).detect_events(trial_small)
+
+        in_gap = (rec_events["time"] >= 3.5) & (rec_events["time"] <= 4.2)
+        r_hs = (rec_events["context"] == "Right") & (
+                rec_events["label"] == "Foot Strike")
+        rec_value = len(rec_events[in_gap & r_hs])
+        exp_value = 0
+        assert rec_value == exp_value
+
+        rec_value = len(rec_events)
+        exp_value = len(exp_events) - 1
+        assert rec_value == exp_value
+
+    def test_chunked(self, trial_small, config):
+        exp_events = MarkerEventDetection(config).detect_events(trial_small)
+        rec_events = MarkerEventDetection(
+            config, window=60, overlap=20).detect_events(trial_small)
+        assert rec_events.equals(exp_events)
+
+    def test_chunked_overlap(self, config):
+        with pytest.raises(ValueError):
+            MarkerEventDetection(config, window=60, overlap=60)
+
+    def test_normalise_negative(self):
+        time = np.linspace(0, 1, 101)
+        signal = xr.DataArray(np.sin(2 * np.pi * time) - 2, dims=["time"],
+                              coords={"time": time})
+        normalised = MarkerEventDetection._normalise(signal)
+
+        rec_value = int(normalised.argmax())
+        exp_value = int(signal.argmax())
+        assert rec_value == exp_value
+
+        rec_value = float(abs(normalised).max())
+        exp_value = 100
+        assert rec_value <= exp_value
+
+    def test_auto_distance(self, trial_small, config):
+        exp_events = MarkerEventDetection(config).detect_events(trial_small)
+        rec_events = MarkerEventDetection(
+            config, distance="auto").detect_events(trial_small)
+        assert rec_events.equals(exp_events)
+
+    def test_auto_distance_noise(self, trial_small, config):
+        exp_events = MarkerEventDetection(config).detect_events(trial_small)
+        markers = trial_small.get_data(DataCategory.MARKERS)
+        rng = np.random.default_rng(0)
+        markers.values += rng.normal(0, 3, markers.shape)
+
+        noisy_events = MarkerEventDetection(config).detect_events(trial_small)
+        rec_events = MarkerEventDetection(
+            config, distance="auto").detect_events(trial_small)
+        assert len(rec_events) < len(noisy_events)
+        assert len(rec_events) <= len(exp_events) + 2
+
     def test_big(self, trial_big, config):
         pred_events = MarkerEventDetection(config).detect_events(trial_big)
         events = trial_big.events
@@ -112,3 +231,71 @@ class TestMarkerEventDetection:
             rec_value = pred_events.iloc[i].loc['icon_id']
             exp_value = events.iloc[i].loc['icon_id']
             assert rec_value == exp_value
+
+
+class TestVelocityEventDetection:
+
+    def test_small(self, trial_small, config):
+        pred_events = VelocityEventDetection(config).detect_events(trial_small)
+        events = trial_small.events
+
+        rec_value = len(pred_events)
+        exp_value = len(events)
+        assert rec_value == exp_value
+
+        for i in range(0, len(pred_events)):
+            rec_value = abs(
+                pred_events.iloc[i].loc['time'] - events.iloc[i].loc['time'])
+            exp_value = 0.1
+            assert rec_value < exp_value
+
+            rec_value = pred_events.iloc[i].loc['label']
+            exp_value = events.iloc[i].loc['label']
+            assert rec_value == exp_value
+
+            rec_value = pred_events.iloc[i].loc['context']
+            exp_value = events.iloc[i].loc['context']
+            assert rec_value == exp_value
+
+    def test_distance(self, trial_small, config):
+        pred_events = VelocityEventDetection(config, distance=1000).detect_events(
+            trial_small)
+
+        rec_value = len(pred_events)
+        exp_value = 4
+        assert rec_value == exp_value
+
+    def test_deceleration(self, trial_small, config):
+        pred_events = VelocityEventDetection(config, deceleration=0).detect_events(
+            trial_small)
+
+        rec_value = (pred_events['label'] == 'Foot Strike').sum()
+        exp_value = 0
+        assert rec_value == exp_value
+
+        rec_value = len(pred_events)
+        exp_value = len(VelocityEventDetection(config).detect_events(trial_small)) - 6
+        assert rec_value == exp_value
+
+    def test_short_gap(self, trial_small, config):
+        exp_events = VelocityEventDetection(config).detect_events(trial_small)
+        markers = trial_small.get_data(DataCategory.MARKERS)
+        markers.loc[:, "LHEE", 3.2:3.23] = np.nan
+        rec_events = VelocityEventDetection(config).detect_events(trial_small)
+        assert rec_events.equals(exp_events)
+
+    def test_long_gap(self, trial_small, config):
+        exp_events = VelocityEventDetection(config).detect_events(trial_small)
+        markers = trial_small.get_data(DataCategory.MARKERS)
+        markers.loc[:, "RHEE", 3.5:4.2] = np.nan
+        rec_events = VelocityEventDetection(config).detect_events(trial_small)
+
+        in_gap = (rec_events["time"] >= 3.5) & (rec_events["time"] <= 4.2)
+        right = rec_events["context"] == "Right"
+        rec_value = len(rec_events[in_gap & right])
+        exp_value = 0
+        assert rec_value == exp_value
+
+        rec_value = len(rec_events[~right])
+        exp_value = len(exp_events[exp_events["context"] != "Right"])
+        assert rec_value == exp_value
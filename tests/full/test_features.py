@@ -1,5 +1,6 @@
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 from gaitalytics.features import TimeSeriesFeatures, TemporalFeatures, SpatialFeatures, \
@@ -7,7 +8,7 @@ from gaitalytics.features import TimeSeriesFeatures, TemporalFeatures, SpatialFe
 from gaitalytics.io import MarkersInputFileReader, C3dEventInputFileReader, \
     AnalogsInputFileReader, AnalysisInputReader
 from gaitalytics.mapping import MappingConfigs
-from gaitalytics.model import DataCategory, Trial
+from gaitalytics.model import DataCategory, Trial, LazyTrialCycles
 from gaitalytics.segmentation import GaitEventsSegmentation
 
 INPUT_C3D_SMALL: Path = Path('./tests/full/data/test_small.c3d')
@@ -37,6 +38,23 @@ def trial_small(request):
     return GaitEventsSegmentation().segment(trial)
 
 
+@pytest.fixture()
+def trial_small_float32(request):
+    configs = MappingConfigs(CONFIG_FILE)
+    markers = MarkersInputFileReader(INPUT_C3D_SMALL, np.float32).get_markers()
+    analogs = AnalogsInputFileReader(INPUT_C3D_SMALL, np.float32).get_analogs()
+    analysis = AnalysisInputReader(INPUT_C3D_SMALL, configs, np.float32).get_analysis()
+    events = C3dEventInputFileReader(INPUT_C3D_SMALL).get_events()
+
+    trial = Trial()
+    trial.add_data(DataCategory.MARKERS, markers)
+    trial.add_data(DataCategory.ANALOGS, analogs)
+    trial.add_data(DataCategory.ANALYSIS, analysis)
+    trial.events = events
+
+    return GaitEventsSegmentation().segment(trial)
+
+
 @pytest.fixture()
 def trial_big(request):
     configs = MappingConfigs(CONFIG_FILE)
@@ -187,6 +205,49 @@ class TestPhaseTimeSeriesFeatures:
                 assert rec_value == exp_value
 
 
+class TestFeaturesDtype:
+
+    @pytest.mark.parametrize("method", [TimeSeriesFeatures, TemporalFeatures])
+    def test_calculation_float32(self, configs, trial_small, trial_small_float32,
+                                 method):
+        features = method(configs).calculate(trial_small)
+        features_32 = method(configs).calculate(trial_small_float32)
+
+        rec_value = features_32.dtype
+        exp_value = np.float32
+        assert rec_value == exp_value
+        np.testing.assert_allclose(features_32.values, features.values, rtol=1e-4,
+                                   atol=1e-4)
+
+    def test_configured_dtype(self, configs, trial_small):
+        features = TemporalFeatures(configs, dtype=np.float32).calculate(trial_small)
+
+        rec_value = features.dtype
+        exp_value = np.float32
+        assert rec_value == exp_value
+
+    def test_dtype_lazy(self, configs, trial_small_float32):
+        loaded = []
+
+        def load_cycle(context, cycle_id):
+            loaded.append((context, cycle_id))
+            return trial_small_float32.get_cycle(context, cycle_id)
+
+        cycle_attrs = {
+            context: {cycle_id: trial_small_float32.get_cycle_attrs(context, cycle_id)
+                      for cycle_id in cycles}
+            for context, cycles in trial_small_float32.get_all_cycles().items()}
+        lazy_trial = LazyTrialCycles(load_cycle, cycle_attrs)
+
+        rec_value = TemporalFeatures(configs)._get_dtype(lazy_trial)
+        exp_value = np.float32
+        assert rec_value == exp_value
+
+        rec_value = len(loaded)
+        exp_value = 1
+        assert rec_value == exp_value
+
+
 class TestTemporalFeatures:
 
     def test_calculation(self, configs, trial_small):
@@ -267,6 +328,26 @@ class TestTemporalFeatures:
         exp_value = 59.6330 / 100
         assert rec_value == pytest.approx(exp_value, rel=1e-5)
 
+    def test_skip_unused(self, configs, trial_small):
+        trial_small.get_cycle("Left", 1).events.attrs["used"] = 0
+        features = TemporalFeatures(configs).calculate(trial_small)
+
+        rec_value = features.loc["Left"].dropna("cycle", how="all").cycle.values.tolist()
+        exp_value = [0]
+        assert rec_value == exp_value
+
+        rec_value = features.loc["Right"].cycle.values.tolist()
+        exp_value = [0, 1]
+        assert rec_value == exp_value
+
+
+    def test_all_unused(self, configs, trial_small):
+        for context, cycles in trial_small.get_all_cycles().items():
+            for cycle in cycles.values():
+                cycle.events.attrs["used"] = 0
+        with pytest.raises(ValueError):
+            TemporalFeatures(configs).calculate(trial_small)
+
 
 class TestSpatialFeatures:
     def test_calculation_big(self, configs, trial_big):
@@ -90,6 +90,20 @@ class TestMarkers:
         assert (markers.loc['x', 'RTOE'][0:5].data == exp_x_values).all()
 
         assert markers.coords['time'][0] == 2.48
+
+    def test_c3d_markers_float32(self):
+        markers = MarkersInputFileReader(INPUT_C3D_SMALL).get_markers()
+        markers_32 = MarkersInputFileReader(INPUT_C3D_SMALL, np.float32).get_markers()
+
+        rec_value = markers_32.dtype
+        exp_value = np.float32
+        assert rec_value == exp_value
+        np.testing.assert_allclose(markers_32.values, markers.values, rtol=1e-6)
+        assert markers_32.attrs == markers.attrs
+
+    def test_c3d_markers_wrong_dtype(self):
+        with pytest.raises(ValueError):
+            MarkersInputFileReader(INPUT_C3D_SMALL, np.int32)
     def test_c3d_markers_big(self):
         c3d_markers = MarkersInputFileReader(INPUT_C3D_BIG)
         markers = c3d_markers.get_markers()
@@ -135,6 +135,38 @@ class TestTrial:
         exp_value = 3
         assert rec_value == exp_value
 
+    def test_time_index(self, trial_small):
+        time_index = trial_small.get_time_index()
+        event_times = trial_small.events["time"].values
+        for category, data in trial_small.get_all_data().items():
+            rec_value = time_index.get_frames(category, event_times).tolist()
+            exp_value = [
+                data.indexes["time"].get_indexer([t], method="nearest")[0]
+                for t in event_times
+            ]
+            assert rec_value == exp_value
+
+        analogs = trial_small.get_data(DataCategory.ANALOGS)
+        start_time = analogs.coords["time"].values[10]
+        rec_value = time_index.get_frames(DataCategory.ANALOGS, start_time, "left")
+        exp_value = 10
+        assert rec_value == exp_value
+
+        rec_value = time_index.get_frames(DataCategory.ANALOGS, start_time, "right")
+        exp_value = 11
+        assert rec_value == exp_value
+
+        with pytest.raises(ValueError):
+            time_index.get_frames(DataCategory.ANALOGS, start_time, "foo")
+
+    def test_time_index_reset(self, trial_small):
+        time_index = trial_small.get_time_index()
+        assert trial_small.get_time_index() is time_index
+
+        trial_small.add_data(
+            DataCategory.ANALYSIS, trial_small.get_data(DataCategory.ANALYSIS))
+        assert trial_small.get_time_index() is not time_index
+
     def test_save_empty_to_hdf5(self, output_file_path_small):
         trial = Trial()
         with pytest.raises(ValueError):
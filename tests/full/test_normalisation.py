@@ -1,12 +1,17 @@
 import shutil
 from pathlib import Path
 
+import numpy as np
 import pytest
+import xarray as xr
+from scipy.interpolate import CubicSpline, PchipInterpolator
 
 from gaitalytics.io import MarkersInputFileReader, AnalogsInputFileReader, \
     C3dEventInputFileReader
 from gaitalytics.model import DataCategory, Trial, trial_from_hdf5, TrialCycles
-from gaitalytics.normalisation import LinearTimeNormaliser
+from gaitalytics.normalisation import InterpolationWeightCache, LinearTimeNormaliser, \
+    PchipTimeNormaliser, SplineTimeNormaliser, PhaseTimeNormaliser, ZScoreNormaliser, \
+    MinMaxNormaliser, BodyScaleNormaliser, ResamplingNormaliser, DtwTimeNormaliser
 from gaitalytics.segmentation import GaitEventsSegmentation
 
 INPUT_C3D_SMALL: Path = Path('./tests/full/data/test_small.c3d')
@@ -89,6 +94,45 @@ class TestLinearTimeNormalisation:
         exp_value = 100
         assert rec_value == exp_value
 
+    def test_normalisation_segment_trial_batched(self, trial_small):
+        normaliser = LinearTimeNormaliser()
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        normalised_trial = normaliser.normalise(segments)
+
+        for context, cycles in segments.get_all_cycles().items():
+            for cycle_id, cycle in cycles.items():
+                exp_cycle = normaliser._normalise_trial(cycle)
+                rec_cycle = normalised_trial.get_cycle(context, cycle_id)
+                for category, exp_data in exp_cycle.get_all_data().items():
+                    rec_data = rec_cycle.get_data(category)
+                    np.testing.assert_allclose(rec_data.values, exp_data.values)
+                    np.testing.assert_array_equal(
+                        rec_data.coords["time"].values,
+                        exp_data.coords["time"].values)
+
+                    rec_value = rec_data.attrs
+                    exp_value = exp_data.attrs
+                    assert rec_value == exp_value
+
+    def test_normalisation_segment_trial_mixed_channels(self, trial_small):
+        normaliser = LinearTimeNormaliser()
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        markers = segments.get_cycle("Left", 0).get_data(DataCategory.MARKERS)
+        cycle = Trial()
+        cycle.add_data(DataCategory.MARKERS, markers.isel(channel=slice(0, 10)))
+        segments.add_cycle("Left", 0, cycle)
+
+        normalised_trial = normaliser.normalise(segments)
+        rec_value = normalised_trial.get_cycle("Left", 0).get_data(
+            DataCategory.MARKERS).shape
+        exp_value = (3, 10, 100)
+        assert rec_value == exp_value
+
+        rec_value = normalised_trial.get_cycle("Left", 1).get_data(
+            DataCategory.MARKERS).shape
+        exp_value = (3, markers.sizes["channel"], 100)
+        assert rec_value == exp_value
+
     def test_normalisation_segment_trial_big(self, trial_big):
         normaliser = LinearTimeNormaliser()
         segments = GaitEventsSegmentation("Foot Strike").segment(trial_big)
@@ -125,3 +169,485 @@ class TestLinearTimeNormalisation:
         rec_value = len(force)
         exp_value = 100
         assert rec_value == exp_value
+
+
+class TestCubicTimeNormalisation:
+
+    @pytest.mark.parametrize("normaliser, interpolator", [
+        (SplineTimeNormaliser, CubicSpline),
+        (PchipTimeNormaliser, PchipInterpolator),
+    ])
+    def test_normalisation_segment_trial(self, trial_small, normaliser,
+                                         interpolator):
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        normalised_trial = normaliser().normalise(segments)
+
+        for category, channel in ((DataCategory.MARKERS, ("x", "LHipAngles")),
+                                  (DataCategory.ANALOGS, ("Force.Fx1",))):
+            cycle = segments.get_cycle("Right", 0).get_data(category)
+            data = cycle.loc[channel].values
+            norm = normalised_trial.get_cycle("Right", 0).get_data(category)
+
+            rec_value = norm.loc[channel].values
+            exp_value = interpolator(np.linspace(0, 99, len(data)), data)(
+                np.linspace(0, 99, 100))
+            np.testing.assert_allclose(rec_value, exp_value, atol=1e-9)
+
+            rec_value = norm.attrs
+            exp_value = cycle.attrs
+            assert rec_value == exp_value
+
+    def test_normalisation_pchip_gaps(self, trial_small):
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        cycle = segments.get_cycle("Right", 0).get_data(DataCategory.MARKERS)
+        cycle.loc["x", "LHipAngles"][10:12] = np.nan
+
+        normalised_trial = PchipTimeNormaliser().normalise(segments)
+        norm = normalised_trial.get_cycle("Right", 0).get_data(DataCategory.MARKERS)
+        hip = norm.loc["x", "LHipAngles"].values
+
+        rec_value = np.isnan(hip[:5]).any() or np.isnan(hip[-5:]).any()
+        exp_value = False
+        assert rec_value == exp_value
+
+        rec_value = np.isnan(hip).any()
+        exp_value = True
+        assert rec_value == exp_value
+
+    def test_normalisation_trial(self, trial_small):
+        normalised_trial = SplineTimeNormaliser(n_frames=50).normalise(trial_small)
+
+        rec_value = normalised_trial.get_data(DataCategory.MARKERS).sizes["time"]
+        exp_value = 50
+        assert rec_value == exp_value
+
+
+class TestPhaseTimeNormalisation:
+
+    def test_normalisation_foot_off(self, trial_small):
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        normalised_trial = PhaseTimeNormaliser((60, 40)).normalise(segments)
+
+        cycle = segments.get_cycle("Left", 1)
+        events = cycle.events
+        foot_off = events.loc[(events["label"] == "Foot Off")
+                              & (events["context"] == "Left"), "time"].values[0]
+        hip = cycle.get_data(DataCategory.MARKERS).loc["x", "LHipAngles"]
+        norm = normalised_trial.get_cycle("Left", 1).get_data(DataCategory.MARKERS)
+        norm_hip = norm.loc["x", "LHipAngles"]
+
+        rec_value = norm_hip.sizes["time"]
+        exp_value = 100
+        assert rec_value == exp_value
+
+        rec_value = float(norm_hip[60])
+        exp_value = float(hip.interp(time=foot_off))
+        assert rec_value == pytest.approx(exp_value)
+
+        rec_value = (float(norm_hip[0]), float(norm_hip[-1]))
+        exp_value = (float(hip[0]), float(hip[-1]))
+        assert rec_value == exp_value
+
+    def test_normalisation_contra_events(self, trial_small):
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        normaliser = PhaseTimeNormaliser((10, 40, 10, 40),
+                                         ("Foot Off", "Foot Strike", "Foot Off"),
+                                         ("contra", "contra", "ipsi"))
+        normalised_trial = normaliser.normalise(segments)
+
+        rec_value = normalised_trial.get_cycle("Right", 0).get_data(
+            DataCategory.ANALOGS).sizes["time"]
+        exp_value = 100
+        assert rec_value == exp_value
+
+    def test_normalisation_missing_events(self, trial_small):
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        normaliser = PhaseTimeNormaliser((50, 50), ("Foot Strike",), ("ipsi",))
+        with pytest.raises(ValueError):
+            normaliser.normalise(segments)
+
+    def test_normalisation_wrong_phases(self):
+        with pytest.raises(ValueError):
+            PhaseTimeNormaliser((60, 20, 20))
+
+
+class TestAmplitudeNormalisation:
+
+    def test_zscore_segment_trial(self, trial_small):
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        normalised_trial = ZScoreNormaliser().normalise(segments)
+
+        values = np.concatenate(
+            [cycle.get_data(DataCategory.ANALOGS).values
+             for cycles in normalised_trial.get_all_cycles().values()
+             for cycle in cycles.values()], axis=1)
+
+        rec_value = np.nanmean(values, axis=1)
+        exp_value = np.zeros(values.shape[0])
+        np.testing.assert_allclose(rec_value, exp_value, atol=1e-9)
+
+        # constant channels are only shifted
+        original = np.concatenate(
+            [cycle.get_data(DataCategory.ANALOGS).values
+             for cycles in segments.get_all_cycles().values()
+             for cycle in cycles.values()], axis=1)
+        rec_value = np.nanstd(values, axis=1)
+        exp_value = np.where(np.nanstd(original, axis=1) > 0, 1, 0)
+        np.testing.assert_allclose(rec_value, exp_value)
+
+    def test_minmax_channels(self, trial_small):
+        normaliser = MinMaxNormaliser(categories=[DataCategory.MARKERS],
+                                      channels=["LHipAngles"])
+        normalised_trial = normaliser.normalise(trial_small)
+        markers = normalised_trial.get_data(DataCategory.MARKERS)
+
+        rec_value = (float(markers.loc["x", "LHipAngles"].min()),
+                     float(markers.loc["x", "LHipAngles"].max()))
+        exp_value = (0, 1)
+        assert rec_value == exp_value
+
+        rec_value = markers.loc["x", "LKneeAngles"].values
+        exp_value = trial_small.get_data(DataCategory.MARKERS).loc[
+            "x", "LKneeAngles"].values
+        np.testing.assert_array_equal(rec_value, exp_value)
+
+        rec_value = normalised_trial.get_data(DataCategory.ANALOGS)
+        exp_value = trial_small.get_data(DataCategory.ANALOGS)
+        assert rec_value is exp_value
+
+    def test_body_scale(self, trial_small):
+        normaliser = BodyScaleNormaliser(70, 1.8, use_weight=True)
+        normalised_trial = normaliser.normalise(trial_small)
+
+        rec_value = normalised_trial.get_data(DataCategory.ANALOGS).loc[
+            "Force.Fz1"].values
+        exp_value = trial_small.get_data(DataCategory.ANALOGS).loc[
+            "Force.Fz1"].values / (70 * 9.81 * 1.8)
+        np.testing.assert_allclose(rec_value, exp_value)
+
+        rec_value = normalised_trial.get_data(DataCategory.ANALOGS).loc[
+            "Voltage.RTA"].values
+        exp_value = trial_small.get_data(DataCategory.ANALOGS).loc[
+            "Voltage.RTA"].values
+        np.testing.assert_array_equal(rec_value, exp_value)
+
+        rec_value = normalised_trial.get_data(DataCategory.MARKERS)
+        exp_value = trial_small.get_data(DataCategory.MARKERS)
+        np.testing.assert_array_equal(
+            rec_value.loc[:, "RTOE"].values, exp_value.loc[:, "RTOE"].values)
+        np.testing.assert_allclose(
+            rec_value.loc[:, "LAnkleMoment"].values,
+            exp_value.loc[:, "LAnkleMoment"].values / (70 * 9.81 * 1.8))
+
+    def test_body_scale_channels(self, trial_small):
+        normaliser = BodyScaleNormaliser(70, channels=["RTOE"])
+        normalised_trial = normaliser.normalise(trial_small)
+
+        rec_value = normalised_trial.get_data(DataCategory.MARKERS)
+        exp_value = trial_small.get_data(DataCategory.MARKERS)
+        np.testing.assert_allclose(
+            rec_value.loc[:, "RTOE"].values, exp_value.loc[:, "RTOE"].values / 70)
+
+        rec_value = normalised_trial.get_data(DataCategory.ANALOGS)
+        exp_value = trial_small.get_data(DataCategory.ANALOGS)
+        assert rec_value is exp_value
+
+    def test_invert_chained(self, trial_small, output_path_small):
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        normalised_trial = BodyScaleNormaliser(70).normalise(segments)
+        normalised_trial = ZScoreNormaliser().normalise(normalised_trial)
+        normalised_trial.to_hdf5(output_path_small)
+        restored_trial = ZScoreNormaliser().invert(
+            trial_from_hdf5(output_path_small))
+
+        cycle = segments.get_cycle("Left", 0).get_data(DataCategory.MARKERS)
+        restored = restored_trial.get_cycle("Left", 0).get_data(
+            DataCategory.MARKERS)
+
+        np.testing.assert_allclose(restored.values, cycle.values, atol=1e-9)
+
+        rec_value = "amplitude_offset" in restored.attrs
+        exp_value = False
+        assert rec_value == exp_value
+
+
+class TestResamplingNormalisation:
+
+    def test_downsample_analogs(self, trial_small):
+        analogs = trial_small.get_data(DataCategory.ANALOGS)
+        sine = np.sin(2 * np.pi * 2 * analogs.time.values)
+        analogs.loc["Force.Fz1"] = sine
+        resampled_trial = ResamplingNormaliser(100).normalise(trial_small)
+        resampled = resampled_trial.get_data(DataCategory.ANALOGS)
+        markers = trial_small.get_data(DataCategory.MARKERS)
+
+        rec_value = (resampled.sizes["time"], resampled.attrs["rate"],
+                     resampled.attrs["first_frame"])
+        exp_value = (markers.sizes["time"], 100, markers.attrs["first_frame"])
+        assert rec_value == exp_value
+
+        np.testing.assert_allclose(resampled.time.values, markers.time.values)
+
+        rec_value = resampled.loc["Force.Fz1"].values
+        exp_value = np.sin(2 * np.pi * 2 * markers.time.values)
+        np.testing.assert_allclose(rec_value, exp_value, atol=1e-2)
+
+    def test_upsample_markers(self, trial_small):
+        normaliser = ResamplingNormaliser(200, categories=[DataCategory.MARKERS])
+        resampled_trial = normaliser.normalise(trial_small)
+        markers = trial_small.get_data(DataCategory.MARKERS)
+        resampled = resampled_trial.get_data(DataCategory.MARKERS)
+
+        rec_value = resampled.sizes["time"]
+        exp_value = markers.sizes["time"] * 2 - 1
+        assert rec_value == exp_value
+
+        rec_value = resampled.values
+        exp_value = markers.interp(time=resampled.time).values
+        is_finite = np.isfinite(rec_value) & np.isfinite(exp_value)
+        np.testing.assert_allclose(rec_value[is_finite], exp_value[is_finite],
+                                   atol=1e-9)
+
+        rec_value = resampled_trial.get_data(DataCategory.ANALOGS)
+        exp_value = trial_small.get_data(DataCategory.ANALOGS)
+        assert rec_value is exp_value
+
+    def test_resample_shared_time(self, trial_small):
+        resampled_trial = ResamplingNormaliser(750).normalise(trial_small)
+        markers = resampled_trial.get_data(DataCategory.MARKERS)
+        analogs = resampled_trial.get_data(DataCategory.ANALOGS)
+
+        # the analogs are recorded 9 ms longer than the markers
+        rec_value = analogs.time.values[:markers.sizes["time"]]
+        exp_value = markers.time.values
+        np.testing.assert_allclose(rec_value, exp_value)
+
+        for category in (DataCategory.MARKERS, DataCategory.ANALOGS):
+            original = trial_small.get_data(category)
+            resampled = resampled_trial.get_data(category)
+            rec_value = resampled.sizes["time"]
+            exp_value = int((original.sizes["time"] - 1) * 750 /
+                            original.attrs["rate"] + 1e-9) + 1
+            assert rec_value == exp_value
+            assert resampled.time.values[-1] <= original.time.values[-1]
+
+    def test_resample_cycles(self, trial_small):
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        resampled_trial = ResamplingNormaliser(100).normalise(segments)
+        cycle = resampled_trial.get_cycle("Left", 0)
+
+        rec_value = cycle.get_data(DataCategory.ANALOGS).sizes["time"]
+        exp_value = cycle.get_data(DataCategory.MARKERS).sizes["time"]
+        assert rec_value == exp_value
+
+        rec_value = cycle.events is not None
+        exp_value = True
+        assert rec_value == exp_value
+
+
+class TestDtwTimeNormalisation:
+
+    @staticmethod
+    def _create_cycles(shifts):
+        trial = TrialCycles()
+        frames = np.linspace(0, 1, 100)
+        for cycle_id, shift in enumerate(shifts):
+            warped = frames + shift * np.sin(np.pi * frames)
+            cycle = Trial()
+            cycle.add_data(DataCategory.ANALYSIS, xr.DataArray(
+                np.stack([np.sin(2 * np.pi * warped), warped]),
+                dims=("channel", "time"),
+                coords={"channel": ["Curve", "Phase"], "time": frames}))
+            trial.add_cycle("Left", cycle_id, cycle)
+        return trial
+
+    def test_registration(self):
+        trial = self._create_cycles([-0.1, 0, 0.1])
+        linear = LinearTimeNormaliser().normalise(trial)
+        registered = DtwTimeNormaliser(
+            ["Curve"], DataCategory.ANALYSIS, band=0.2, workers=2,
+            block_size=2).normalise(trial)
+
+        def get_spread(normalised_trial, channel):
+            curves = [cycle.get_data(DataCategory.ANALYSIS).loc[channel].values
+                      for cycle in normalised_trial.get_all_cycles()["Left"].values()]
+            return np.abs(np.diff(curves, axis=0)).mean()
+
+        rec_value = get_spread(registered, "Curve") < get_spread(linear, "Curve") / 2
+        exp_value = True
+        assert rec_value == exp_value
+
+        # all channels are warped with the path of the reference channel
+        rec_value = get_spread(registered, "Phase") < get_spread(linear, "Phase") / 2
+        exp_value = True
+        assert rec_value == exp_value
+
+    def test_segment_trial(self, trial_small):
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        normalised_trial = DtwTimeNormaliser(["LKneeAngles"]).normalise(segments)
+        cycle = normalised_trial.get_cycle("Right", 0)
+
+        rec_value = (cycle.get_data(DataCategory.MARKERS).sizes["time"],
+                     cycle.get_data(DataCategory.ANALOGS).sizes["time"])
+        exp_value = (100, 100)
+        assert rec_value == exp_value
+
+    def test_trial(self, trial_small):
+        with pytest.raises(TypeError):
+            DtwTimeNormaliser().normalise(trial_small)
+
+
+class TestInterpolationWeightCache:
+
+    def test_cache_hits(self):
+        cache = InterpolationWeightCache()
+        lower, weights = cache.get_weights(120, 100)
+        cache.get_weights(120, 100)
+        cache.get_weights(130, 100)
+
+        rec_value = cache.get_stats()
+        exp_value = {"hits": 1, "misses": 2, "hit_rate": 1 / 3, "size": 2,
+                     "max_size": 256}
+        assert rec_value == exp_value
+
+        rec_value = lower.flags.writeable or weights.flags.writeable
+        exp_value = False
+        assert rec_value == exp_value
+
+    def test_cache_eviction(self):
+        cache = InterpolationWeightCache(max_size=2)
+        cache.get_weights(120, 100)
+        cache.get_weights(130, 100)
+        cache.get_weights(120, 100)
+        cache.get_weights(140, 100)
+        cache.get_weights(130, 100)
+
+        rec_value = (cache.hits, cache.misses, cache.get_stats()["size"])
+        exp_value = (1, 4, 2)
+        assert rec_value == exp_value
+
+    def test_cache_unsupported_method(self):
+        cache = InterpolationWeightCache()
+        with pytest.raises(ValueError):
+            cache.get_weights(120, 100, "cubic")
+
+    def test_normalisation_uses_cache(self, trial_small):
+        cache = InterpolationWeightCache()
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        LinearTimeNormaliser(weight_cache=cache).normalise(segments)
+        misses = cache.misses
+        normalised = LinearTimeNormaliser(weight_cache=cache).normalise(segments)
+        expected = LinearTimeNormaliser(
+            weight_cache=InterpolationWeightCache(max_size=0)).normalise(segments)
+
+        rec_value = (cache.misses, cache.hits)
+        exp_value = (misses, misses)
+        assert rec_value == exp_value
+
+        rec_value = normalised.get_cycle("Right", 0).get_data(DataCategory.MARKERS)
+        exp_value = expected.get_cycle("Right", 0).get_data(DataCategory.MARKERS)
+        np.testing.assert_array_equal(rec_value.values, exp_value.values)
+
+
+class TestNormaliseArrays:
+
+    def test_segment_trial(self, trial_small):
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        normalised = LinearTimeNormaliser().normalise(segments)
+        arrays = LinearTimeNormaliser().normalise_arrays(segments)
+
+        rec_value = arrays[DataCategory.MARKERS].dims
+        exp_value = ("cycle", "axis", "channel", "time")
+        assert rec_value == exp_value
+
+        markers = arrays[DataCategory.MARKERS]
+        is_cycle = (markers.context == "Right") & (markers.cycle_id == 0)
+        rec_value = markers.isel(cycle=int(np.argmax(is_cycle.values)))
+        exp_value = normalised.get_cycle("Right", 0).get_data(DataCategory.MARKERS)
+        np.testing.assert_array_equal(rec_value.values, exp_value.values)
+
+    def test_output_buffer(self, trial_small):
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        n_cycles = 4
+        out = {DataCategory.ANALOGS: np.empty(
+            (n_cycles, len(trial_small.get_data(DataCategory.ANALOGS).channel), 100))}
+        arrays = LinearTimeNormaliser().normalise_arrays(segments, out=out)
+
+        rec_value = np.shares_memory(arrays[DataCategory.ANALOGS].values,
+                                     out[DataCategory.ANALOGS])
+        exp_value = True
+        assert rec_value == exp_value
+
+        with pytest.raises(ValueError):
+            LinearTimeNormaliser().normalise_arrays(
+                segments, out={DataCategory.ANALOGS: np.empty((1, 1, 100))})
+
+    def test_reuse_buffers(self, trial_small):
+        segments = GaitEventsSegmentation("Foot Strike").segment(trial_small)
+        normaliser = PhaseTimeNormaliser(reuse_buffers=True)
+        first = normaliser.normalise_arrays(segments)[DataCategory.MARKERS]
+        expected = first.copy()
+        second = normaliser.normalise_arrays(segments)[DataCategory.MARKERS]
+
+        rec_value = np.shares_memory(first.values, second.values)
+        exp_value = True
+        assert rec_value == exp_value
+        np.testing.assert_array_equal(second.values, expected.values)
+
+    def test_trial(self, trial_small):
+        arrays = LinearTimeNormaliser().normalise_arrays(trial_small)
+
+        rec_value = arrays[DataCategory.MARKERS].shape
+        exp_value = (3, len(trial_small.get_data(DataCategory.MARKERS).channel), 100)
+        assert rec_value == exp_value
+
+        with pytest.raises(TypeError):
+            PhaseTimeNormaliser().normalise_arrays(trial_small)
+
+        with pytest.raises(TypeError):
+            PhaseTimeNormaliser().normalise(trial_small)
+
+
+class TestFloat32Normalisation:
+
+    @staticmethod
+    def _to_float32(trial):
+        trial_32 = Trial()
+        for category, data in trial.get_all_data().items():
+            trial_32.add_data(category, data.astype(np.float32))
+        trial_32.events = trial.events
+        return trial_32
+
+    @pytest.mark.parametrize("normaliser", [
+        LinearTimeNormaliser(), SplineTimeNormaliser(), PchipTimeNormaliser()])
+    def test_time_normalisation(self, trial_small, normaliser):
+        segmentation = GaitEventsSegmentation("Foot Strike")
+        normalised = normaliser.normalise(segmentation.segment(trial_small))
+        normalised_32 = normaliser.normalise(
+            segmentation.segment(self._to_float32(trial_small)))
+
+        for category in (DataCategory.MARKERS, DataCategory.ANALOGS):
+            values = normalised.get_cycle("Left", 0).get_data(category).values
+            values_32 = normalised_32.get_cycle("Left", 0).get_data(category)
+
+            rec_value = values_32.dtype
+            exp_value = np.float32
+            assert rec_value == exp_value
+            np.testing.assert_allclose(values_32.values, values, rtol=1e-4,
+                                       atol=1e-5 * np.nanmax(np.abs(values)))
+
+    @pytest.mark.parametrize("normaliser", [
+        ZScoreNormaliser(), BodyScaleNormaliser(70, 1.8)])
+    def test_amplitude_normalisation(self, trial_small, normaliser):
+        trial_32 = self._to_float32(trial_small)
+        normalised = normaliser.normalise(trial_32)
+        restored = normaliser.invert(normalised)
+
+        rec_value = [normalised.get_data(DataCategory.MARKERS).dtype,
+                     restored.get_data(DataCategory.MARKERS).dtype]
+        exp_value = [np.float32, np.float32]
+        assert rec_value == exp_value
+
+        rec_value = normalised.get_data(DataCategory.MARKERS).values
+        exp_value = normaliser.normalise(trial_small).get_data(DataCategory.MARKERS)
+        np.testing.assert_allclose(rec_value, exp_value.values, rtol=1e-4, atol=1e-4)
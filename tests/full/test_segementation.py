@@ -1,11 +1,16 @@
 from pathlib import Path
 
+import numpy as np
 import pytest
+import xarray as xr
 
 from gaitalytics.io import MarkersInputFileReader, AnalogsInputFileReader, \
     C3dEventInputFileReader
-from gaitalytics.model import DataCategory, Trial, TrialCycles
-from gaitalytics.segmentation import GaitEventsSegmentation
+from gaitalytics.model import DataCategory, Trial, TrialCycles, TrialView, \
+    LazyTrialCycles
+from gaitalytics.normalisation import LinearTimeNormaliser
+from gaitalytics.segmentation import GaitEventsSegmentation, WindowSegmentation, \
+    NormalisedGaitEventsSegmentation, CycleQuality
 
 
 @pytest.fixture()
@@ -77,6 +82,90 @@ class TestEventSegmentation:
 
         _test_cycle_id_context(segments)
 
+    def test_segment_data_small(self, small_trial):
+        segmentation = GaitEventsSegmentation("Foot Strike")
+        segments = segmentation.segment(small_trial)
+        for context, cycles in segments.get_all_cycles().items():
+            for cycle_id, cycle in cycles.items():
+                for category, data in cycle.get_all_data().items():
+                    exp_data = small_trial.get_data(category).sel(
+                        time=slice(data.attrs["start_time"], data.attrs["end_time"])
+                    )
+                    np.testing.assert_array_equal(data.values, exp_data.values)
+
+                    rec_value = data.coords["time"].values[0]
+                    exp_value = 0
+                    assert rec_value == exp_value
+
+    def test_segment_views_small(self, small_trial):
+        exp_segments = GaitEventsSegmentation("Foot Strike").segment(small_trial)
+        segments = GaitEventsSegmentation("Foot Strike", views=True).segment(
+            small_trial)
+        for context, cycles in segments.get_all_cycles().items():
+            for cycle_id, cycle in cycles.items():
+                assert type(cycle) is TrialView
+                assert cycle.is_view
+                exp_cycle = exp_segments.get_cycle(context, cycle_id)
+                for category, data in cycle.get_all_data().items():
+                    assert data.identical(exp_cycle.get_data(category))
+                    assert np.shares_memory(
+                        data.values, small_trial.get_data(category).values)
+                assert cycle.events.equals(exp_cycle.events)
+
+        _test_start_end_frame(segments)
+
+        _test_cycle_id_context(segments)
+
+    def test_segment_views_materialise(self, small_trial):
+        segments = GaitEventsSegmentation("Foot Strike", views=True).segment(
+            small_trial)
+        cycle = segments.get_cycle("Left", 0)
+        markers = cycle.get_data(DataCategory.MARKERS)
+        with pytest.raises(ValueError):
+            markers.values[0, 0, 0] = 0
+
+        cycle.materialise()
+        assert not cycle.is_view
+        markers = cycle.get_data(DataCategory.MARKERS)
+        assert not np.shares_memory(
+            markers.values, small_trial.get_data(DataCategory.MARKERS).values)
+        markers.values[0, 0, 0] = 0
+
+    def test_segment_lazy_small(self, small_trial):
+        exp_segments = GaitEventsSegmentation("Foot Strike").segment(small_trial)
+        segments = GaitEventsSegmentation(
+            "Foot Strike", lazy=True, cache_size=2).segment(small_trial)
+        assert type(segments) is LazyTrialCycles
+
+        rec_value = len(segments.get_cycles_per_context("Left"))
+        exp_value = 2
+        assert rec_value == exp_value
+
+        for context, cycles in segments.get_all_cycles().items():
+            for cycle_id, cycle in cycles.items():
+                exp_cycle = exp_segments.get_cycle(context, cycle_id)
+                for category, data in cycle.get_all_data().items():
+                    assert data.identical(exp_cycle.get_data(category))
+                assert cycle.events.equals(exp_cycle.events)
+
+                rec_value = segments.get_cycle_attrs(context, cycle_id)
+                exp_value = exp_cycle.events.attrs
+                assert rec_value == exp_value
+
+        rec_value = len(segments._cache)
+        exp_value = 2
+        assert rec_value == exp_value
+
+        _test_start_end_frame(segments)
+
+        _test_cycle_id_context(segments)
+
+    def test_segment_lazy_missing(self, small_trial):
+        segments = GaitEventsSegmentation("Foot Strike", lazy=True).segment(
+            small_trial)
+        with pytest.raises(KeyError):
+            segments.get_cycle("Left", 5)
+
     def test_segment_big(self, big_trial):
         segmentation = GaitEventsSegmentation("Foot Strike")
         segments = segmentation.segment(big_trial)
@@ -107,6 +196,128 @@ class TestEventSegmentation:
                 exp_value = 5
                 assert rec_value == exp_value
 
+    def test_segment_swing_small(self, small_trial):
+        segmentation = GaitEventsSegmentation("Foot Off", end_label="Foot Strike")
+        segments = segmentation.segment(small_trial)
+
+        rec_value = len(segments.get_cycles_per_context("Right"))
+        exp_value = 3
+        assert rec_value == exp_value
+
+        for context, cycles in segments.get_all_cycles().items():
+            for cycle_id, cycle in cycles.items():
+                rec_value = cycle.events["label"].tolist()
+                exp_value = ["Foot Off", "Foot Strike"]
+                assert rec_value == exp_value
+
+                rec_value = cycle.events["context"].unique().tolist()
+                exp_value = [context]
+                assert rec_value == exp_value
+
+        _test_start_end_frame(segments)
+
+        _test_cycle_id_context(segments)
+
+    def test_segment_contra_small(self, small_trial):
+        segmentation = GaitEventsSegmentation("Foot Strike", end_context="contra")
+        segments = segmentation.segment(small_trial)
+
+        rec_value = len(segments.get_cycles_per_context("Left"))
+        exp_value = 2
+        assert rec_value == exp_value
+
+        cycle = segments.get_cycle("Right", 0)
+        rec_value = (cycle.events.attrs["start_time"], cycle.events.attrs["end_time"])
+        exp_value = (2.89, 3.42)
+        assert rec_value == exp_value
+
+        with pytest.raises(ValueError):
+            GaitEventsSegmentation("Foot Strike", end_context="foo")
+
+    def test_quality_sequence_small(self, small_trial):
+        segments = GaitEventsSegmentation(
+            "Foot Strike", check_sequence=True).segment(small_trial)
+        for context, cycles in segments.get_all_cycles().items():
+            for cycle_id in cycles:
+                rec_value = segments.get_cycle_attrs(context, cycle_id)["quality"]
+                exp_value = CycleQuality.OK
+                assert rec_value == exp_value
+
+        small_trial.events = small_trial.events.drop(index=4)
+        segments = GaitEventsSegmentation(
+            "Foot Strike", check_sequence=True).segment(small_trial)
+        rec_value = [segments.get_cycle_attrs(context, cycle_id)["quality"]
+                     for context, cycles in segments.get_all_cycles().items()
+                     for cycle_id in cycles]
+        assert CycleQuality.INCOMPLETE_EVENTS in rec_value
+
+        cycle = next(cycle for cycles in segments.get_all_cycles().values()
+                     for cycle in cycles.values()
+                     if cycle.events.attrs["quality"] != CycleQuality.OK)
+        rec_value = cycle.get_data(DataCategory.MARKERS).attrs["used"]
+        exp_value = 0
+        assert rec_value == exp_value
+
+    @pytest.mark.parametrize("event_label, end_label, end_context", [
+        ("Foot Off", "Foot Strike", "ipsi"),
+        ("Foot Strike", "Foot Off", "ipsi"),
+        ("Foot Strike", "Foot Strike", "contra"),
+    ])
+    def test_quality_sequence_pairs_small(self, small_trial, event_label, end_label,
+                                          end_context):
+        segments = GaitEventsSegmentation(
+            event_label, end_label=end_label, end_context=end_context,
+            check_sequence=True
+        ).segment(small_trial)
+        rec_value = [segments.get_cycle_attrs(context, cycle_id)["quality"]
+                     for context, cycles in segments.get_all_cycles().items()
+                     for cycle_id in cycles]
+        exp_value = [CycleQuality.OK] * len(rec_value)
+        assert len(rec_value) > 0
+        assert rec_value == exp_value
+
+        with pytest.raises(ValueError):
+            GaitEventsSegmentation("Heel Rise", check_sequence=True)
+
+    def test_quality_gaps_duration_small(self, small_trial):
+        segments = GaitEventsSegmentation(
+            "Foot Strike",
+            lazy=True,
+            gap_channels=["LAnklePower"],
+            max_duration_deviation=0.02,
+        ).segment(small_trial)
+
+        rec_value = [
+            segments.get_cycle_attrs("Right", cycle_id)["quality"]
+            for cycle_id in range(2)
+        ]
+        exp_value = [
+            CycleQuality.DURATION_OUTLIER,
+            CycleQuality.DURATION_OUTLIER | CycleQuality.MARKER_GAPS,
+        ]
+        assert rec_value == exp_value
+
+        rec_value = [
+            segments.get_cycle_attrs("Left", cycle_id)["used"] for cycle_id in range(2)
+        ]
+        exp_value = [1, 0]
+        assert rec_value == exp_value
+
+    def test_segmented_events_unsorted_small(self, small_trial):
+        segments = GaitEventsSegmentation("Foot Strike").segment(small_trial)
+        small_trial.events = small_trial.events.iloc[::-1]
+        unsorted_segments = GaitEventsSegmentation("Foot Strike").segment(
+            small_trial)
+        for context, cycles in segments.get_all_cycles().items():
+            for cycle_id, cycle in cycles.items():
+                unsorted_cycle = unsorted_segments.get_cycle(context, cycle_id)
+                rec_value = sorted(unsorted_cycle.events["time"])
+                exp_value = sorted(cycle.events["time"])
+                assert rec_value == exp_value
+
+                rec_value = unsorted_cycle.events.attrs
+                exp_value = cycle.events.attrs
+                assert rec_value == exp_value
 
     def test_segmented_events_big(self, big_trial):
         segmentation = GaitEventsSegmentation("Foot Strike")
@@ -120,6 +331,144 @@ class TestEventSegmentation:
 
 
 
+class TestNormalisedEventSegmentation:
+
+    def test_segment_small(self, small_trial):
+        exp_segments = LinearTimeNormaliser().normalise(
+            GaitEventsSegmentation("Foot Strike").segment(small_trial))
+        segments = NormalisedGaitEventsSegmentation("Foot Strike").segment(
+            small_trial)
+
+        rec_value = len(segments.get_cycles_per_context("Left"))
+        exp_value = 2
+        assert rec_value == exp_value
+
+        for context, cycles in exp_segments.get_all_cycles().items():
+            for cycle_id, exp_cycle in cycles.items():
+                cycle = segments.get_cycle(context, cycle_id)
+                for category, exp_data in exp_cycle.get_all_data().items():
+                    data = cycle.get_data(category)
+                    np.testing.assert_allclose(data.values, exp_data.values)
+                    np.testing.assert_array_equal(
+                        data.coords["time"].values, exp_data.coords["time"].values)
+
+                    rec_value = data.attrs
+                    exp_value = exp_data.attrs
+                    assert rec_value == exp_value
+
+        _test_cycle_id_context(segments)
+
+    def test_segment_arrays_small(self, small_trial):
+        segmentation = NormalisedGaitEventsSegmentation("Foot Strike", n_frames=50)
+        arrays = segmentation.segment_arrays(small_trial)
+
+        n_channels = small_trial.get_data(DataCategory.MARKERS).sizes["channel"]
+        rec_value = arrays[DataCategory.MARKERS].shape
+        exp_value = (4, 3, n_channels, 50)
+        assert rec_value == exp_value
+
+        rec_value = arrays[DataCategory.ANALOGS].coords["context"].values.tolist()
+        exp_value = ["Right", "Right", "Left", "Left"]
+        assert rec_value == exp_value
+
+
+class TestWindowSegmentation:
+
+    def test_segment_small(self, small_trial):
+        segments = WindowSegmentation(1.0).segment(small_trial)
+        windows = segments.get_cycles_per_context("Window")
+
+        rec_value = len(windows)
+        exp_value = 3
+        assert rec_value == exp_value
+
+        for window_id, window in windows.items():
+            assert isinstance(window, TrialView)
+            rec_value = window.get_data(DataCategory.MARKERS).sizes["time"]
+            exp_value = 100
+            assert rec_value == exp_value
+
+            rec_value = window.get_data(DataCategory.ANALOGS).sizes["time"]
+            exp_value = 1000
+            assert rec_value == exp_value
+
+        _test_cycle_id_context(segments)
+
+    def test_segment_overlap_small(self, small_trial):
+        segments = WindowSegmentation(100, stride=50, unit="frames").segment(
+            small_trial)
+        overlap_segments = WindowSegmentation(1.0, overlap=0.5).segment(
+            small_trial)
+
+        rec_value = len(segments.get_cycles_per_context("Window"))
+        exp_value = 5
+        assert rec_value == exp_value
+
+        markers = small_trial.get_data(DataCategory.MARKERS)
+        for window_id in range(5):
+            window = segments.get_cycle("Window", window_id)
+            rec_value = window.get_data(DataCategory.MARKERS).values
+            exp_value = markers.values[..., window_id * 50: window_id * 50 + 100]
+            np.testing.assert_array_equal(rec_value, exp_value)
+
+            rec_value = window.events.attrs
+            exp_value = overlap_segments.get_cycle("Window", window_id).events.attrs
+            assert rec_value == exp_value
+
+    def test_get_windows_small(self, small_trial):
+        segmentation = WindowSegmentation(1.0, overlap=0.5)
+        windows = segmentation.get_windows(small_trial, DataCategory.ANALOGS)
+        segments = segmentation.segment(small_trial)
+
+        rec_value = windows.shape
+        exp_value = (5, 42, 1000)
+        assert rec_value == exp_value
+
+        analogs = small_trial.get_data(DataCategory.ANALOGS)
+        assert np.shares_memory(windows.values, analogs.values)
+
+        for window_id in range(5):
+            rec_value = windows[window_id].values
+            exp_value = segments.get_cycle("Window", window_id).get_data(
+                DataCategory.ANALOGS).values
+            np.testing.assert_array_equal(rec_value, exp_value)
+
+    def test_get_windows_fractional_rate(self):
+        marker_time = np.arange(1200) / 120
+        analog_time = np.arange(10000) / 1000
+        trial = Trial()
+        trial.add_data(DataCategory.MARKERS, xr.DataArray(
+            np.broadcast_to(marker_time, (3, 1, 1200)).copy(),
+            dims=("axis", "channel", "time"),
+            coords={"axis": ["x", "y", "z"], "channel": ["LHEE"],
+                    "time": marker_time},
+            attrs={"rate": 120}))
+        trial.add_data(DataCategory.ANALOGS, xr.DataArray(
+            analog_time[np.newaxis], dims=("channel", "time"),
+            coords={"channel": ["Force.Fz1"], "time": analog_time},
+            attrs={"rate": 1000}))
+        segmentation = WindowSegmentation(14, stride=7, unit="frames")
+        markers = segmentation.get_windows(trial, DataCategory.MARKERS)
+        analogs = segmentation.get_windows(trial, DataCategory.ANALOGS)
+
+        rec_value = analogs.sizes["window"]
+        exp_value = markers.sizes["window"]
+        assert rec_value == exp_value
+
+        np.testing.assert_array_equal(analogs.start_time, markers.start_time)
+
+        # the first analog frame of each window is at most one frame late
+        rec_value = analogs.values[:, 0, 0] - markers.values[:, 0, 0, 0]
+        assert np.all((rec_value >= 0) & (rec_value < 1 / 1000))
+
+    def test_invalid_overlap(self, small_trial):
+        with pytest.raises(ValueError):
+            WindowSegmentation(1.0, overlap=1.0).segment(small_trial)
+
+        with pytest.raises(ValueError):
+            WindowSegmentation(1.0, stride=0.5, overlap=0.5)
+
+
 def _test_cycle_id_context(segments: TrialCycles):
     # Test cycle_id and context attrs
     for context, cycle_segments in segments.get_all_cycles().items():
@@ -1,5 +1,7 @@
+import shutil
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -19,6 +21,14 @@ def out_path(request):
     return out
 
 
+@pytest.fixture()
+def segments_out_path(request):
+    out = Path('out/test_small_segments')
+    if out.exists():
+        shutil.rmtree(out)
+    return out
+
+
 def test_load_config():
     config = api.load_config("./tests/pig_config.yaml")
     marker_name = config.get_marker_mapping(mapping.MappedMarkers.SACRUM)
@@ -32,6 +42,21 @@ def test_load_c3d_trial():
     assert trial.events is not None
 
 
+def test_load_c3d_trial_float32():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config, dtype=np.float32)
+    segments = api.segment_trial(trial)
+    normalised = api.time_normalise_trial(segments)
+    features = api.calculate_features(segments, config)
+
+    cycle = normalised.get_cycle("Left", 0)
+    rec_value = [data.dtype for data in trial.get_all_data().values()]
+    rec_value += [data.dtype for data in cycle.get_all_data().values()]
+    rec_value += [features.dtype]
+    exp_value = [np.float32] * 7
+    assert rec_value == exp_value
+
+
 def test_detect_events():
     config = api.load_config("./tests/pig_config.yaml")
     trial = api.load_c3d_trial("./tests/test_small.c3d", config)
@@ -40,6 +65,13 @@ def test_detect_events():
     assert len(event_table) == 4
 
 
+def test_detect_events_velocity():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    event_table = api.detect_events(trial, config, method="Velocity")
+    assert len(event_table) == len(trial.events)
+
+
 def test_detect_events_methode():
     config = api.load_config("./tests/pig_config.yaml")
     trial = model.Trial()
@@ -74,6 +106,38 @@ def test_segment_trial():
     assert len(segm_trial.get_all_cycles().keys()) == 2
 
 
+def test_segment_trial_window():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    segm_trial = api.segment_trial(trial, method="window", window=1.0, overlap=0.5)
+    assert len(segm_trial.get_cycles_per_context("Window")) == 5
+
+
+def test_segment_trials():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    segm_trials = api.segment_trials([trial, trial], workers=2)
+    assert len(segm_trials) == 2
+    for segm_trial in segm_trials:
+        assert len(segm_trial.get_cycles_per_context("Left")) == 2
+
+
+def test_segment_trials_process(segments_out_path):
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    paths = api.segment_trials(
+        [trial], workers=1, executor="process", output_paths=[segments_out_path]
+    )
+    assert paths == [segments_out_path]
+    segm_trial = model.trial_from_hdf5(segments_out_path)
+    assert len(segm_trial.get_cycles_per_context("Left")) == 2
+
+
+def test_segment_trials_executor():
+    with pytest.raises(ValueError):
+        api.segment_trials([model.Trial()], executor="foo")
+
+
 def test_segment_trial_no_events():
     trial = model.Trial()
     with pytest.raises(ValueError):
@@ -110,9 +174,143 @@ def test_time_normalize_trial_frames():
     assert markers.shape[2] == 200
 
 
+@pytest.mark.parametrize("method", ["spline", "pchip"])
+def test_time_normalize_cycle_trial_method(method):
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    trial_cycles = api.segment_trial(trial)
+    norm_trial = api.time_normalise_trial(trial_cycles, method=method, n_frames=200)
+    markers = norm_trial.get_cycle("Left", 0).get_data(model.DataCategory.MARKERS)
+    assert markers.shape[2] == 200
+
+
+def test_time_normalize_cycle_trial_phase():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    trial_cycles = api.segment_trial(trial)
+    norm_trial = api.time_normalise_trial(
+        trial_cycles, method="phase", phase_frames=(50, 50)
+    )
+    markers = norm_trial.get_cycle("Left", 0).get_data(model.DataCategory.MARKERS)
+    assert markers.shape[2] == 100
+
+
+def test_time_normalize_cycle_trial_dtw():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    trial_cycles = api.segment_trial(trial)
+    norm_trial = api.time_normalise_trial(
+        trial_cycles, method="dtw", channels=["LKneeAngles"]
+    )
+    markers = norm_trial.get_cycle("Left", 0).get_data(model.DataCategory.MARKERS)
+    assert markers.shape[2] == 100
+
+
+def test_time_normalize_trial_wrong_method():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    with pytest.raises(ValueError):
+        api.time_normalise_trial(trial, method="cubic")
+
+
+@pytest.mark.parametrize("method", ["zscore", "minmax"])
+def test_amplitude_normalise_trial(method):
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    trial_cycles = api.segment_trial(trial)
+    norm_trial = api.amplitude_normalise_trial(trial_cycles, method)
+    markers = norm_trial.get_cycle("Left", 0).get_data(model.DataCategory.MARKERS)
+    assert "amplitude_scale" in markers.attrs
+
+
+def test_amplitude_normalise_trial_body():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    trial_cycles = api.segment_trial(trial)
+    norm_trial = api.amplitude_normalise_trial(trial_cycles, "body", body_mass=70)
+    cycle = trial_cycles.get_cycle("Left", 0)
+    norm_cycle = norm_trial.get_cycle("Left", 0)
+
+    rec_value = norm_cycle.get_data(model.DataCategory.ANALOGS).loc["Force.Fz1"]
+    exp_value = cycle.get_data(model.DataCategory.ANALOGS).loc["Force.Fz1"] / 70
+    np.testing.assert_allclose(rec_value.values, exp_value.values)
+
+    rec_value = norm_cycle.get_data(model.DataCategory.MARKERS)
+    exp_value = cycle.get_data(model.DataCategory.MARKERS)
+    np.testing.assert_array_equal(
+        rec_value.loc[:, "RTOE"].values, exp_value.loc[:, "RTOE"].values
+    )
+
+
+def test_amplitude_normalise_trial_wrong_method():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    with pytest.raises(ValueError):
+        api.amplitude_normalise_trial(trial, method="max")
+
+
+def test_resample_trial():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    trial = api.resample_trial(trial, 100, categories=[model.DataCategory.ANALOGS])
+    analogs = trial.get_data(model.DataCategory.ANALOGS)
+    assert analogs.attrs["rate"] == 100
+    assert analogs.shape[1] == 337
+    trial_cycles = api.segment_trial(trial)
+    assert trial_cycles.get_cycle("Left", 0) is not None
+
+
+def test_segment_and_normalise_trial():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    norm_trial = api.segment_and_normalise_trial(trial, n_frames=200)
+    markers = norm_trial.get_cycle("Left", 0).get_data(model.DataCategory.MARKERS)
+    assert markers.shape[2] == 200
+
+
+@pytest.mark.parametrize("method", ["ensemble", "streaming"])
+def test_aggregate_trial(method):
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    norm_trial = api.segment_and_normalise_trial(trial)
+    result = api.aggregate_trial(norm_trial, method)
+    markers = result[model.DataCategory.MARKERS]
+    assert markers.dims[:2] == ("context", "statistic")
+    assert markers.sel(statistic="mean").shape[-1] == 100
+
+
+def test_aggregate_trial_wrong_method():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    norm_trial = api.segment_and_normalise_trial(trial)
+    with pytest.raises(ValueError):
+        api.aggregate_trial(norm_trial, "mean")
+
+
+def test_aggregate_trials():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    norm_trial = api.segment_and_normalise_trial(trial)
+    result = api.aggregate_trials(iter([norm_trial, norm_trial]))
+    markers = result[model.DataCategory.MARKERS]
+    assert markers.n_cycles.values.tolist() == [4, 4]
+
+
 def test_calculate_features():
     config = api.load_config("./tests/pig_config.yaml")
     trial = api.load_c3d_trial("./tests/test_small.c3d", config)
     trial_cycles = api.segment_trial(trial)
     features = api.calculate_features(trial_cycles, config)
     assert features.shape == (2, 2, 2278)
+
+
+def test_calculate_features_normalised():
+    config = api.load_config("./tests/pig_config.yaml")
+    trial = api.load_c3d_trial("./tests/test_small.c3d", config)
+    norm_trial = api.segment_and_normalise_trial(trial)
+    with pytest.raises(ValueError, match="does not have events"):
+        api.calculate_features(norm_trial, config)
+
+    features = api.calculate_features(
+        norm_trial, config, methods=[api.features.TimeSeriesFeatures])
+    assert features.dims == ("context", "cycle", "feature")